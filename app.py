@@ -1,5 +1,16 @@
 # app.py
+import time
+_run_start = time.perf_counter()
+
+import importlib
+import logging
 import streamlit as st
+from src import perf
+from src.cancel import run_scope
+from src.config import MEMORY_PROFILING_ENABLED, WARMUP_ENABLED
+from src.warmup import start_warmup
+
+logger = logging.getLogger(__name__)
 
 # Must be the first Streamlit command
 st.set_page_config(
@@ -12,20 +23,31 @@ st.set_page_config(
     }
 )
 
-# Apply custom CSS right after set_page_config
-with open('src/assets/styles.css') as f:
-    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+@st.cache_resource
+def load_asset(path: str) -> str:
+    """Read a static asset once per process."""
+    with open(path) as f:
+        return f.read()
 
-# Now import other modules
-from tools.overview import overview_page
-from tools.compare import compare_page  # Make sure this matches your compare.py function name
-from tools.map import map_page
+# Apply custom CSS right after set_page_config
+st.markdown(f'<style>{load_asset("src/assets/styles.css")}</style>', unsafe_allow_html=True)
 st.logo("src/assets/buildings.svg")
 
 
-def placeholder_map():
-    st.title("Map")
-    st.write("Coming soon...")
+def lazy_page(module: str, function: str):
+    """Return a page callable that imports its module (and heavy dependencies) on first visit."""
+    def page():
+        if perf.first_time(f"import.{module}"):
+            with perf.timer(f"import.{module}"):
+                importlib.import_module(module)
+        # Stale reruns abort at the next stage boundary instead of finishing discarded work
+        with run_scope():
+            getattr(importlib.import_module(module), function)()
+
+    # st.Page derives the URL path from the function name
+    page.__name__ = function
+    return page
+
 
 def placeholder_chat():
     st.title("Chat")
@@ -35,37 +57,53 @@ def placeholder_bugs():
     st.title("Bug Reports")
     st.write("Coming soon...")
 
-def placeholder_notifications():
-    st.title("Alerts")
-    st.write("Coming soon...")
-
-def placeholder_sources():
-    st.title("Sources")
-    st.write("Coming soon...")
-
 def placeholder_about():
     st.title("About")
     st.write("Coming soon...")
 
 # Create pages with unique titles
-overview = st.Page(overview_page, title="Overview", icon=":material/search:", default=True)
-compare = st.Page(compare_page, title="Compare", icon=":material/history:")  # Updated to match the function name
-map = st.Page(placeholder_map, title="Map", icon=":material/map:")
+overview = st.Page(lazy_page("tools.overview", "overview_page"), title="Overview", icon=":material/search:", default=True)
+compare = st.Page(lazy_page("tools.compare", "compare_page"), title="Compare", icon=":material/history:")
+leaderboard = st.Page(lazy_page("tools.leaderboard", "leaderboard_page"), title="Leaderboard", icon=":material/leaderboard:")
+screener = st.Page(lazy_page("tools.screener", "screener_page"), title="Screener", icon=":material/filter_list:")
+map = st.Page(lazy_page("tools.map", "map_page"), title="Map", icon=":material/map:")
 chat = st.Page(placeholder_chat, title="Chat AI", icon=":material/chat:")
-# map_page = st.Page(map_main, title="Map", icon=":material/map:")
 
-notifications = st.Page(placeholder_notifications, title="Notifications", icon=":material/notification_important:")
+notifications = st.Page(lazy_page("reports.alerts", "alerts_page"), title="Notifications", icon=":material/notification_important:")
+anomalies = st.Page(lazy_page("reports.anomalies", "anomalies_page"), title="Anomalies", icon=":material/troubleshoot:")
 bugs = st.Page(placeholder_bugs, title="Bug Reports", icon=":material/bug_report:")
-sources = st.Page(placeholder_sources, title="Sources", icon=":material/data_object:")
+sources = st.Page(lazy_page("resources.sources", "sources_page"), title="Sources", icon=":material/data_object:")
 about = st.Page(placeholder_about, title="About", icon=":material/info:")
+memory_admin = st.Page(lazy_page("resources.memory", "memory_page"), title="Memory", icon=":material/memory:")
 
 # Navigation without login
-pg = st.navigation(
-    {
-        "Tools": [overview, compare, map, chat],
-        "Reports": [notifications, bugs],
-        "Resources": [sources, about]
-    }
-)
+pages = {
+    "Tools": [overview, compare, leaderboard, screener, map, chat],
+    "Reports": [notifications, anomalies, bugs],
+    "Resources": [sources, about]
+}
+if MEMORY_PROFILING_ENABLED:
+    pages["Admin"] = [memory_admin]
+pg = st.navigation(pages)
+
+# Heap snapshots for the Memory admin page; started once per process
+if MEMORY_PROFILING_ENABLED:
+    from src.memory import start_profiling
+    start_profiling()
+
+# Warm shared caches in the background; a no-op when serve.py already started it
+if WARMUP_ENABLED:
+    start_warmup()
 
+# Cold start covers the first run in this server process, including page imports
+cold = perf.first_time("app.run")
+perf.record("app.cold_setup" if cold else "app.setup", time.perf_counter() - _run_start)
 pg.run()
+perf.record("app.cold_first_paint" if cold else "app.first_paint", time.perf_counter() - _run_start)
+if cold:
+    stats = perf.summary()["timings"]
+    logger.info(
+        "Cold start: setup %.3fs, first page %.3fs",
+        stats["app.cold_setup"]["max"],
+        stats["app.cold_first_paint"]["max"],
+    )
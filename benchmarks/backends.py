@@ -0,0 +1,83 @@
+"""Benchmark the query backends on synthetic data of increasing size.
+
+For each size it reports build time, mean lookup and cross-section latency, and
+the crossover: how many lookups it takes for an in-memory backend's build cost
+to pay for itself compared with querying Dask directly.
+
+    python benchmarks/backends.py [--sizes 100 1000 10000 30000] [--months 100]
+"""
+import argparse
+import time
+
+import dask.dataframe as dd
+import numpy as np
+import pandas as pd
+
+from src.data.backends import ArrowBackend, DaskBackend, PandasBackend
+
+METRIC_COLUMNS = ["median_listing_price", "active_listing_count", "median_days_on_market", "pending_ratio"]
+
+
+def synthetic_frame(n_geos: int, n_months: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2016-07-01", periods=n_months, freq="MS")
+    geo_ids = np.array([f"{i:05d}" for i in range(n_geos)])
+    df = pd.DataFrame({
+        "date": np.tile(dates, n_geos),
+        "geo_type": "Zip",
+        "geo_id": np.repeat(geo_ids, n_months),
+        "geo_name": np.repeat([f"Town {i}, CA" for i in range(n_geos)], n_months),
+    })
+    for column in METRIC_COLUMNS:
+        df[column] = rng.uniform(0, 1e6, len(df)).astype(np.float32)
+    return df
+
+
+def time_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 30000])
+    parser.add_argument("--months", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    print(f"{'geos':>7} {'rows':>10} {'backend':>8} {'build (s)':>10} {'lookup (ms)':>12} {'section (ms)':>13} {'crossover':>10}")
+    for n_geos in args.sizes:
+        df = synthetic_frame(n_geos, args.months)
+        locations = [f"Zip - {i:05d}, Town {i}, CA" for i in rng.integers(0, n_geos, args.queries)]
+        date = df["date"].iloc[-1]
+        ddf = dd.from_pandas(df, npartitions=max(1, len(df) // 500_000))
+
+        results = {}
+        for name, build in (
+            ("dask", lambda: DaskBackend(ddf)),
+            ("pandas", lambda: PandasBackend(df)),
+            ("arrow", lambda: ArrowBackend(df)),
+        ):
+            start = time.perf_counter()
+            backend = build()
+            build_time = time.perf_counter() - start
+
+            queries = iter(locations * 2)
+            lookup = time_call(lambda: backend.lookup(next(queries)), args.queries)
+            section = time_call(lambda: backend.cross_section("Zip", date), 3)
+            results[name] = (build_time, lookup, section)
+
+        dask_lookup = results["dask"][1]
+        for name, (build_time, lookup, section) in results.items():
+            # Lookups needed before build + queries beats querying Dask each time
+            saved = dask_lookup - lookup
+            crossover = "-" if name == "dask" else f"{build_time / saved:,.0f}" if saved > 0 else "never"
+            print(f"{n_geos:>7} {len(df):>10,} {name:>8} {build_time:>10.3f} {lookup * 1000:>12.2f} "
+                  f"{section * 1000:>13.2f} {crossover:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark CPU time per completed interaction when a user clicks in quick succession.
+
+Each interaction starts a run that builds eight charts on the shared executor, each
+chart in three stages (filter, transform, build). Clicks arrive faster than a run
+completes, so most runs are superseded. Streamlit coalesces queued reruns, so only
+the latest click is run after a superseded one.
+
+- baseline: a superseded run stops at its next yield point, as Streamlit does, but
+  the chart tasks it already queued still run to completion
+- tokens: stages check the run's token and queued tasks are dropped
+
+"last click" is the time from the final click until its charts are complete.
+
+    python benchmarks/cancellation.py [--clicks 20] [--interval-ms 40] [--stage-ms 15]
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src import perf
+from src.cancel import CancelToken, Cancelled, CancellableExecutor, _current, check_cancelled
+
+CHARTS = 8
+STAGES = 3
+
+
+_DATA = np.random.default_rng(0).random(20_000)
+
+
+def calibrate() -> float:
+    """Sorts of _DATA per millisecond on one thread."""
+    start = time.perf_counter()
+    for _ in range(200):
+        np.sort(_DATA)
+    return 200 / ((time.perf_counter() - start) * 1000)
+
+
+def busy(sorts: int) -> None:
+    """A fixed amount of CPU work, independent of contention."""
+    for _ in range(sorts):
+        np.sort(_DATA)
+
+
+def build_chart(stage_sorts: int, checks: bool) -> None:
+    for _ in range(STAGES):
+        if checks:
+            check_cancelled()
+        busy(stage_sorts)
+
+
+def simulate(mode: str, clicks: int, interval_ms: float, stage_sorts: int, workers: int) -> dict:
+    latest = {"click": 0, "at": time.perf_counter()}
+
+    def clicker():
+        for i in range(1, clicks):
+            time.sleep(interval_ms / 1000)
+            latest["click"], latest["at"] = i, time.perf_counter()
+
+    tokens = mode == "tokens"
+    executor = CancellableExecutor(workers) if tokens else ThreadPoolExecutor(workers)
+    completed = superseded = 0
+
+    clicker_thread = threading.Thread(target=clicker, daemon=True)
+    clicker_thread.start()
+    cpu_start = time.process_time()
+    click = 0
+    while True:
+        token = CancelToken(lambda c=click: latest["click"] > c)
+        reset = _current.set(token)
+        futures = [executor.submit(build_chart, stage_sorts, tokens) for _ in range(CHARTS)]
+        try:
+            # Placing each chart is a Streamlit yield point, where a superseded run stops
+            for future in futures:
+                future.result()
+                if token.cancelled:
+                    break
+        except Cancelled:
+            pass
+        finally:
+            _current.reset(reset)
+
+        if token.cancelled:
+            # Without tokens the abandoned run's queued tasks still execute
+            superseded += 1
+            click = latest["click"]
+            continue
+        completed += 1
+        if not clicker_thread.is_alive() and latest["click"] == click:
+            break
+        while latest["click"] == click and clicker_thread.is_alive():
+            time.sleep(0.001)
+        if latest["click"] == click:
+            break
+        click = latest["click"]
+
+    latency = time.perf_counter() - latest["at"]
+    if not tokens:
+        executor.shutdown(wait=True)
+    cpu = time.process_time() - cpu_start
+    return {
+        "completed": completed,
+        "superseded": superseded,
+        "cpu": cpu,
+        "latency": latency,
+        "cpu_per_interaction": cpu / max(completed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=20)
+    parser.add_argument("--interval-ms", type=float, default=40)
+    parser.add_argument("--stage-ms", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'mode':>9} {'completed':>10} {'superseded':>11} {'cpu (s)':>8} {'last click (s)':>15} {'cpu/completed (s)':>18}")
+    stage_sorts = max(1, round(calibrate() * args.stage_ms))
+    for mode in ("baseline", "tokens"):
+        result = simulate(mode, args.clicks, args.interval_ms, stage_sorts, args.workers)
+        print(f"{mode:>9} {result['completed']:>10} {result['superseded']:>11} {result['cpu']:>8.2f} "
+              f"{result['latency']:>15.2f} {result['cpu_per_interaction']:>18.3f}")
+    print(f"dropped tasks: {perf.summary()['counters'].get('cancel.dropped_tasks', 0)}, "
+          f"aborted stages: {perf.summary()['counters'].get('cancel.aborted_stages', 0)}")
+
+
+if __name__ == "__main__":
+    main()
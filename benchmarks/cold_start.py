@@ -0,0 +1,60 @@
+"""Measure cold-start import cost of the app, eager versus lazy page imports.
+
+Each measurement runs in a fresh interpreter so module caches start empty.
+
+    python benchmarks/cold_start.py [--repeat 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+PAGE_MODULES = [
+    "tools.overview",
+    "tools.compare",
+    "tools.map",
+    "tools.leaderboard",
+    "tools.screener",
+    "reports.alerts",
+    "resources.sources",
+]
+
+SCENARIOS = {
+    "streamlit only": ["streamlit"],
+    # Before: app.py imported every page module up front
+    "eager (all pages)": ["streamlit"] + PAGE_MODULES,
+    # After: app.py imports nothing page-specific; the default page is imported on first visit
+    "lazy (first page)": ["streamlit", "tools.overview"],
+}
+
+for module in PAGE_MODULES:
+    SCENARIOS[f"page: {module}"] = ["streamlit", module]
+
+
+def time_imports(modules: list) -> float:
+    code = (
+        "import time; start = time.perf_counter()\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<32}{'median (s)':>12}{'min (s)':>10}")
+    for name, modules in SCENARIOS.items():
+        try:
+            samples = [time_imports(modules) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<32}{'failed':>12}  {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{name:<32}{statistics.median(samples):>12.3f}{min(samples):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark building the Overview charts sequentially versus on a thread pool.
+
+Each chart is built and converted to a Vega-Lite spec, as st.altair_chart does,
+for every view on synthetic location histories. Run it on a multi-core machine;
+on a single core the pool can only add overhead.
+
+    python benchmarks/parallel_charts.py [--locations 5] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+# The conversion st.altair_chart runs before sending a chart to the browser
+from streamlit.elements.vega_charts import _convert_altair_to_vega_lite_spec
+
+from src.components.charts import create_overview_chart
+from src.data.data_loader import METRICS
+
+VIEWS = ["Value", "MoM", "YoY", "Since 2019", "Seasonality"]
+
+
+def synthetic_history(seed: int, n_months: int = 100) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"date": pd.date_range("2016-07-01", periods=n_months, freq="MS")})
+    trend = np.linspace(1, 1.5, n_months)
+    for metric in METRICS:
+        df[metric] = rng.uniform(1e3, 1e6) * trend * rng.uniform(0.97, 1.03, n_months)
+    return df
+
+
+def build(job) -> int:
+    df, metric, view = job
+    chart = create_overview_chart(df, metric, METRICS[metric], "Benchmark", view)
+    return len(_convert_altair_to_vega_lite_spec(chart))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--locations", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    histories = [synthetic_history(seed) for seed in range(args.locations)]
+    # One "rerun" is the eight charts of one location and view
+    reruns = [[(df, metric, view) for metric in METRICS] for df in histories for view in VIEWS]
+
+    # Warm imports and Altair's schema validators before timing
+    [build(job) for job in reruns[0]]
+
+    start = time.perf_counter()
+    for jobs in reruns:
+        [build(job) for job in jobs]
+    sequential = (time.perf_counter() - start) / len(reruns)
+    print(f"cpu cores: {os.cpu_count()}, reruns: {len(reruns)}")
+    print(f"{'workers':>8} {'ms / rerun':>11} {'speed-up':>9}")
+    print(f"{'seq':>8} {sequential * 1000:>11.1f} {1:>9.2f}")
+
+    for workers in args.workers:
+        with ThreadPoolExecutor(workers) as pool:
+            start = time.perf_counter()
+            for jobs in reruns:
+                list(pool.map(build, jobs))
+            elapsed = (time.perf_counter() - start) / len(reruns)
+        print(f"{workers:>8} {elapsed * 1000:>11.1f} {sequential / elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import streamlit as st
+import pandas as pd
+from src.data.alerts import (
+    OPERATORS,
+    add_rule,
+    check_rule,
+    delete_rules,
+    load_history,
+    load_rules,
+    make_rule,
+    run_pending_alerts
+)
+from src.data.cube import GEO_TYPES, VIEWS, get_cube
+from src.data.data_loader import METRICS
+from src.config import STATE_ABBREVIATIONS
+
+
+def alerts_page():
+    """Alert rules and triggered notifications page"""
+    # Header section
+    st.markdown(
+        """
+        <div style='display: flex; align-items: center; gap: 10px; margin-bottom: 5px;'>
+            <h3>Alerts</h3>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.write("Get notified when a market crosses a threshold. Rules are checked against every geography each time a new month of data lands.")
+
+    rules = load_rules()
+
+    # Evaluate any months that landed since the last visit
+    try:
+        new_alerts = run_pending_alerts(rules)
+        if not new_alerts.empty:
+            st.toast(f"{len(new_alerts)} new alerts triggered", icon="🔔")
+    except Exception as e:
+        st.error(f"Error evaluating alert rules: {str(e)}")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col2:
+        with st.popover("New Rule", icon=":material/add_alert:", use_container_width=False):
+            st.write("##### Create Alert Rule")
+
+            geo_type = st.selectbox("**Geo Level**", options=GEO_TYPES[1:], index=2, key="alert_geo_type")
+            metric_name = st.selectbox("**Metric**", options=list(METRICS.values()), key="alert_metric")
+            metric_col = next(k for k, v in METRICS.items() if v == metric_name)
+
+            view = st.pills("**View**", options=VIEWS, default="YoY", key="alert_view")
+            col_op, col_threshold = st.columns([1, 2])
+            with col_op:
+                operator = st.selectbox("**Condition**", options=OPERATORS, key="alert_operator")
+            with col_threshold:
+                threshold = st.number_input(
+                    "**Threshold**" if view == "Value" else "**Threshold (%)**",
+                    value=0.0,
+                    key="alert_threshold"
+                )
+
+            scope = st.radio("**Scope**", options=["All", "State", "Watchlist"], horizontal=True, key="alert_scope")
+            state = None
+            locations = None
+            if scope == "State":
+                state = st.selectbox("**State**", options=sorted(STATE_ABBREVIATIONS.values()), key="alert_state")
+            elif scope == "Watchlist":
+                locations = st.multiselect(
+                    "**Locations**",
+                    options=list(get_cube(geo_type).labels),
+                    placeholder="🔍 Search locations",
+                    key="alert_locations"
+                )
+
+            name = st.text_input("**Name** (optional)", key="alert_name")
+
+            if st.button("Save Rule", type="primary", key="alert_save"):
+                try:
+                    rule = make_rule(name, metric_col, view or "Value", operator, threshold, geo_type, state, locations)
+                    rules = add_rule(rule)
+                    st.success(f"Saved rule: {rule['name']}")
+                    # Check the current month now rather than waiting for the next release
+                    triggered = check_rule(rule)
+                    if not triggered.empty:
+                        st.toast(f"{len(triggered)} alerts triggered for the latest month", icon="🔔")
+                except ValueError as e:
+                    st.error(str(e))
+
+    with col1:
+        st.write(f"**{len(rules)} rules**")
+
+    tab_alerts, tab_rules = st.tabs(["Triggered", "Rules"])
+
+    with tab_alerts:
+        history = load_history()
+        if history["alerts"]:
+            alerts_df = pd.DataFrame(history["alerts"])
+            alerts_df["metric"] = alerts_df["metric"].map(METRICS).fillna(alerts_df["metric"])
+            st.dataframe(
+                alerts_df[["date", "rule", "location", "metric", "view", "value", "threshold"]],
+                column_config={
+                    "date": st.column_config.DateColumn("Month", format="MMM YYYY"),
+                    "rule": st.column_config.TextColumn("Rule"),
+                    "location": st.column_config.TextColumn("Location"),
+                    "metric": st.column_config.TextColumn("Metric"),
+                    "view": st.column_config.TextColumn("View", width="small"),
+                    "value": st.column_config.NumberColumn("Value", format="%.2f"),
+                    "threshold": st.column_config.NumberColumn("Threshold", format="%.2f"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+            st.caption(f"Last evaluated month: {pd.Timestamp(history['last_month']).strftime('%B %Y')}")
+        else:
+            st.info("No alerts triggered yet.")
+
+    with tab_rules:
+        if rules:
+            rules_df = pd.DataFrame(rules)
+            rules_df["metric"] = rules_df["metric"].map(METRICS).fillna(rules_df["metric"])
+            st.dataframe(
+                rules_df[["name", "geo_type", "metric", "view", "operator", "threshold", "state", "locations"]],
+                hide_index=True,
+                use_container_width=True
+            )
+
+            to_delete = st.multiselect(
+                "Delete rules",
+                options=[rule["id"] for rule in rules],
+                format_func=lambda rule_id: next(r["name"] for r in rules if r["id"] == rule_id),
+                key="alert_delete_select"
+            )
+            if to_delete and st.button("Delete", key="alert_delete"):
+                delete_rules(to_delete)
+                st.rerun()
+        else:
+            st.info("No rules yet. Use **New Rule** to create one.")
+
+
+if __name__ == "__main__":
+    alerts_page()
@@ -0,0 +1,108 @@
+import streamlit as st
+import pandas as pd
+from src.data.anomalies import get_anomalies
+from src.data.cube import GEO_TYPES
+from src.data.data_loader import METRICS
+from src.config import ANOMALY_Z_THRESHOLD, STATE_ABBREVIATIONS
+
+
+def anomalies_page():
+    """Unusual month-over-month moves across every geography and metric"""
+    # Header section
+    st.markdown(
+        """
+        <div style='display: flex; align-items: center; gap: 10px; margin-bottom: 5px;'>
+            <h3>Anomalies</h3>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.write(
+        "Sudden jumps and drops flagged across every market each time a new month of data lands. "
+        "A move is flagged when its seasonally adjusted month-over-month change is far outside "
+        "that market's usual range (robust z-score)."
+    )
+
+    col_level, col_month, col_direction = st.columns([1, 1, 1])
+    with col_level:
+        geo_type = st.selectbox("**Geo Level**", options=GEO_TYPES[1:], index=2, key="anomaly_geo_type")
+
+    try:
+        anomalies = get_anomalies(geo_type)
+    except Exception as e:
+        st.error(f"Error scanning for anomalies: {str(e)}")
+        return
+
+    if anomalies.empty:
+        st.info(f"No anomalies found at the {geo_type} level.")
+        return
+
+    months = sorted(anomalies["date"].unique(), reverse=True)
+    with col_month:
+        month = st.selectbox(
+            "**Month**",
+            options=months,
+            format_func=lambda d: pd.Timestamp(d).strftime("%B %Y"),
+            key="anomaly_month"
+        )
+    with col_direction:
+        direction = st.selectbox("**Direction**", options=["All", "Jumps", "Drops"], key="anomaly_direction")
+
+    col_metrics, col_states = st.columns([2, 1])
+    with col_metrics:
+        metrics = st.multiselect(
+            "**Metrics**",
+            options=list(METRICS.keys()),
+            format_func=lambda m: METRICS[m],
+            placeholder="All metrics",
+            key="anomaly_metrics"
+        )
+    with col_states:
+        states = st.multiselect(
+            "**States**",
+            options=sorted(STATE_ABBREVIATIONS.values()),
+            placeholder="All states",
+            key="anomaly_states"
+        )
+
+    selected = anomalies[anomalies["date"] == month]
+    if metrics:
+        selected = selected[selected["metric"].isin(metrics)]
+    if states:
+        selected = selected[selected["state"].isin(states)]
+    if direction == "Jumps":
+        selected = selected[selected["z_score"] > 0]
+    elif direction == "Drops":
+        selected = selected[selected["z_score"] < 0]
+
+    st.write(f"**{len(selected):,} anomalies** in {pd.Timestamp(month).strftime('%B %Y')}")
+    if selected.empty:
+        st.info("No anomalies match these filters.")
+        return
+
+    display_df = selected.assign(
+        location=selected["location"].str.split(" - ", n=1).str[1],
+        metric=selected["metric"].map(METRICS).fillna(selected["metric"])
+    )
+    st.dataframe(
+        display_df[["location", "state", "metric", "previous", "value", "change", "z_score"]],
+        column_config={
+            "location": st.column_config.TextColumn("Location", width="medium"),
+            "state": st.column_config.TextColumn("State", width="small"),
+            "metric": st.column_config.TextColumn("Metric"),
+            "previous": st.column_config.NumberColumn("Previous", format="%,.2f"),
+            "value": st.column_config.NumberColumn("Value", format="%,.2f"),
+            "change": st.column_config.NumberColumn("MoM (%)", format="%+.1f"),
+            "z_score": st.column_config.NumberColumn("Z-Score", format="%+.1f"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(
+        f"Flagged at |z| ≥ {ANOMALY_Z_THRESHOLD:g}, sorted by severity. "
+        "Changes are compared with the same calendar month in earlier years, so regular seasonal swings are not flagged."
+    )
+
+
+if __name__ == "__main__":
+    anomalies_page()
@@ -0,0 +1,113 @@
+import streamlit as st
+import pandas as pd
+from src import memory
+
+
+def _megabytes(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    return df.assign(**{column: df[column] / 1024 ** 2 for column in columns if column in df.columns})
+
+
+def memory_page():
+    """Admin page for tracking down memory growth in a long-running server"""
+    # Header section
+    st.markdown(
+        """
+        <div style='display: flex; align-items: center; gap: 10px; margin-bottom: 5px;'>
+            <h3>Memory</h3>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.write("Heap snapshots, session state and cache sizes for this server process. Compare snapshots over time to find what keeps growing.")
+
+    if not memory.enabled():
+        st.info("Memory profiling is off. Set MEMORY_PROFILING_ENABLED in src/config.py and restart the server.")
+        return
+
+    col_rss, col_traced, col_button = st.columns([1, 1, 1])
+    col_rss.metric("Resident memory", f"{memory.rss_bytes() / 1024 ** 2:,.0f} MB")
+    col_traced.metric("Traced by Python", f"{memory.tracemalloc.get_traced_memory()[0] / 1024 ** 2:,.0f} MB")
+    with col_button:
+        if st.button("Take snapshot", icon=":material/photo_camera:", key="memory_snapshot"):
+            memory.take_snapshot()
+
+    tab_growth, tab_allocators, tab_sessions, tab_caches, tab_objects = st.tabs([
+        "Growth", "Allocators", "Sessions", "Caches", "Objects"
+    ])
+
+    with tab_growth:
+        samples = memory.samples()
+        if samples.empty:
+            st.info("No snapshots yet.")
+        else:
+            columns = ["rss", "traced", "session_state", "app_caches"]
+            st.line_chart(_megabytes(samples, columns).set_index("time")[columns])
+            st.caption("MB at each snapshot: resident memory, Python allocations, session state and application caches.")
+
+    with tab_allocators:
+        times = memory.snapshot_times()
+        group_by = st.radio("**Group by**", options=["lineno", "filename", "traceback"], horizontal=True,
+                            key="memory_group_by")
+        if len(times) >= 2:
+            baseline = st.selectbox(
+                "**Compare latest snapshot with**",
+                options=range(len(times) - 1),
+                format_func=lambda i: times[i].strftime("%Y-%m-%d %H:%M:%S"),
+                key="memory_baseline"
+            )
+            stats = memory.allocation_diff(baseline, group_by=group_by)
+            st.write("##### Largest growth since baseline")
+        else:
+            stats = memory.top_allocations(group_by=group_by)
+            st.write("##### Largest allocators")
+        if stats.empty:
+            st.info("No snapshots yet.")
+        else:
+            st.dataframe(
+                _megabytes(stats, ["bytes", "bytes_diff"]).dropna(axis=1, how="all"),
+                column_config={
+                    "location": st.column_config.TextColumn("Allocated at", width="large"),
+                    "bytes": st.column_config.NumberColumn("MB", format="%.2f"),
+                    "bytes_diff": st.column_config.NumberColumn("MB change", format="%+.2f"),
+                    "count": st.column_config.NumberColumn("Blocks", format="%,d"),
+                    "count_diff": st.column_config.NumberColumn("Block change", format="%+d"),
+                    "traceback": st.column_config.TextColumn("Traceback"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+
+    with tab_sessions:
+        sessions = memory.session_state_sizes()
+        if sessions.empty:
+            st.info("No connected sessions.")
+        else:
+            totals = sessions.groupby("session")["bytes"].agg(["count", "sum"]).sort_values("sum", ascending=False)
+            st.write(f"**{len(totals)} sessions** holding {sessions['bytes'].sum() / 1024 ** 2:,.1f} MB of state")
+            st.dataframe(
+                _megabytes(sessions.sort_values("bytes", ascending=False), ["bytes"]),
+                column_config={"bytes": st.column_config.NumberColumn("MB", format="%.3f")},
+                hide_index=True,
+                use_container_width=True
+            )
+
+    with tab_caches:
+        caches = memory.cache_sizes()
+        st.dataframe(
+            _megabytes(caches, ["recorded_bytes", "bytes"]),
+            column_config={
+                "recorded_bytes": st.column_config.NumberColumn("MB when stored", format="%.2f"),
+                "bytes": st.column_config.NumberColumn("MB now", format="%.2f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption("Application cache entries are re-measured now; a value that grew after it was stored was mutated in place.")
+
+    with tab_objects:
+        st.dataframe(memory.object_counts(), hide_index=True, use_container_width=True)
+        st.caption("Live objects tracked by the garbage collector, most numerous first.")
+
+
+if __name__ == "__main__":
+    memory_page()
@@ -1,14 +1,189 @@
+import os
+import re
+from bisect import bisect_left
+from typing import Optional
 import streamlit as st
 import pandas as pd
+from src.cache import cached
 
-def display_data_coverage():
+CATALOG_FILES = {
+    "coverage": "data/real_estate_data_coverage.csv",
+    "metrics": "data/real_estate_data_catalog.csv",
+    "feeds": "data/real_estate_data_feeds.csv",
+}
+
+# Columns covered by the full-text search for each catalog table
+SEARCH_COLUMNS = {
+    "coverage": ["Geography", "Description"],
+    "metrics": ["Source", "Metric", "API Name", "Description"],
+    "feeds": ["Source", "Metric", "Geo"],
+}
+
+DATE_COLUMNS = ["Freshness", "Last Updated", "Next Update"]
+CATEGORY_COLUMNS = ["Source", "Geo", "Geography"]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Most vocabulary terms whose postings are merged for a prefix once another word has
+# matched; broader prefixes filter those matches instead of merging
+MAX_PREFIX_TERMS = 64
+
+
+def _catalog_version(path: str) -> int:
+    """Modification time of a catalog file, used to invalidate cached frames."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+@cached("catalog")
+def _read_catalog(name: str, path: str, version: int) -> pd.DataFrame:
+    df = pd.read_csv(path)
+
+    # Rename the 'Zillow' column to 'API Name' for clarity
+    if name == "metrics":
+        df = df.rename(columns={'Zillow': 'API Name'})
+
+    # Type the columns once so reruns never re-parse them
+    for column in df.columns:
+        if column in DATE_COLUMNS:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+        elif column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype("category")
+        elif df[column].dtype == object:
+            df[column] = df[column].astype("string")
+    return df.reset_index(drop=True)
+
+
+def load_catalog(name: str) -> pd.DataFrame:
+    """Load a catalog table, re-reading it only when the file changes."""
+    path = CATALOG_FILES[name]
+    return _read_catalog(name, path, _catalog_version(path))
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN.findall(str(text).lower())
+
+
+@cached("catalog_index")
+def _build_search_index(versions: tuple) -> tuple:
+    """Build one inverted index over every catalog table.
+
+    Returns a sorted vocabulary, for each term the set of (table, row) pairs
+    containing it, and for each (table, row) its terms. Prefix lookups bisect
+    the vocabulary instead of scanning rows, and only the narrowest query word
+    merges more than MAX_PREFIX_TERMS posting lists.
+    """
+    postings = {}
+    row_terms = {}
+    for name, columns in SEARCH_COLUMNS.items():
+        try:
+            df = load_catalog(name)
+        except FileNotFoundError:
+            continue
+        for column in columns:
+            if column not in df.columns:
+                continue
+            for row, value in enumerate(df[column].astype("string").fillna("")):
+                for term in tokenize(value):
+                    postings.setdefault(term, set()).add((name, row))
+                    row_terms.setdefault((name, row), set()).add(term)
+
+    terms = sorted(postings)
+    return (
+        terms,
+        [frozenset(postings[term]) for term in terms],
+        {key: tuple(sorted(words)) for key, words in row_terms.items()},
+    )
+
+
+def _has_prefix(sorted_terms: tuple, word: str) -> bool:
+    position = bisect_left(sorted_terms, word)
+    return position < len(sorted_terms) and sorted_terms[position].startswith(word)
+
+
+def search_catalog(query: str) -> Optional[dict]:
+    """Return matching row positions per catalog table for a search query.
+
+    Every query word must prefix-match a word in the row, mirroring the
+    incremental way users type. Returns None when the query is empty.
+    """
+    words = tokenize(query)
+    if not words:
+        return None
+
+    terms, postings, row_terms = _build_search_index(
+        tuple(_catalog_version(path) for path in CATALOG_FILES.values())
+    )
+    ranges = []
+    for word in words:
+        start = bisect_left(terms, word)
+        ranges.append((word, start, bisect_left(terms, word + "\uffff", lo=start)))
+
+    # Narrowest prefixes first, so broad ones only filter an already small set.
+    # The narrowest word always merges its whole range so no match is dropped.
+    matches = None
+    for word, start, end in sorted(ranges, key=lambda r: r[2] - r[1]):
+        if matches is None:
+            matches = set().union(*postings[start:end])
+        elif end - start > MAX_PREFIX_TERMS:
+            matches = {key for key in matches if _has_prefix(row_terms[key], word)}
+        else:
+            matches &= set().union(*postings[start:end])
+        if not matches:
+            break
+
+    results = {name: [] for name in CATALOG_FILES}
+    for name, row in matches or ():
+        results[name].append(row)
+    return {name: sorted(rows) for name, rows in results.items()}
+
+
+def sources_page():
+    """Data sources page with a single search across metrics, feeds and coverage"""
+    # Header section
+    st.markdown(
+        """
+        <div style='display: flex; align-items: center; gap: 10px; margin-bottom: 5px;'>
+            <h3>Sources</h3>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.write("Browse the metrics, data feeds and geographic coverage of the major real estate data providers")
+
+    search_term = st.text_input(
+        "Search",
+        placeholder="🔍 Search metrics, feeds and geographies",
+        label_visibility="collapsed",
+        key="sources_search"
+    )
+    matches = search_catalog(search_term)
+
+    tab_metrics, tab_feeds, tab_coverage = st.tabs(["Metrics", "Data Feeds", "Coverage"])
+    with tab_metrics:
+        display_metrics_table(None if matches is None else matches["metrics"])
+    with tab_feeds:
+        display_data_feeds_table(None if matches is None else matches["feeds"])
+    with tab_coverage:
+        display_data_coverage(None if matches is None else matches["coverage"])
+
+
+def display_data_coverage(rows: list = None):
     """
     Creates and displays a formatted table showing geographic coverage
     across different real estate data providers.
     """
     
-    # Create DataFrame
-    df = pd.read_csv("data/real_estate_data_coverage.csv")
+    # Load the cached catalog, keeping only search matches
+    try:
+        df = load_catalog("coverage")
+    except FileNotFoundError as e:
+        st.error(f"Error loading data: {str(e)}")
+        return
+    if rows is not None:
+        df = df.iloc[rows]
     
     # Custom CSS for styling
     st.markdown("""
@@ -90,28 +265,19 @@ def display_data_coverage():
     """, unsafe_allow_html=True)
 
 
-def display_metrics_table():
+def display_metrics_table(rows: list = None):
     """
     Creates and displays a formatted table showing real estate metrics
     from different sources (Zillow, Redfin, Realtor).
     """
-    # Read and process the data
-    data = {
-        'Source': [],
-        'Metric': [],
-        'API Name': [],
-        'Description': []
-    }
-    
-    # Create DataFrame from the raw data
+    # Load the cached catalog, keeping only search matches
     try:
-        df = pd.read_csv('data/real_estate_data_catalog.csv')
+        df = load_catalog("metrics")
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return
-    
-    # Rename the 'Zillow' column to 'API Name' for clarity
-    df = df.rename(columns={'Zillow': 'API Name'})
+    if rows is not None:
+        df = df.iloc[rows]
     
     # Custom CSS to style the table
     st.markdown("""
@@ -146,27 +312,9 @@ def display_metrics_table():
         </div>
     """, unsafe_allow_html=True)
     
-    # Create two columns for search and filter
-    col1, col2 = st.columns([2, 1])
-    
-    # Add search functionality in the first column
-    with col1:
-        search_term = st.text_input("🔍 Search metrics")
-    
-    # Add source filter in the second column
-    with col2:
-        sources = ['All'] + sorted(df['Source'].unique().tolist())
-        selected_source = st.selectbox("Filter by Source", sources)
-    
-    # Filter the dataframe based on search term
-    if search_term:
-        search_mask = (
-            df['Metric'].str.contains(search_term, case=False) |
-            df['Description'].str.contains(search_term, case=False) |
-            df['Source'].str.contains(search_term, case=False) |
-            df['API Name'].str.contains(search_term, case=False)
-        )
-        df = df[search_mask]
+    # Add source filter
+    sources = ['All'] + sorted(df['Source'].cat.categories.tolist())
+    selected_source = st.selectbox("Filter by Source", sources, key="metrics_source")
     
     # Filter by source if not "All"
     if selected_source != 'All':
@@ -221,13 +369,19 @@ def display_metrics_table():
         </div>
     """, unsafe_allow_html=True)
 
-def display_data_feeds_table():
+def display_data_feeds_table(rows: list = None):
     """
     Creates and displays a formatted table showing real estate data feeds
     from different sources with filtering and search capabilities.
     """
-    # Read the data
-    df = pd.read_csv('data/real_estate_data_feeds.csv')
+    # Load the cached catalog, keeping only search matches
+    try:
+        df = load_catalog("feeds")
+    except FileNotFoundError as e:
+        st.error(f"Error loading data: {str(e)}")
+        return
+    if rows is not None:
+        df = df.iloc[rows]
     
     # Custom CSS for the table
     st.markdown("""
@@ -262,43 +416,27 @@ def display_data_feeds_table():
         </div>
     """, unsafe_allow_html=True)
     
-    # Create three columns for filters
-    col1, col2, col3 = st.columns([2, 1, 1])
+    # Create columns for filters
+    col1, col2 = st.columns(2)
     
-    # Add search functionality in the first column with a unique key
+    # Add source filter in the first column with a unique key
     with col1:
-        search_term = st.text_input(
-            "🔍 Search metrics",
-            key="data_feeds_search"  # Added unique key
-        )
-    
-    # Add source filter in the second column with a unique key
-    with col2:
-        sources = ['All'] + sorted(df['Source'].unique().tolist())
+        sources = ['All'] + sorted(df['Source'].cat.categories.tolist())
         selected_source = st.selectbox(
             "Filter by Source",
             sources,
             key="data_feeds_source"  # Added unique key
         )
     
-    # Add geography filter in the third column with a unique key
-    with col3:
-        geos = ['All'] + sorted(df['Geo'].unique().tolist())
+    # Add geography filter in the second column with a unique key
+    with col2:
+        geos = ['All'] + sorted(df['Geo'].cat.categories.tolist())
         selected_geo = st.selectbox(
             "Filter by Geography",
             geos,
             key="data_feeds_geo"  # Added unique key
         )
     
-    # Filter the dataframe based on search term
-    if search_term:
-        search_mask = (
-            df['Metric'].str.contains(search_term, case=False) |
-            df['Source'].str.contains(search_term, case=False) |
-            df['Geo'].str.contains(search_term, case=False)
-        )
-        df = df[search_mask]
-    
     # Filter by source if not "All"
     if selected_source != 'All':
         df = df[df['Source'] == selected_source]
@@ -382,6 +520,4 @@ def display_data_feeds_table():
 
 # Example usage:
 if __name__ == "__main__":
-    display_data_coverage()
-    display_metrics_table()
-    display_data_feeds_table()
+    sources_page()
@@ -0,0 +1,27 @@
+"""Precompute peer percentile ranks for every geo level and view.
+
+Run after each data release, so the Overview page only reads ranks from disk.
+Ranks are written under PERCENTILES_DIR, keyed by the dataset version, and ranks
+of older versions are removed.
+
+    python -m scripts.build_percentiles [--out data/cache/percentiles]
+"""
+import argparse
+import time
+
+from src.config import PERCENTILES_DIR
+from src.data.percentiles import precompute_percentiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=PERCENTILES_DIR)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    paths = precompute_percentiles(directory=args.out)
+    print(f"Wrote {len(paths)} rank files to {args.out} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Render a static market report for every geography of a level.
+
+Reports carry the Overview page's metric cards, comparison table and charts for
+each requested view. The level's cube is built once and written to disk; worker
+processes memory-map it, so each reads only the rows it renders. Finished reports
+are logged in a manifest, so an interrupted run resumes where it stopped and a
+rerun only redoes geographies whose data changed.
+
+    python -m scripts.build_reports --level County --out build/reports [--workers 16]
+        [--views Value YoY] [--pdf] [--limit 100]
+
+PDF output needs the optional weasyprint and vl-convert-python packages.
+"""
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.batch import Manifest, export_cube, open_cube, row_fingerprint, slugify, write_atomic
+from src.components.report import REPORT_VIEWS, location_history, render_report_html
+from src.data.cube import GEO_TYPES, get_cube
+
+TASK_SIZE = 16
+
+_cube = None
+
+
+def _init_worker(cube_dir: str) -> None:
+    global _cube
+    _cube = open_cube(cube_dir)
+
+
+def _render(positions: list, fingerprints: list, out_dir: str, views: list, pdf: bool) -> list:
+    """Render one batch of geographies and return their manifest entries."""
+    entries = []
+    for position, fingerprint in zip(positions, fingerprints):
+        location = _cube["labels"][position]
+        display_name = _cube["display_names"][position]
+        df = location_history(_cube["dates"], _cube["values"][position], _cube["metrics"])
+        if df.empty:
+            continue
+
+        path = os.path.join(slugify(_cube["geo_type"]), f"{slugify(display_name)}.{'pdf' if pdf else 'html'}")
+        target = os.path.join(out_dir, path)
+        report = render_report_html(location, display_name, df, views, static_charts=pdf)
+        if pdf:
+            from weasyprint import HTML
+
+            report = HTML(string=report).write_pdf()
+        write_atomic(target, report)
+        entries.append({"location": location, "name": display_name, "path": path, "fingerprint": fingerprint})
+    return entries
+
+
+def write_index(manifest: Manifest, out_dir: str, geo_type: str) -> None:
+    entries = sorted(
+        (e for e in manifest.entries.values() if e["location"].startswith(f"{geo_type} - ")),
+        key=lambda e: e["name"],
+    )
+    links = "".join(f'<li><a href="{html.escape(e["path"])}">{html.escape(e["name"])}</a></li>' for e in entries)
+    with open(os.path.join(out_dir, f"{slugify(geo_type)}.html"), "w") as f:
+        f.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{geo_type} reports</title></head>"
+                f"<body><h1>{geo_type} market reports</h1><ul>{links}</ul></body></html>")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--level", choices=GEO_TYPES, required=True)
+    parser.add_argument("--out", default="build/reports")
+    parser.add_argument("--views", nargs="+", choices=REPORT_VIEWS, default=["Value", "YoY"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--pdf", action="store_true", help="write PDF instead of HTML")
+    parser.add_argument("--limit", type=int, help="only the first N geographies, for trial runs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    os.makedirs(os.path.join(args.out, slugify(args.level)), exist_ok=True)
+    cube = get_cube(args.level)
+    cube_dir = os.path.join(args.out, ".cube", slugify(args.level))
+    export_cube(cube, cube_dir)
+
+    manifest = Manifest(os.path.join(args.out, "manifest.jsonl"))
+    options = f"{','.join(args.views)}|{'pdf' if args.pdf else 'html'}"
+    positions = range(len(cube.labels))[:args.limit]
+    todo = []
+    for position in positions:
+        fingerprint = row_fingerprint(cube, position, options)
+        if not manifest.is_current(cube.labels[position], fingerprint, args.out):
+            todo.append((position, fingerprint))
+    print(f"{len(positions) - len(todo):,} of {len(positions):,} {args.level} reports are current; "
+          f"rendering {len(todo):,} on {args.workers} workers")
+
+    done = 0
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(cube_dir,)) as pool:
+        futures = [
+            pool.submit(
+                _render,
+                [p for p, _ in todo[i:i + TASK_SIZE]],
+                [f for _, f in todo[i:i + TASK_SIZE]],
+                args.out, args.views, args.pdf,
+            )
+            for i in range(0, len(todo), TASK_SIZE)
+        ]
+        for future in as_completed(futures):
+            entries = future.result()
+            # Recorded as batches finish, so an interrupted run keeps its progress
+            manifest.record(entries)
+            done += len(entries)
+            print(f"\r{done:,} / {len(todo):,} rendered", end="", flush=True)
+
+    write_index(manifest, args.out, args.level)
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Prerender Overview pages for the most visited locations as a static site.
+
+Pages cover DEFAULT_LOCATIONS plus the top SITE_TOP_LOCATIONS of the popularity
+log, with the Overview metric cards, comparison table and charts for every view.
+Charts are Vega-Lite specs whose data lives in shared files under data/, named by
+a hash of their rows, so identical series are stored once. Each data file also
+gets a precompressed .gz copy for servers that serve those (e.g. nginx
+gzip_static); any static file server works without them.
+
+Rebuilds are incremental: only locations whose data changed since the last build
+are rendered again, and data files no page references any more are removed.
+
+    python -m scripts.build_site --out build/site [--top 300] [--workers 8]
+"""
+import argparse
+import gzip
+import html
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.batch import Manifest, export_cube, open_cube, row_fingerprint, slugify, write_atomic
+from src.components.report import REPORT_VIEWS, location_history, render_report_html
+from src.config import SITE_TOP_LOCATIONS
+from src.data.cube import GEO_TYPES, get_cube
+
+DATA_DIR = "data"
+TASK_SIZE = 8
+
+_cubes = {}
+
+
+def _init_worker(cube_dirs: dict) -> None:
+    for geo_type, directory in cube_dirs.items():
+        _cubes[geo_type] = open_cube(directory)
+
+
+def _write_dataset(out_dir: str, name: str, rows: list) -> None:
+    path = os.path.join(out_dir, DATA_DIR, f"{name}.json")
+    if os.path.exists(path):
+        # Named by content, so an existing file already holds these rows
+        return
+    data = json.dumps(rows, separators=(",", ":")).encode()
+    write_atomic(f"{path}.gz", gzip.compress(data, mtime=0))
+    write_atomic(path, data)
+
+
+def _render(jobs: list, out_dir: str) -> list:
+    """Render one batch of (geo_type, position, fingerprint) pages and return their manifest entries."""
+    entries = []
+    for geo_type, position, fingerprint in jobs:
+        cube = _cubes[geo_type]
+        location = cube["labels"][position]
+        display_name = cube["display_names"][position]
+        df = location_history(cube["dates"], cube["values"][position], cube["metrics"])
+        if df.empty:
+            continue
+
+        datasets = {}
+        page = render_report_html(location, display_name, df, REPORT_VIEWS, datasets=datasets,
+                                  data_url=f"../{DATA_DIR}/")
+        for name, rows in datasets.items():
+            _write_dataset(out_dir, name, rows)
+        path = os.path.join(slugify(geo_type), f"{slugify(display_name)}.html")
+        write_atomic(os.path.join(out_dir, path), page)
+        entries.append({"location": location, "name": display_name, "path": path,
+                        "fingerprint": fingerprint, "datasets": sorted(datasets)})
+    return entries
+
+
+def remove_unused_datasets(manifest: Manifest, out_dir: str) -> int:
+    used = {name for entry in manifest.entries.values() for name in entry.get("datasets", [])}
+    removed = 0
+    for file in os.listdir(os.path.join(out_dir, DATA_DIR)):
+        if file.split(".", 1)[0] not in used:
+            os.remove(os.path.join(out_dir, DATA_DIR, file))
+            removed += 1
+    return removed
+
+
+def write_index(manifest: Manifest, out_dir: str) -> None:
+    by_level = defaultdict(list)
+    for entry in manifest.entries.values():
+        by_level[entry["location"].split(" - ", 1)[0]].append(entry)
+    sections = []
+    for geo_type in GEO_TYPES:
+        entries = sorted(by_level.get(geo_type, []), key=lambda e: e["name"])
+        if entries:
+            links = "".join(f'<li><a href="{html.escape(e["path"])}">{html.escape(e["name"])}</a></li>'
+                            for e in entries)
+            sections.append(f"<h2>{geo_type}</h2><ul>{links}</ul>")
+    write_atomic(os.path.join(out_dir, "index.html"),
+                 "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Housing market overviews</title></head>"
+                 f"<body><h1>Housing market overviews</h1>{''.join(sections)}</body></html>")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="build/site")
+    parser.add_argument("--top", type=int, default=SITE_TOP_LOCATIONS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    # Imported here: src.warmup pulls in Streamlit, which workers do not need
+    from src.warmup import warmup_locations
+
+    start = time.perf_counter()
+    os.makedirs(os.path.join(args.out, DATA_DIR), exist_ok=True)
+    cubes = {geo_type: get_cube(geo_type) for geo_type in GEO_TYPES}
+    positions = {
+        label: (geo_type, position)
+        for geo_type, cube in cubes.items()
+        for position, label in enumerate(cube.labels)
+    }
+    locations = warmup_locations(positions, args.top)
+
+    manifest = Manifest(os.path.join(args.out, "manifest.jsonl"))
+    todo = []
+    for location in locations:
+        geo_type, position = positions[location]
+        fingerprint = row_fingerprint(cubes[geo_type], position, f"site|{','.join(REPORT_VIEWS)}")
+        if not manifest.is_current(location, fingerprint, args.out):
+            todo.append((geo_type, position, fingerprint))
+    print(f"{len(locations) - len(todo):,} of {len(locations):,} pages are current; "
+          f"rendering {len(todo):,} on {args.workers} workers")
+
+    cube_dirs = {}
+    for geo_type in sorted({job[0] for job in todo}):
+        os.makedirs(os.path.join(args.out, slugify(geo_type)), exist_ok=True)
+        cube_dirs[geo_type] = os.path.join(args.out, ".cube", slugify(geo_type))
+        export_cube(cubes[geo_type], cube_dirs[geo_type])
+
+    done = 0
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(cube_dirs,)) as pool:
+        futures = [pool.submit(_render, todo[i:i + TASK_SIZE], args.out) for i in range(0, len(todo), TASK_SIZE)]
+        for future in as_completed(futures):
+            entries = future.result()
+            manifest.record(entries)
+            done += len(entries)
+            print(f"\r{done:,} / {len(todo):,} rendered", end="", flush=True)
+
+    removed = remove_unused_datasets(manifest, args.out)
+    write_index(manifest, args.out)
+    print(f"\nRemoved {removed:,} unused data files. Finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
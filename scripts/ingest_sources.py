@@ -0,0 +1,37 @@
+"""Load Zillow and Redfin files into the partitioned multi-source store.
+
+Zillow research CSVs are wide, with one column per month, and carry one metric per
+file (named in the file name, see METRIC_MAP). They are melted a chunk of regions at
+a time, so memory stays bounded however large the file. Redfin market tracker files
+are long and are read in chunks of rows. Every row is matched to the Realtor.com
+geography it describes, so one location string looks up all providers.
+
+    python -m scripts.ingest_sources zillow data/raw/Zip_mlp_uc_sfrcondo_sm_month.csv [more files...]
+    python -m scripts.ingest_sources redfin data/raw/zip_code_market_tracker.tsv000.gz
+"""
+import argparse
+import time
+
+from src.config import SOURCES_STORE_PATH
+from src.data.ingest import READERS, ingest_file, load_resolver
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", choices=sorted(READERS))
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--store", default=SOURCES_STORE_PATH)
+    args = parser.parse_args()
+
+    resolver = load_resolver()
+    for path in args.paths:
+        started = time.perf_counter()
+        stats = ingest_file(args.source, path, resolver, args.store)
+        print(
+            f"{path}: {stats['rows']:,} rows in {stats['files']} files, "
+            f"{stats['unmatched']:,} unmatched regions, {time.perf_counter() - started:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Run the app with the cache warm-up starting at server start.
+
+    python serve.py [streamlit run options]
+
+`streamlit run app.py` warms the same caches, but only once the first session
+opens. Point the load balancer's health check at WARMUP_READY_PORT.
+"""
+import sys
+
+from streamlit.web import cli as stcli
+
+from src.warmup import start_warmup
+
+if __name__ == "__main__":
+    start_warmup()
+    sys.argv = ["streamlit", "run", "app.py", *sys.argv[1:]]
+    sys.exit(stcli.main())
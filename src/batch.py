@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+from src.data.cube import MetricCube, month_to_timestamp
+
+# Helpers shared by the offline report and static-site builders
+
+
+def slugify(text: str) -> str:
+    """File-name friendly form of a location name."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def write_atomic(path: str, data) -> None:
+    """Write text or bytes via a temporary file, so readers never see a partial file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def export_cube(cube: MetricCube, directory: str) -> None:
+    """Write a cube's values as a .npy file plus JSON metadata, for workers to memory-map."""
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "values.npy"), cube.values)
+    meta = {
+        "geo_type": cube.geo_type,
+        "labels": list(cube.labels),
+        "display_names": list(cube.display_names),
+        "months": cube.months.tolist(),
+        "metrics": list(cube.metrics),
+    }
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def open_cube(directory: str) -> dict:
+    """Open an exported cube read-only; the values stay on disk and are paged in on demand."""
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    meta["values"] = np.load(os.path.join(directory, "values.npy"), mmap_mode="r")
+    meta["dates"] = [month_to_timestamp(month) for month in meta["months"]]
+    return meta
+
+
+def row_fingerprint(cube: MetricCube, position: int, options: str = "") -> str:
+    """Hash of one geography's data and the build options, to detect what changed."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(cube.values[position]).tobytes())
+    digest.update(cube.months.tobytes())
+    digest.update(f"{cube.labels[position]}|{','.join(cube.metrics)}|{options}".encode())
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Append-only JSON-lines log of built outputs, so interrupted runs resume and
+    rebuilds only redo geographies whose fingerprint changed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by an interrupted run
+                        continue
+                    self.entries[entry["location"]] = entry
+
+    def is_current(self, location: str, fingerprint: str, root: str) -> bool:
+        entry = self.entries.get(location)
+        return (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and os.path.exists(os.path.join(root, entry["path"]))
+        )
+
+    def record(self, entries: list) -> None:
+        with open(self.path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+                self.entries[entry["location"]] = entry
@@ -0,0 +1,262 @@
+import functools
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from src import perf
+from src.cancel import check_cancelled
+from src.config import CACHE_BUDGET_MB
+
+logger = logging.getLogger(__name__)
+
+# Never traversed when sizing: shared by every value and not owned by the cache
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def estimate_size(value) -> int:
+    """Approximate bytes held by a value, counting shared objects once."""
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIP_TYPES):
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, np.ndarray):
+            if isinstance(obj.base, np.ndarray):
+                # Views share their base's buffer
+                stack.append(obj.base)
+                continue
+            total += obj.nbytes
+            if obj.dtype == object:
+                total += sum(sys.getsizeof(item) for item in obj.flat)
+        elif isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+            total += int(np.sum(obj.memory_usage(deep=True)))
+        elif isinstance(obj, (str, bytes, int, float, bool, type(None))):
+            total += sys.getsizeof(obj)
+        elif isinstance(obj, dict):
+            total += sys.getsizeof(obj)
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            total += sys.getsizeof(obj)
+            stack.extend(obj)
+        else:
+            total += sys.getsizeof(obj)
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
+
+@dataclass
+class _Entry:
+    value: object
+    size: int
+    cost: float
+    priority: float
+    stamp: int
+    created: int
+
+
+class CacheManager:
+    """One memory budget shared by every application cache.
+
+    Eviction follows GreedyDual-Size: an entry's priority is the inflation value L
+    plus its recompute seconds per byte, refreshed on every hit. The lowest priority
+    entry is evicted first and L rises to its priority, so entries that are cheap
+    to rebuild, large, or long unused go first.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget = budget_bytes
+        self.used = 0
+        self._entries = {}
+        self._heap = []
+        self._inflation = 0.0
+        self._stamps = itertools.count()
+        self._stats = {}
+        self._lock = threading.RLock()
+        self._key_locks = {}
+
+    def _cache_stats(self, cache: str) -> dict:
+        return self._stats.setdefault(cache, {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0})
+
+    def _report(self, cache: str) -> None:
+        stats = self._stats[cache]
+        perf.gauge(f"cache.{cache}.entries", stats["entries"])
+        perf.gauge(f"cache.{cache}.bytes", stats["bytes"])
+        perf.gauge("cache.bytes", self.used)
+
+    def _prioritize(self, full_key: tuple, entry: _Entry) -> None:
+        entry.priority = self._inflation + entry.cost / max(entry.size, 1)
+        entry.stamp = next(self._stamps)
+        heapq.heappush(self._heap, (entry.priority, entry.stamp, full_key))
+        # Every hit leaves a superseded record behind; rebuild before they outnumber live ones
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(e.priority, e.stamp, k) for k, e in self._entries.items()]
+            if full_key not in self._entries:
+                self._heap.append((entry.priority, entry.stamp, full_key))
+            heapq.heapify(self._heap)
+
+    def get(self, cache: str, key) -> tuple:
+        """Return (hit, value) and refresh the entry's priority on a hit."""
+        with self._lock:
+            entry = self._entries.get((cache, key))
+            if entry is None:
+                return False, None
+            self._cache_stats(cache)["hits"] += 1
+            self._prioritize((cache, key), entry)
+        perf.increment(f"cache.{cache}.hits")
+        return True, entry.value
+
+    def version(self, cache: str, key):
+        """Stamp of when an entry was stored, or None when it is not cached.
+
+        The stamp changes whenever the entry is evicted and rebuilt, and looking
+        it up does not count as a hit.
+        """
+        with self._lock:
+            entry = self._entries.get((cache, key))
+            return None if entry is None else entry.created
+
+    def put(self, cache: str, key, value, cost: float) -> None:
+        """Store a freshly computed value, evicting others to stay within budget."""
+        size = estimate_size(value)
+        with self._lock:
+            stats = self._cache_stats(cache)
+            stats["misses"] += 1
+            perf.increment(f"cache.{cache}.misses")
+            if size > self.budget:
+                logger.warning("%s entry of %.0f MB exceeds the cache budget; not cached", cache, size / 1024 ** 2)
+                return
+
+            self._remove((cache, key))
+            self._evict(self.budget - size)
+            entry = _Entry(value, size, cost, 0.0, 0, next(self._stamps))
+            self._prioritize((cache, key), entry)
+            self._entries[(cache, key)] = entry
+            self.used += size
+            stats["entries"] += 1
+            stats["bytes"] += size
+            self._report(cache)
+
+    def _remove(self, full_key: tuple):
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self.used -= entry.size
+            stats = self._stats[full_key[0]]
+            stats["entries"] -= 1
+            stats["bytes"] -= entry.size
+        return entry
+
+    def _evict(self, limit: int) -> None:
+        while self.used > limit and self._heap:
+            priority, stamp, full_key = heapq.heappop(self._heap)
+            entry = self._entries.get(full_key)
+            if entry is None or entry.stamp != stamp:
+                # Superseded heap record
+                continue
+            self._inflation = priority
+            self._remove(full_key)
+            cache = full_key[0]
+            self._stats[cache]["evictions"] += 1
+            perf.increment(f"cache.{cache}.evictions")
+            self._report(cache)
+
+    def clear(self, cache: str = None) -> None:
+        """Drop every entry, or only those of one cache."""
+        with self._lock:
+            for full_key in [k for k in self._entries if cache is None or k[0] == cache]:
+                self._remove(full_key)
+            self._heap = [item for item in self._heap if item[2] in self._entries]
+            heapq.heapify(self._heap)
+            for name in self._stats:
+                self._report(name)
+
+    @contextmanager
+    def computing(self, cache: str, key):
+        """Serialize computation of one key so concurrent sessions build it once."""
+        with self._lock:
+            lock, waiters = self._key_locks.get((cache, key), (threading.Lock(), 0))
+            self._key_locks[(cache, key)] = (lock, waiters + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, waiters = self._key_locks[(cache, key)]
+                if waiters == 1:
+                    del self._key_locks[(cache, key)]
+                else:
+                    self._key_locks[(cache, key)] = (lock, waiters - 1)
+
+    def entries(self) -> list:
+        """(cache, key, value, recorded bytes) of every entry, for memory inspection."""
+        with self._lock:
+            return [(cache, key, entry.value, entry.size) for (cache, key), entry in self._entries.items()]
+
+    def stats(self) -> dict:
+        """Budget, bytes used and per-cache entries, bytes, hits, misses and evictions."""
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "used": self.used,
+                "caches": {name: dict(stats) for name, stats in self._stats.items()},
+            }
+
+
+_manager = CacheManager(CACHE_BUDGET_MB * 1024 ** 2)
+
+
+def get_manager() -> CacheManager:
+    return _manager
+
+
+def cached(name: str, spinner: str = None):
+    """Memoize a function in the shared, budgeted cache.
+
+    Values are shared across sessions like st.cache_resource, so callers must not
+    mutate them. Arguments must be hashable.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            hit, value = _manager.get(name, key)
+            if hit:
+                return value
+
+            with _manager.computing(name, key):
+                # Another session may have built it while we waited
+                hit, value = _manager.get(name, key)
+                if hit:
+                    return value
+                # A superseded run should not start a rebuild it will never display
+                check_cancelled()
+                show_spinner = spinner and get_script_run_ctx() is not None
+                start = time.perf_counter()
+                with st.spinner(spinner) if show_spinner else nullcontext():
+                    value = fn(*args, **kwargs)
+                _manager.put(name, key, value, time.perf_counter() - start)
+            return value
+
+        wrapper.clear = lambda: _manager.clear(name)
+        wrapper.version = lambda *args, **kwargs: _manager.version(name, (args, tuple(sorted(kwargs.items()))))
+        return wrapper
+    return decorator
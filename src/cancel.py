@@ -0,0 +1,134 @@
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from src import perf
+from src.config import WORKER_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequestType
+except ImportError:  # Older Streamlit: runs are never detected as superseded
+    get_script_run_ctx = None
+    ScriptRequestType = None
+
+
+class Cancelled(BaseException):
+    """Raised at a stage boundary when the run that requested the work was superseded.
+
+    A BaseException, like Streamlit's own rerun signal, so the pages' broad
+    `except Exception` error handlers do not swallow it.
+    """
+
+
+class CancelToken:
+    """Marks the work of one script run.
+
+    `superseded` is polled lazily; once it returns True the token stays cancelled.
+    """
+
+    def __init__(self, superseded=None):
+        self._superseded = superseded
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._cancelled.is_set() and self._superseded is not None and self._superseded():
+            self._cancelled.set()
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """Raise Cancelled if this token's run was superseded."""
+        if self.cancelled:
+            perf.increment("cancel.aborted_stages")
+            raise Cancelled()
+
+
+# Token of the run executing in this thread; worker tasks inherit their submitter's
+_NEVER = CancelToken()
+_current = contextvars.ContextVar("cancel_token", default=_NEVER)
+
+
+def current_token() -> CancelToken:
+    return _current.get()
+
+
+def check_cancelled() -> None:
+    """Stage boundary: abort if the current run was superseded."""
+    _current.get().check()
+
+
+def _script_run_superseded():
+    """Poll whether Streamlit has a rerun or stop queued for the current session."""
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+    requests = getattr(ctx, "script_requests", None)
+    if requests is None or ScriptRequestType is None:
+        return None
+    # Reads the pending request without consuming it; Streamlit acts on it at its next yield point
+    return lambda: requests._state != ScriptRequestType.CONTINUE
+
+
+@contextmanager
+def run_scope():
+    """Give the enclosed script run a fresh token and end it quietly if superseded."""
+    token = CancelToken(_script_run_superseded())
+    reset = _current.set(token)
+    try:
+        yield token
+    except Cancelled:
+        perf.increment("cancel.runs")
+    finally:
+        token.cancel()
+        _current.reset(reset)
+
+
+class CancellableExecutor:
+    """Shared thread pool whose queued tasks are dropped once their run is superseded."""
+
+    def __init__(self, max_workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="app-worker")
+
+    def submit(self, fn, *args, **kwargs):
+        token = current_token()
+        context = contextvars.copy_context()
+
+        def run():
+            if token.cancelled:
+                perf.increment("cancel.dropped_tasks")
+                raise Cancelled()
+            return context.run(fn, *args, **kwargs)
+
+        return self._pool.submit(run)
+
+    def map(self, fn, items) -> list:
+        """Run fn over items in the pool and return results in input order.
+
+        If the run is superseded, tasks that have not started are cancelled.
+        """
+        futures = [self.submit(fn, item) for item in items]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> CancellableExecutor:
+    """Process-wide executor sized by WORKER_POOL_SIZE, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = CancellableExecutor(max_workers=WORKER_POOL_SIZE or min(8, os.cpu_count() or 1))
+        return _executor
@@ -1,6 +1,10 @@
 import altair as alt
 import pandas as pd
+from src.cache import cached
 from src.data.data_loader import METRICS
+from src.data.backends import display_name_for, load_location_range
+from src.data.cube import dataset_version
+from src.data.monthly import MonthlySeries
 
 def get_metric_format(metric: str) -> str:
     """Return the appropriate format string based on metric type."""
@@ -386,39 +390,14 @@ def create_combo_chart(df: pd.DataFrame, metric: str, title: str, geo_name: str,
     """Create a combo chart with metric value line and comparison bars."""
     df = df.copy().sort_values('date')  # Ensure data is sorted by date
     
-    # Calculate comparison values based on type
-    if comparison_type == "MoM":
-        # First sort by date and then calculate the change
-        df['previous'] = df[metric].shift(1)
-        df['comparison'] = df.apply(
-            lambda row: ((row[metric] - row['previous']) / row['previous'] * 100) 
-            if pd.notnull(row['previous']) else None, 
-            axis=1
-        )
-        comparison_label = "MoM Change (%)"
-    elif comparison_type == "YoY":
-        df['previous'] = df[metric].shift(12)
-        df['comparison'] = df.apply(
-            lambda row: ((row[metric] - row['previous']) / row['previous'] * 100)
-            if pd.notnull(row['previous']) else None,
-            axis=1
-        )
-        comparison_label = "YoY Change (%)"
-    elif comparison_type == "Since 2019":
-        baseline_2019 = df[df['date'].dt.year == 2019].copy()
-        baseline_2019['month'] = baseline_2019['date'].dt.month
-        df['month'] = df['date'].dt.month
-        df = df.merge(
-            baseline_2019[['month', metric]], 
-            on='month', 
-            suffixes=('', '_2019')
-        )
-        df['comparison'] = ((df[metric] - df[f'{metric}_2019']) / df[f'{metric}_2019']) * 100
-        comparison_label = "Change Since 2019 (%)"
-    
-    # Drop the temporary columns if they exist
-    if 'previous' in df.columns:
-        df = df.drop('previous', axis=1)
+    # Compare calendar months exactly; a missing month leaves a gap rather than shifting the comparison
+    series = MonthlySeries.from_frame(df, [metric])
+    df['comparison'] = series.on_rows(series.change(metric, comparison_type))
+    comparison_label = {
+        "MoM": "MoM Change (%)",
+        "YoY": "YoY Change (%)",
+        "Since 2019": "Change Since 2019 (%)",
+    }[comparison_type]
     
     # Selection for hover interaction
     nearest = alt.selection_single(
@@ -535,10 +514,9 @@ def calculate_change(df, metric_col, change_type):
     """Calculate percentage change based on the selected view"""
     df = df.copy()
     
-    if change_type == 'MoM':  # Month over Month
-        df[metric_col] = df[metric_col].pct_change(periods=1) * 100
-    elif change_type == 'YoY':  # Year over Year
-        df[metric_col] = df[metric_col].pct_change(periods=12) * 100
+    if change_type in ('MoM', 'YoY'):  # Against the same location one or twelve calendar months earlier
+        series = MonthlySeries.from_frame(df, [metric_col])
+        df[metric_col] = series.on_rows(series.change(metric_col, change_type))
     elif change_type == 'Since 2019':
         # Get the 2019 average value
         baseline = df[df['date'].dt.year == 2019][metric_col].mean()
@@ -705,3 +683,152 @@ def create_line_chart(dfs, metric_col, metric_name, display_names, selected_peri
     )
     
     return chart
+
+## Trajectory Chart
+def create_trajectory_chart(df: pd.DataFrame, title: str, geo_name: str) -> alt.Chart:
+    """Create a line chart of z-normalized trajectories with the selected location highlighted."""
+    axis_config = get_axis_config(df)
+
+    # Similar markets in gray, selected location in black on top
+    others = alt.Chart(df[df['Location'] != geo_name]).mark_line(
+        strokeWidth=1.5,
+        opacity=0.5
+    ).encode(
+        x=alt.X('date:T', title=None, axis=alt.Axis(**axis_config)),
+        y=alt.Y('z_score:Q', title='Z-Score', axis=alt.Axis(format='.1f')),
+        color=alt.Color('Location:N', legend=None, scale=alt.Scale(scheme='greys')),
+        tooltip=[
+            alt.Tooltip('Location:N', title='Location'),
+            alt.Tooltip('date:T', title='Date', format='%b %Y'),
+            alt.Tooltip('z_score:Q', title='Z-Score', format='+.2f')
+        ]
+    )
+
+    selected = alt.Chart(df[df['Location'] == geo_name]).mark_line(
+        strokeWidth=2.5,
+        color='black'
+    ).encode(
+        x='date:T',
+        y='z_score:Q',
+        tooltip=[
+            alt.Tooltip('Location:N', title='Location'),
+            alt.Tooltip('date:T', title='Date', format='%b %Y'),
+            alt.Tooltip('z_score:Q', title='Z-Score', format='+.2f')
+        ]
+    )
+
+    chart = alt.layer(
+        others, selected
+    ).properties(
+        height=300,
+        width='container',
+        title={
+            "text": f"{title}",
+            "subtitle": [f"{geo_name} and its most similar markets"],
+            "color": "black",
+            "subtitleColor": "gray",
+            "fontSize": 16,
+            "subtitleFontSize": 12,
+            "anchor": "start"
+        }
+    ).configure_view(
+        stroke=None
+    )
+
+    return chart
+
+
+## Distribution Chart
+def create_distribution_chart(df: pd.DataFrame, metric: str, title: str, geo_name: str, child_label: str,
+                              view: str = "Value") -> alt.Chart:
+    """Create percentile bands (p10-p90, p25-p75, median) of a metric across child geographies,
+    with the parent's own series overlaid."""
+    axis_config = get_axis_config(df)
+    value_format = get_metric_format(metric) if view == "Value" else '+.1f'
+    axis_format = '~s' if view == "Value" else '+.1f'
+
+    base = alt.Chart(df).encode(
+        x=alt.X('date:T', title=None, axis=alt.Axis(**axis_config))
+    )
+
+    outer = base.mark_area(color='lightgray', opacity=0.5).encode(
+        y=alt.Y('p10:Q', title=None, scale=alt.Scale(zero=False), axis=alt.Axis(format=axis_format)),
+        y2='p90:Q'
+    )
+    inner = base.mark_area(color='darkgray', opacity=0.5).encode(
+        y='p25:Q',
+        y2='p75:Q'
+    )
+    median = base.mark_line(color='gray', strokeDash=[4, 2], strokeWidth=1.5).encode(
+        y='p50:Q'
+    )
+    parent = base.mark_line(color='black', strokeWidth=2).encode(
+        y='parent:Q'
+    )
+
+    # Invisible rule carrying the tooltip for the hovered month
+    nearest = alt.selection_single(
+        nearest=True,
+        on='mouseover',
+        fields=['date'],
+        empty='none',
+        clear='mouseout'
+    )
+    rules = base.mark_rule(color='gray').encode(
+        opacity=alt.condition(nearest, alt.value(0.5), alt.value(0)),
+        tooltip=[
+            alt.Tooltip('date:T', title='Date', format='%b %Y'),
+            alt.Tooltip('parent:Q', title=geo_name, format=value_format),
+            alt.Tooltip('p90:Q', title='90th percentile', format=value_format),
+            alt.Tooltip('p75:Q', title='75th percentile', format=value_format),
+            alt.Tooltip('p50:Q', title='Median', format=value_format),
+            alt.Tooltip('p25:Q', title='25th percentile', format=value_format),
+            alt.Tooltip('p10:Q', title='10th percentile', format=value_format),
+            alt.Tooltip('count:Q', title=f'Reporting {child_label}', format=',.0f')
+        ]
+    ).add_selection(nearest)
+
+    chart = alt.layer(
+        outer, inner, median, parent, rules
+    ).properties(
+        height=300,
+        width='container',
+        title={
+            "text": f"{title}",
+            "subtitle": [f"{geo_name} (black) against the spread of its {child_label}: 10th-90th and 25th-75th percentiles, median dashed"],
+            "color": "black",
+            "subtitleColor": "gray",
+            "fontSize": 16,
+            "subtitleFontSize": 12,
+            "anchor": "start"
+        }
+    ).configure_view(
+        stroke=None
+    )
+
+    return chart
+
+
+def create_overview_chart(df: pd.DataFrame, metric: str, title: str, geo_name: str, comparison_type: str) -> alt.Chart:
+    """Create the Overview chart for a view: area for values, seasonality, or a combo chart for changes."""
+    if comparison_type == "Value":
+        return create_area_chart(df, metric, title, geo_name)
+    if comparison_type == "Seasonality":
+        return create_seasonality_chart(df, metric, title, geo_name)
+    return create_combo_chart(df, metric, title, geo_name, comparison_type)
+
+
+@cached("overview_chart")
+def _overview_chart(location: str, metric: str, comparison_type: str, start_date, end_date, version: str) -> alt.Chart:
+    df = load_location_range(location, start_date, end_date)
+    return create_overview_chart(df, metric, METRICS[metric], display_name_for(location), comparison_type)
+
+
+def get_overview_chart(location: str, metric: str, comparison_type: str, start_date, end_date) -> alt.Chart:
+    """Overview chart for a location, view and date range, cached across sessions."""
+    return _overview_chart(location, metric, comparison_type, pd.Timestamp(start_date), pd.Timestamp(end_date), dataset_version())
+
+
+def overview_chart_version(location: str, metric: str, comparison_type: str, start_date, end_date):
+    """Cache stamp of an Overview chart (see CacheManager.version), or None when it is not cached."""
+    return _overview_chart.version(location, metric, comparison_type, pd.Timestamp(start_date), pd.Timestamp(end_date), dataset_version())
@@ -0,0 +1,46 @@
+import streamlit as st
+from src.data.export import EXPORT_FORMATS, export_data
+
+
+def create_download_popover(scopes: dict, file_stem: str, key: str) -> None:
+    """Render a download popover that streams the chosen scope to a cached file.
+
+    scopes maps a label (e.g. "This location", "All ZIPs in CA") to an export query.
+    """
+    with st.popover("Download", icon=":material/download:", use_container_width=False):
+        st.write("##### Download Data")
+
+        scope = st.radio("**Scope**", options=list(scopes), key=f"{key}_scope") if len(scopes) > 1 else next(iter(scopes))
+        fmt = st.segmented_control(
+            "**Format**",
+            options=list(EXPORT_FORMATS),
+            default="CSV",
+            key=f"{key}_format"
+        ) or "CSV"
+
+        # Files are generated on request, then served from the export cache. The
+        # button is only shown on the rerun that prepared the file, so later reruns
+        # never read an export back into memory or point at a pruned file.
+        if not st.button("Prepare file", key=f"{key}_prepare"):
+            return
+        try:
+            with st.spinner("Exporting..."):
+                path = export_data(scopes[scope], fmt)
+            with open(path, "rb") as f:
+                data = f.read()
+        except ImportError as e:
+            st.error(f"{fmt} export is unavailable: {str(e)}")
+            return
+        except FileNotFoundError:
+            st.error("The export was removed from the cache before it could be served. Please prepare it again.")
+            return
+
+        extension, mime = EXPORT_FORMATS[fmt]
+        st.download_button(
+            f"Download {fmt}",
+            data=data,
+            file_name=f"{file_stem}.{extension}",
+            mime=mime,
+            icon=":material/download:",
+            key=f"{key}_download"
+        )
@@ -2,112 +2,119 @@ import streamlit as st
 import streamlit_shadcn_ui as ui
 import pandas as pd
 from src.data.data_loader import METRICS
+from src.data.monthly import MonthlySeries, comparison_date
+from src.data.percentiles import percentile_text
 
-def create_metrics_grid(df: pd.DataFrame, display_name: str, comparison_type: str = "Value"):
+def build_metric_cards(df: pd.DataFrame, comparison_type: str = "Value", percentiles: dict = None) -> list:
     """
-    Render metrics in a grid layout with cards showing values and comparisons.
-    Maximum 4 columns per row.
+    Compute the metric cards without rendering them, so reports and worker threads can reuse them.
+    Returns one dict per metric with title, content and description, or title and error.
+    Pass peer_percentiles() for the location to add its peer ranks to the descriptions.
     """
     # Get latest date
     latest_date = df['date'].max()
+
+    # Calendar-aligned values, so comparisons hit the exact month even when months are missing
+    series = MonthlySeries.from_frame(df)
     
-    # Use METRICS dictionary instead of hardcoded list
-    metrics = list(METRICS.items())
+    cards = []
+    for metric, title in METRICS.items():
+        try:
+            # Get the latest value
+            latest_value = df[df['date'] == latest_date][metric].iloc[0]
+            
+            # Calculate delta based on comparison type
+            delta = None
+            if comparison_type == "Seasonality":
+                # Get current month
+                current_month = latest_date.month
+                
+                # Get historical values for the same month (excluding current year)
+                historical_data = df[
+                    (df['date'].dt.month == current_month) & 
+                    (df['date'].dt.year < latest_date.year)
+                ][metric]
+                
+                if not historical_data.empty:
+                    # Calculate average of historical values
+                    historical_avg = historical_data.mean()
+                    # Calculate percentage difference
+                    delta = ((latest_value - historical_avg) / historical_avg) * 100
+                    description = (
+                        f"from {latest_date.strftime('%B')} average"
+                    )
+                else:
+                    description = "no historical data available"
+            
+            elif comparison_type in ("MoM", "YoY", "Since 2019"):
+                prev_value = series.value_at(metric, comparison_date(latest_date, comparison_type))
+                if pd.notna(prev_value):
+                    delta = ((latest_value - prev_value) / prev_value) * 100
+                    description = {
+                        "MoM": "from last month",
+                        "YoY": "from last year",
+                        "Since 2019": f"since {latest_date.strftime('%B')} 2019",
+                    }[comparison_type]
+                else:
+                    description = "no 2019 data" if comparison_type == "Since 2019" else "no prior data"
+            else:  # Value
+                description = f"as of {latest_date.strftime('%B %Y')}"
+
+            # Format the value based on metric type
+            if 'price' in metric:
+                formatted_value = f"${latest_value:,.0f}"
+            elif 'ratio' in metric:
+                formatted_value = f"{latest_value:.2f}"
+            else:
+                formatted_value = f"{latest_value:,.0f}"
+            
+            # Add delta to description if available
+            if comparison_type != "Value" and delta is not None:
+                description = f"{delta:+.1f}% {description}"
+
+            # Rank among peers, precomputed for the level and month
+            if percentiles:
+                peer_text = percentile_text(percentiles, metric)
+                if peer_text:
+                    description = f"{description} · {peer_text}"
+
+            cards.append({"metric": metric, "title": title, "content": formatted_value, "description": description})
+            
+        except Exception as e:
+            cards.append({"metric": metric, "title": title, "error": str(e)})
+
+    return cards
+
+def create_metrics_grid(df: pd.DataFrame, display_name: str, comparison_type: str = "Value", cards: list = None):
+    """
+    Render metrics in a grid layout with cards showing values and comparisons.
+    Maximum 4 columns per row. Pass prebuilt cards from build_metric_cards to skip the computation.
+    """
+    if cards is None:
+        cards = build_metric_cards(df, comparison_type)
     
-    # Split metrics into rows of 4
-    for i in range(0, len(metrics), 4):
-        # Get the next 4 metrics (or fewer for the last row)
-        row_metrics = metrics[i:i+4]
+    # Split cards into rows of 4
+    for i in range(0, len(cards), 4):
+        # Get the next 4 cards (or fewer for the last row)
+        row_cards = cards[i:i+4]
         
         # Create columns for this row
         cols = st.columns(4)
         
-        # Render metrics in columns
-        for (metric, title), col in zip(row_metrics, cols):
+        # Render cards in columns
+        for card, col in zip(row_cards, cols):
             with col:
-                try:
-                    # Get the latest value
-                    latest_value = df[df['date'] == latest_date][metric].iloc[0]
-                    
-                    # Calculate delta based on comparison type
-                    delta = None
-                    if comparison_type == "Seasonality":
-                        # Get current month
-                        current_month = latest_date.month
-                        
-                        # Get historical values for the same month (excluding current year)
-                        historical_data = df[
-                            (df['date'].dt.month == current_month) & 
-                            (df['date'].dt.year < latest_date.year)
-                        ][metric]
-                        
-                        if not historical_data.empty:
-                            # Calculate average of historical values
-                            historical_avg = historical_data.mean()
-                            # Calculate percentage difference
-                            delta = ((latest_value - historical_avg) / historical_avg) * 100
-                            description = (
-                                f"from {latest_date.strftime('%B')} average"
-                            )
-                        else:
-                            description = "no historical data available"
-                    
-                    elif comparison_type == "MoM":
-                        prev_date = latest_date - pd.DateOffset(months=1)
-                        prev_date = df['date'].where(df['date'] <= prev_date).max()
-                        if prev_date:
-                            prev_value = df[df['date'] == prev_date][metric].iloc[0]
-                            delta = ((latest_value - prev_value) / prev_value) * 100
-                            description = "from last month"
-                        else:
-                            description = "no prior data"
-                    
-                    elif comparison_type == "YoY":
-                        year_ago_date = latest_date - pd.DateOffset(years=1)
-                        year_ago_date = df['date'].where(df['date'] <= year_ago_date).max()
-                        if year_ago_date:
-                            year_ago_value = df[df['date'] == year_ago_date][metric].iloc[0]
-                            delta = ((latest_value - year_ago_value) / year_ago_value) * 100
-                            description = "from last year"
-                        else:
-                            description = "no prior data"
-                    
-                    elif comparison_type == "Since 2019":
-                        baseline_2019 = df[df['date'].dt.year == 2019]
-                        if not baseline_2019.empty:
-                            current_month = latest_date.month
-                            baseline_value = baseline_2019[
-                                baseline_2019['date'].dt.month == current_month
-                            ][metric].iloc[0]
-                            delta = ((latest_value - baseline_value) / baseline_value) * 100
-                            description = f"since {latest_date.strftime('%B')} 2019"
-                        else:
-                            description = "no 2019 data"
-                    else:  # Value
-                        description = f"as of {latest_date.strftime('%B %Y')}"
+                if "error" in card:
+                    st.error(f"Error displaying metric {card['title']}: {card['error']}")
+                    continue
 
-                    # Format the value based on metric type
-                    if 'price' in metric:
-                        formatted_value = f"${latest_value:,.0f}"
-                    elif 'ratio' in metric:
-                        formatted_value = f"{latest_value:.2f}"
-                    else:
-                        formatted_value = f"{latest_value:,.0f}"
-                    
-                    # Add delta to description if available
-                    if comparison_type != "Value" and delta is not None:
-                        description = f"{delta:+.1f}% {description}"
-                    
-                    # Create a unique key using display_name, metric, and comparison_type
-                    unique_key = f"{display_name}_{metric}_{comparison_type}".lower().replace(" ", "_")
-                    
-                    # Render the card using ui.card with unique key
-                    ui.card(
-                        title=title,
-                        content=formatted_value,
-                        description=description,
-                        key=unique_key
-                    ).render()
-                    
-                except Exception as e:
-                    st.error(f"Error displaying metric {title}: {str(e)}")
+                # Create a unique key using display_name, metric, and comparison_type
+                unique_key = f"{display_name}_{card['metric']}_{comparison_type}".lower().replace(" ", "_")
+                
+                # Render the card using ui.card with unique key
+                ui.card(
+                    title=card["title"],
+                    content=card["content"],
+                    description=card["description"],
+                    key=unique_key
+                ).render()
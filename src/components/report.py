@@ -0,0 +1,145 @@
+import html
+import json
+
+import pandas as pd
+
+from src.components.charts import create_overview_chart
+from src.components.metrics import build_metric_cards
+from src.components.tables import build_comparison_table
+from src.data.data_loader import METRICS
+
+# Overview views available in static reports (Seasonality charts are interactive-only)
+REPORT_VIEWS = ["Value", "MoM", "YoY", "Since 2019"]
+
+VEGA_SCRIPTS = """
+<script src="https://cdn.jsdelivr.net/npm/vega@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-lite@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-embed@6"></script>
+"""
+
+REPORT_CSS = """
+body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; color: #374151; max-width: 1100px; margin: 2rem auto; padding: 0 1rem; }
+h1 { font-size: 1.6rem; margin-bottom: 0.2rem; }
+h2 { font-size: 1.2rem; margin-top: 2.5rem; border-bottom: 1px solid #E5E7EB; padding-bottom: 0.3rem; }
+.subtitle { color: #6B7280; margin-top: 0; }
+.cards { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.75rem; }
+.card { border: 1px solid #E5E7EB; border-radius: 12px; padding: 0.75rem 1rem; }
+.card .title { font-size: 0.8rem; color: #6B7280; }
+.card .content { font-size: 1.4rem; font-weight: 600; margin: 0.2rem 0; }
+.card .description { font-size: 0.75rem; color: #6B7280; }
+.charts { display: grid; grid-template-columns: repeat(2, 1fr); gap: 1rem; margin-top: 1rem; }
+.chart { width: 100%; }
+table { border-collapse: collapse; width: 100%; font-size: 0.85rem; margin-top: 1rem; }
+th, td { text-align: left; padding: 0.4rem 0.6rem; border-bottom: 1px solid #E5E7EB; }
+th { background: #F9FAFB; }
+@media print { .charts { grid-template-columns: 1fr 1fr; } h2 { page-break-before: always; } }
+"""
+
+
+def _anchor(view: str) -> str:
+    return view.replace(" ", "-").lower()
+
+
+def location_history(dates, values, metrics: list) -> pd.DataFrame:
+    """Long history frame for one geography from its cube row (months x metrics), without gap months."""
+    df = pd.DataFrame(values, columns=metrics)
+    df.insert(0, "date", dates)
+    return df.dropna(how="all", subset=metrics).reset_index(drop=True)
+
+
+def chart_specs(df: pd.DataFrame, display_name: str, view: str) -> dict:
+    """Vega-Lite spec of every Overview chart for one view, keyed by metric."""
+    return {
+        metric: create_overview_chart(df, metric, title, display_name, view).to_dict(validate=False)
+        for metric, title in METRICS.items()
+    }
+
+
+def externalize_datasets(spec: dict, datasets: dict, data_url: str) -> dict:
+    """Move a spec's inline datasets into `datasets` and reference them by URL instead.
+
+    Altair names datasets by a hash of their rows, so charts and pages with the
+    same data share one file.
+    """
+    names = spec.pop("datasets", {})
+    datasets.update(names)
+
+    def replace(node):
+        if isinstance(node, dict):
+            if set(node) == {"name"} and node["name"] in names:
+                return {"url": f"{data_url}{node['name']}.json"}
+            return {key: replace(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [replace(value) for value in node]
+        return node
+
+    return replace(spec)
+
+
+def _cards_html(cards: list) -> str:
+    items = []
+    for card in cards:
+        if "error" in card:
+            continue
+        items.append(
+            f'<div class="card"><div class="title">{html.escape(card["title"])}</div>'
+            f'<div class="content">{html.escape(card["content"])}</div>'
+            f'<div class="description">{html.escape(card["description"])}</div></div>'
+        )
+    return f'<div class="cards">{"".join(items)}</div>'
+
+
+def render_report_html(location: str, display_name: str, df: pd.DataFrame, views: list = None,
+                       static_charts: bool = False, datasets: dict = None, data_url: str = "data/") -> str:
+    """Self-contained HTML report with the Overview metric cards, comparison table and charts per view.
+
+    Charts are embedded as Vega-Lite specs rendered in the browser, or as inline SVG
+    when static_charts is set (needs vl-convert-python), e.g. for PDF output. When a
+    `datasets` dict is given, chart data is collected there and loaded from data_url
+    rather than inlined.
+    """
+    views = views or ["Value", "YoY"]
+    geo_type = location.split(" - ", 1)[0]
+    latest = df["date"].max()
+
+    sections = []
+    embeds = []
+    for view in views:
+        table, _ = build_comparison_table(df, view)
+        charts = []
+        for metric, spec in chart_specs(df, display_name, view).items():
+            chart_id = f"chart-{_anchor(view)}-{metric}"
+            if static_charts:
+                import vl_convert as vlc
+
+                charts.append(f'<div class="chart">{vlc.vegalite_to_svg(spec)}</div>')
+            else:
+                if datasets is not None:
+                    spec = externalize_datasets(spec, datasets, data_url)
+                charts.append(f'<div class="chart" id="{chart_id}"></div>')
+                embeds.append(f'vegaEmbed("#{chart_id}", {json.dumps(spec)}, {{"actions": false}});')
+        sections.append(
+            f'<h2 id="{_anchor(view)}">{html.escape(view)} View</h2>'
+            f"{_cards_html(build_metric_cards(df, view))}"
+            f"{table.to_html(index=False, border=0) if table is not None else ''}"
+            f'<div class="charts">{"".join(charts)}</div>'
+        )
+
+    nav = " &middot; ".join(f'<a href="#{_anchor(view)}">{html.escape(view)}</a>' for view in views)
+    scripts = "" if static_charts else f"{VEGA_SCRIPTS}<script>{''.join(embeds)}</script>"
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(display_name)} Market Report</title>
+<style>{REPORT_CSS}</style>
+</head>
+<body>
+<h1>{html.escape(display_name)}</h1>
+<p class="subtitle">{html.escape(geo_type)} market report &middot; data from realtor.com as of {latest.strftime('%B %Y')}</p>
+<p class="subtitle">{nav}</p>
+{"".join(sections)}
+{scripts}
+</body>
+</html>
+"""
@@ -2,16 +2,38 @@ import streamlit as st
 import streamlit_shadcn_ui as ui
 import pandas as pd
 from src.data.data_loader import METRICS
+from src.data.cube import get_cube
+from src.data.monthly import MonthlySeries, comparison_date
+from src.data.hierarchy import get_hierarchy, get_parents, locate
+from src.data.percentiles import ordinal
 
-def create_comparison_table(df: pd.DataFrame, display_name: str, comparison_type: str) -> None:
-    """Create a detailed comparison table showing metrics and their changes."""
+def format_metric_value(metric_col: str, value) -> str:
+    """Format a metric value for display in a table."""
+    if pd.isna(value):
+        return "-"
+    if 'price' in metric_col:
+        return f"${value:,.0f}"
+    elif 'ratio' in metric_col:
+        return f"{value:.2f}"
+    return f"{value:,.0f}"
+
+def build_comparison_table(df: pd.DataFrame, comparison_type: str, percentiles: dict = None) -> tuple:
+    """Compute the comparison table rows without rendering, so it can run on a worker thread.
+
+    Returns (table, errors) where errors are messages for metrics that could not be computed.
+    Pass peer_percentiles() for the location to add percentile columns for its level and state.
+    """
     # Get latest date
     latest_date = df['date'].max()
     
     # Use METRICS dictionary instead of hardcoded list
     metrics = list(METRICS.items())
+
+    # Calendar-aligned values, so comparisons hit the exact month even when months are missing
+    series = MonthlySeries.from_frame(df)
     
     rows = []
+    errors = []
     for metric_col, metric_name in metrics:
         try:
             # Get latest value
@@ -58,17 +80,10 @@ def create_comparison_table(df: pd.DataFrame, display_name: str, comparison_type
                     })
                 
             else:  # MoM, YoY, Since 2019
-                if comparison_type == "MoM":
-                    prev_date = latest_date - pd.DateOffset(months=1)
-                elif comparison_type == "YoY":
-                    prev_date = latest_date - pd.DateOffset(years=1)
-                elif comparison_type == "Since 2019":
-                    prev_date = pd.Timestamp(year=2019, month=latest_date.month, day=1)
-                
-                prev_date = df['date'].where(df['date'] <= prev_date).max()
+                prev_date = comparison_date(latest_date, comparison_type)
+                prev_value = series.value_at(metric_col, prev_date)
                 
-                if prev_date is not None:
-                    prev_value = df[df['date'] == prev_date][metric_col].iloc[0]
+                if pd.notna(prev_value):
                     raw_delta = latest_value - prev_value
                     pct_change = ((latest_value - prev_value) / prev_value) * 100
                     
@@ -85,28 +100,49 @@ def create_comparison_table(df: pd.DataFrame, display_name: str, comparison_type
                         "Change": formatted_delta,
                         "Change (%)": f"{pct_change:+.1f}%"
                     })
+                else:
+                    row.update({
+                        f"{latest_date.strftime('%B %Y')}": formatted_latest,
+                        f"{prev_date.strftime('%B %Y')}": "-",
+                        "Change": "-",
+                        "Change (%)": "-"
+                    })
+
+            if percentiles:
+                groups = percentiles["_groups"]
+                ranks = percentiles.get(metric_col) or {}
+                for key in ("level", "state"):
+                    if groups[key]:
+                        rank = ranks.get(key)
+                        row[f"Percentile ({groups[key]})"] = ordinal(rank) if rank is not None else "-"
                 
             rows.append(row)
             
         except Exception as e:
-            st.error(f"Error processing {metric_name}: {str(e)}")
-    
-    # Create DataFrame and display table
-    if rows:
-        df_table = pd.DataFrame(rows)
+            errors.append(f"Error processing {metric_name}: {str(e)}")
+
+    return (pd.DataFrame(rows) if rows else None), errors
+
+
+def create_comparison_table(df: pd.DataFrame, display_name: str, comparison_type: str, geo_type: str = None,
+                            table: tuple = None) -> None:
+    """Create a detailed comparison table showing metrics and their changes.
+
+    Pass a prebuilt (table, errors) result of build_comparison_table to skip the computation.
+    """
+    df_table, errors = table if table is not None else build_comparison_table(df, comparison_type)
+    for error in errors:
+        st.error(error)
+
+    # Display table
+    if df_table is not None:
         ui.table(
             data=df_table,
             maxHeight=400
         )
         
         # Create caption
-        geo_level = (
-            "County" if ", " in display_name
-            else "Metro Area" if "Metro" in display_name or "MSA" in display_name
-            else "State" if len(display_name) == 2
-            else "Country" if display_name == "United States"
-            else "Location"
-        )
+        geo_level = geo_type or "Location"
         
         # caption = (
         #     f"Table displaying the {comparison_type} comparison for {display_name} "
@@ -155,3 +191,56 @@ def create_comparison_matrix(dfs: list, display_names: list) -> None:
         )
         
         st.caption(f"Values as of {latest_date.strftime('%B %Y')}")
+
+def create_parent_comparison_table(location: str) -> None:
+    """Compare the latest metrics of a location with its county, metro, state and the nation."""
+    locations = [location] + get_parents(location)
+
+    columns = {}
+    latest_date = None
+    for loc in locations:
+        geo_type, position = locate(loc)
+        cube = get_cube(geo_type)
+        columns[loc.split(" - ", 1)[1]] = {
+            metric_col: cube.values[position, -1, cube.metric_pos(metric_col)]
+            for metric_col in METRICS if metric_col in cube.metrics
+        }
+        latest_date = cube.latest_date if latest_date is None else max(latest_date, cube.latest_date)
+
+    rows = []
+    for metric_col, metric_name in METRICS.items():
+        row = {"Metric": metric_name}
+        for name, values in columns.items():
+            row[name] = format_metric_value(metric_col, values.get(metric_col))
+        rows.append(row)
+
+    ui.table(
+        data=pd.DataFrame(rows),
+        maxHeight=400
+    )
+    st.caption(f"Values as of {latest_date.strftime('%B %Y')}")
+
+def create_children_table(location: str, child_level: str) -> None:
+    """Show the latest metrics for every child of a location at the given level."""
+    geo_type, position = locate(location)
+    child_positions = get_hierarchy().child_positions(geo_type, position, child_level)
+    cube = get_cube(child_level)
+    latest = cube.values[child_positions, -1, :]
+
+    df_children = pd.DataFrame({"Location": cube.display_names[child_positions]})
+    column_config = {"Location": st.column_config.TextColumn("Location", width="medium")}
+    for metric_col, metric_name in METRICS.items():
+        if metric_col in cube.metrics:
+            df_children[metric_name] = latest[:, cube.metric_pos(metric_col)]
+            column_config[metric_name] = st.column_config.NumberColumn(
+                metric_name,
+                format="$%,.0f" if 'price' in metric_col else "%.2f" if 'ratio' in metric_col else "%,.0f"
+            )
+
+    st.dataframe(
+        df_children.sort_values("Location"),
+        column_config=column_config,
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(f"{len(df_children):,} {child_level.lower()} geographies as of {cube.latest_date.strftime('%B %Y')}")
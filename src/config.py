@@ -76,3 +76,96 @@ DEFAULT_LOCATIONS = [
     "County - Los Angeles, CA",
     "Zip - 90001, Los Angeles, CA"
 ]
+
+# Processed data and locally stored app state
+DATA_PATH = "data/realtor/processed/combined_data.parquet"
+
+# Zillow and Redfin data loaded with python -m scripts.ingest_sources, partitioned by
+# source and geo level. Wide files are melted SOURCE_CHUNK_ROWS regions at a time.
+SOURCES_STORE_PATH = "data/sources"
+SOURCE_CHUNK_ROWS = 2000
+
+# Query backend: "pandas" or "arrow" (in memory), "dask" (out of core), or "auto" to
+# pick pandas when the estimated in-memory size fits QUERY_BACKEND_MAX_MEMORY_MB
+QUERY_BACKEND = "auto"
+QUERY_BACKEND_MAX_MEMORY_MB = 4096
+ALERT_RULES_PATH = "data/alerts/rules.json"
+ALERT_HISTORY_PATH = "data/alerts/history.json"
+# Triggered alerts kept in the history file, newest first
+ALERT_HISTORY_MAX_RECORDS = 5000
+
+# Anomaly scan: month-over-month moves whose seasonally adjusted robust z-score reaches
+# the threshold, for series with at least ANOMALY_MIN_HISTORY observed changes
+ANOMALY_Z_THRESHOLD = 5.0
+ANOMALY_MIN_HISTORY = 24
+
+# Optional ZIP -> county/metro crosswalk (columns: zip, county_fips, cbsa_code[, res_ratio])
+GEO_CROSSWALK_PATH = "data/geo/zip_crosswalk.csv"
+
+# Optional ZIP centroids for nearby-ZIP and map-click lookups (columns: zip, lat, lon,
+# or the Census ZCTA gazetteer file with GEOID, INTPTLAT, INTPTLONG)
+ZIP_CENTROIDS_PATH = "data/geo/zip_centroids.csv"
+NEARBY_RADIUS_MILES = 10
+
+# Peer percentile ranks per (level, view), written by scripts/build_percentiles.py
+# after each data release and keyed by dataset version
+PERCENTILES_DIR = "data/cache/percentiles"
+
+# Cached export files, keyed by query hash
+EXPORT_CACHE_DIR = "data/exports"
+EXPORT_CACHE_MAX_FILES = 50
+
+# Geo levels with at least this many trajectories use the approximate similar-markets index
+SIMILARITY_ANN_MIN_ROWS = 20000
+
+# Memory budget shared by every application cache (data, cubes, charts, indexes).
+# Keep it above QUERY_BACKEND_MAX_MEMORY_MB so an in-memory backend stays cached.
+CACHE_BUDGET_MB = 6144
+
+# Shared worker pool for building charts, tables and map layers concurrently within
+# a rerun. None sizes it to the CPU count, capped at 8; 1 builds them one at a time.
+# Measure the gain on the target machine with benchmarks/parallel_charts.py.
+WORKER_POOL_SIZE = None
+
+# Overview prefetches the likely next locations (parents, siblings) after each selection,
+# using at most PREFETCH_MAX_CACHE_SHARE of the cache budget
+PREFETCH_ENABLED = True
+PREFETCH_MAX_LOCATIONS = 4
+PREFETCH_MAX_CACHE_SHARE = 0.8
+
+# Opt-in memory profiling: tracemalloc heap snapshots every MEMORY_SNAPSHOT_INTERVAL_SECONDS
+# (keeping the last MEMORY_SNAPSHOT_HISTORY), shown on the Memory admin page. Tracing
+# slows allocation, so leave it off unless investigating memory growth.
+MEMORY_PROFILING_ENABLED = False
+MEMORY_SNAPSHOT_INTERVAL_SECONDS = 600
+MEMORY_SNAPSHOT_HISTORY = 24
+MEMORY_TRACE_FRAMES = 10
+
+# Start-up cache warm-up: DEFAULT_LOCATIONS plus the most selected locations in the
+# popularity log, across every view and period. Readiness is served on WARMUP_READY_PORT
+# (503 until warm, then 200); set the port to None to disable the endpoint.
+WARMUP_ENABLED = True
+WARMUP_TOP_LOCATIONS = 20
+WARMUP_READY_PORT = 8502
+POPULARITY_LOG_PATH = "data/cache/popularity.log"
+# The log is compacted to one count line per location after this many appended selections
+POPULARITY_COMPACT_LINES = 10000
+
+# Static prerender (python -m scripts.build_site): Overview pages for DEFAULT_LOCATIONS
+# plus the most selected locations in the popularity log
+SITE_TOP_LOCATIONS = 300
+
+STATE_ABBREVIATIONS = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "District of Columbia": "DC",
+    "Florida": "FL", "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL",
+    "Indiana": "IN", "Iowa": "IA", "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA",
+    "Maine": "ME", "Maryland": "MD", "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN",
+    "Mississippi": "MS", "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV",
+    "New Hampshire": "NH", "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY",
+    "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK", "Oregon": "OR",
+    "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC", "South Dakota": "SD",
+    "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT", "Virginia": "VA",
+    "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY",
+    "Puerto Rico": "PR"
+}
@@ -0,0 +1 @@
+# Data access layer: loaders and vectorized engines over the processed data
@@ -0,0 +1,252 @@
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.config import ALERT_HISTORY_MAX_RECORDS, ALERT_HISTORY_PATH, ALERT_RULES_PATH
+from src.data.cube import GEO_TYPES, VIEWS, get_cube, month_to_timestamp
+from src.data.data_loader import METRICS
+
+OPERATORS = ["<", "<=", ">", ">="]
+
+# Upper bound on the size of a (rules x geographies) mask evaluated at once
+_MAX_MASK_CELLS = 4_000_000
+
+
+def make_rule(name: str, metric: str, view: str, operator: str, threshold: float,
+              geo_type: str, state: str = None, locations: list = None) -> dict:
+    """Validate rule fields and return a rule dict ready to be stored."""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    if view not in VIEWS:
+        raise ValueError(f"Unknown view: {view}")
+    if operator not in OPERATORS:
+        raise ValueError(f"Unknown operator: {operator}")
+    if geo_type not in GEO_TYPES:
+        raise ValueError(f"Unknown geo level: {geo_type}")
+
+    return {
+        "id": uuid.uuid4().hex[:8],
+        "name": name or f"{METRICS[metric]} {view} {operator} {threshold:g}",
+        "metric": metric,
+        "view": view,
+        "operator": operator,
+        "threshold": float(threshold),
+        "geo_type": geo_type,
+        "state": state or None,
+        "locations": list(locations) if locations else None,
+        "enabled": True,
+        "created": pd.Timestamp.now().isoformat(timespec="seconds"),
+    }
+
+
+def _read_json(path: str, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _write_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_rules(path: str = ALERT_RULES_PATH) -> list:
+    """Load alert rules from the local rules file."""
+    return _read_json(path, [])
+
+
+def save_rules(rules: list, path: str = ALERT_RULES_PATH) -> None:
+    """Persist alert rules to the local rules file."""
+    _write_json(path, rules)
+
+
+def add_rule(rule: dict, path: str = ALERT_RULES_PATH) -> list:
+    rules = load_rules(path) + [rule]
+    save_rules(rules, path)
+    return rules
+
+
+def delete_rules(rule_ids: list, path: str = ALERT_RULES_PATH) -> list:
+    rules = [rule for rule in load_rules(path) if rule["id"] not in set(rule_ids)]
+    save_rules(rules, path)
+    return rules
+
+
+def _scope_masks(rules: list, cube, state_codes: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """Return a (rules x geographies) boolean mask of the geographies each rule covers."""
+    # State scopes compare small integer codes: -1 matches every geography, len(states) matches none
+    lookup = {state: code for code, state in enumerate(states)}
+    rule_states = np.array([
+        -1 if not rule.get("state") else lookup.get(rule["state"], len(states))
+        for rule in rules
+    ])
+    mask = (rule_states[:, None] == -1) | (rule_states[:, None] == state_codes[None, :])
+
+    # Watchlist rules only cover their listed locations
+    for row, rule in enumerate(rules):
+        if rule.get("locations"):
+            mask[row] = False
+            for location in rule["locations"]:
+                try:
+                    mask[row, cube.geo_pos(location)] = True
+                except KeyError:
+                    continue
+    return mask
+
+
+def _evaluate_group(rules: list, values: np.ndarray, cube, state_codes: np.ndarray, states: np.ndarray):
+    """Evaluate rules sharing a geo level, metric and view against one value per geography."""
+    thresholds = np.array([rule["threshold"] for rule in rules], dtype=np.float64)
+    operators = [rule["operator"] for rule in rules]
+    want_lt = np.array([op in ("<", "<=") for op in operators])
+    want_eq = np.array([op in ("<=", ">=") for op in operators])
+    want_gt = np.array([op in (">", ">=") for op in operators])
+
+    # Comparisons against NaN are all False, so missing values never trigger
+    diff = values[None, :].astype(np.float64) - thresholds[:, None]
+    hits = (
+        ((diff < 0) & want_lt[:, None]) |
+        ((diff == 0) & want_eq[:, None]) |
+        ((diff > 0) & want_gt[:, None])
+    )
+    hits &= _scope_masks(rules, cube, state_codes, states)
+    return np.nonzero(hits)
+
+
+def evaluate_rules(rules: list, date=None) -> pd.DataFrame:
+    """Evaluate every enabled rule over all geographies of its level in vectorized passes.
+
+    Rules are grouped by (geo level, metric, view) so each group needs a single
+    column of values, then compared against all thresholds at once. Returns one
+    row per (rule, location) that matched for the given month (latest by default).
+    Levels without data for that month are skipped.
+    """
+    columns = ["rule_id", "rule", "location", "geo_type", "date", "metric", "view", "value", "threshold"]
+    triggered = []
+
+    levels = {}
+    for rule in rules:
+        if rule.get("enabled", True):
+            levels.setdefault(rule["geo_type"], []).append(rule)
+
+    for geo_type, level_rules in levels.items():
+        cube = get_cube(geo_type)
+        if len(cube.months) == 0:
+            continue
+        try:
+            month = len(cube.months) - 1 if date is None else cube.month_pos(date)
+        except KeyError:
+            # Levels publish on their own schedules; this one has not reached the month yet
+            continue
+        labels = cube.labels
+        state_codes, states = pd.factorize(cube.states, use_na_sentinel=True)
+
+        groups = {}
+        for rule in level_rules:
+            groups.setdefault((rule["metric"], rule["view"]), []).append(rule)
+
+        for (metric, view), group in groups.items():
+            if metric not in cube.metrics:
+                continue
+            values = cube.view(metric, view)[:, month]
+
+            # Chunk the rules so the (rules x geographies) masks stay bounded in memory
+            chunk = max(1, _MAX_MASK_CELLS // max(len(values), 1))
+            for start in range(0, len(group), chunk):
+                chunk_rules = group[start:start + chunk]
+                rule_idx, geo_idx = _evaluate_group(chunk_rules, values, cube, state_codes, states)
+                if len(rule_idx) == 0:
+                    continue
+                triggered.append(pd.DataFrame({
+                    "rule_id": np.array([rule["id"] for rule in chunk_rules], dtype=object)[rule_idx],
+                    "rule": np.array([rule["name"] for rule in chunk_rules], dtype=object)[rule_idx],
+                    "location": labels[geo_idx],
+                    "geo_type": geo_type,
+                    "date": month_to_timestamp(cube.months[month]),
+                    "metric": metric,
+                    "view": view,
+                    "value": values[geo_idx].astype(np.float64),
+                    "threshold": np.array([rule["threshold"] for rule in chunk_rules])[rule_idx],
+                }))
+
+    if not triggered:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(triggered, ignore_index=True)
+
+
+def load_history(path: str = ALERT_HISTORY_PATH) -> dict:
+    return _read_json(path, {"last_month": None, "last_months": {}, "alerts": []})
+
+
+def _record_alerts(history: dict, alerts: pd.DataFrame) -> None:
+    """Prepend triggered alerts to the history, skipping ones already recorded and
+    keeping the newest ALERT_HISTORY_MAX_RECORDS."""
+    if alerts.empty:
+        return
+    seen = {(a["rule_id"], a["location"], a["date"]) for a in history["alerts"]}
+    records = [
+        record for record in alerts.assign(date=alerts["date"].dt.strftime("%Y-%m-%d")).to_dict(orient="records")
+        if (record["rule_id"], record["location"], record["date"]) not in seen
+    ]
+    history["alerts"] = (records + history["alerts"])[:ALERT_HISTORY_MAX_RECORDS]
+
+
+def run_pending_alerts(rules: list = None, path: str = ALERT_HISTORY_PATH) -> pd.DataFrame:
+    """Evaluate rules for every data month that landed since the last run.
+
+    The last evaluated month of each geo level is stored next to the triggered
+    alerts, so each level's releases are evaluated exactly once, even when one
+    level publishes later than the others. Returns the newly triggered alerts.
+    """
+    rules = load_rules() if rules is None else rules
+    history = load_history(path)
+    # Histories written before months were tracked per level share one last month
+    last_months = history.setdefault("last_months", {})
+
+    levels = {}
+    for rule in rules:
+        levels.setdefault(rule["geo_type"], []).append(rule)
+
+    results = []
+    for geo_type, level_rules in levels.items():
+        cube = get_cube(geo_type)
+        if len(cube.months) == 0:
+            continue
+        latest = cube.latest_date
+        last = last_months.get(geo_type) or history.get("last_month")
+        last_month = pd.Timestamp(last) if last else latest - pd.DateOffset(months=1)
+
+        for month in pd.date_range(last_month + pd.DateOffset(months=1), latest, freq="MS"):
+            results.append(evaluate_rules(level_rules, month))
+        last_months[geo_type] = max(last_month, latest).strftime("%Y-%m-%d")
+
+    if not last_months:
+        return pd.DataFrame()
+    new_alerts = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+    _record_alerts(history, new_alerts)
+    history["last_month"] = max(last_months.values())
+    _write_json(path, history)
+
+    return new_alerts
+
+
+def check_rule(rule: dict, path: str = ALERT_HISTORY_PATH) -> pd.DataFrame:
+    """Evaluate a new or edited rule against the latest month of its level.
+
+    run_pending_alerts only looks at months after the last run, so without this a
+    rule saved today could not fire before the next data release.
+    """
+    history = load_history(path)
+    alerts = evaluate_rules([rule])
+    _record_alerts(history, alerts)
+    _write_json(path, history)
+    return alerts
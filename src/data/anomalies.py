@@ -0,0 +1,89 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.cancel import check_cancelled
+from src.config import ANOMALY_MIN_HISTORY, ANOMALY_Z_THRESHOLD
+from src.data.cube import dataset_version, get_cube, month_to_timestamp
+
+# Scales the median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+
+# Calendar months need this many observed changes before they are seasonally adjusted
+MIN_SEASONAL_YEARS = 3
+
+
+def _nanmedian(values: np.ndarray, axis: int) -> np.ndarray:
+    with warnings.catch_warnings():
+        # All-NaN slices (geographies without data) are expected and stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(values, axis=axis)
+
+
+def seasonally_adjusted_changes(values: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Month-over-month log changes of a (geo x month x metric) array, minus each
+    geography's median change for that calendar month."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        changes = np.full(values.shape, np.nan, dtype=np.float32)
+        changes[:, 1:] = np.log(values[:, 1:] / values[:, :-1])
+    changes[~np.isfinite(changes)] = np.nan
+
+    calendar = months % 12
+    for month in range(12):
+        columns = np.flatnonzero(calendar == month)
+        if len(columns) == 0:
+            continue
+        seasonal = _nanmedian(changes[:, columns], axis=1)
+        observed = (~np.isnan(changes[:, columns])).sum(axis=1)
+        seasonal = np.where(observed >= MIN_SEASONAL_YEARS, seasonal, 0)
+        changes[:, columns] -= seasonal[:, None, :]
+    return changes
+
+
+def robust_z_scores(changes: np.ndarray, min_history: int = ANOMALY_MIN_HISTORY) -> np.ndarray:
+    """Robust z-score of every change against its own series (median and MAD over time)."""
+    median = _nanmedian(changes, axis=1)[:, None, :]
+    mad = _nanmedian(np.abs(changes - median), axis=1)[:, None, :] * MAD_SCALE
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (changes - median) / mad
+    # Short or flat series have no meaningful spread
+    enough = (~np.isnan(changes)).sum(axis=1)[:, None, :] >= min_history
+    z[~(enough & np.isfinite(z))] = np.nan
+    return z
+
+
+@cached("anomalies", spinner="Scanning markets for anomalies...")
+def _detect(geo_type: str, threshold: float, version: str) -> pd.DataFrame:
+    cube = get_cube(geo_type)
+    z = robust_z_scores(seasonally_adjusted_changes(cube.values, cube.months))
+    check_cancelled()
+
+    with np.errstate(invalid="ignore"):
+        geo, month, metric = np.nonzero(np.abs(z) >= threshold)
+    current = cube.values[geo, month, metric].astype(np.float64)
+    previous = cube.values[geo, month - 1, metric].astype(np.float64)
+    dates = np.array([month_to_timestamp(m) for m in cube.months])
+
+    df = pd.DataFrame({
+        "date": dates[month] if len(month) else pd.Series([], dtype="datetime64[ns]"),
+        "location": cube.labels[geo],
+        "state": cube.states[geo],
+        "metric": np.array(cube.metrics, dtype=object)[metric],
+        "previous": previous,
+        "value": current,
+        "change": (current / previous - 1) * 100,
+        "z_score": z[geo, month, metric].astype(np.float64),
+    })
+    df["severity"] = df["z_score"].abs()
+    return df.sort_values(["date", "severity"], ascending=[False, False]).reset_index(drop=True)
+
+
+def get_anomalies(geo_type: str, threshold: float = ANOMALY_Z_THRESHOLD) -> pd.DataFrame:
+    """Every month-over-month move of a level whose seasonally adjusted robust z-score
+    reaches the threshold, newest and most severe first.
+
+    Computed in one pass over the level's cube and cached per dataset version, so
+    each new release is scanned once.
+    """
+    return _detect(geo_type, float(threshold), dataset_version())
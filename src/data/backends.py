@@ -0,0 +1,232 @@
+import os
+
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.config import DATA_PATH, QUERY_BACKEND, QUERY_BACKEND_MAX_MEMORY_MB
+from src.data.cube import dataset_version, location_label
+from src.data.data_loader import get_unique_locations, load_dask_data
+
+# Rough in-memory size of the processed data relative to its compressed parquet file
+PARQUET_EXPANSION = 6
+
+
+def parse_location(location: str) -> tuple:
+    """Split a "Type - Name" location into (geo_type, key column, key value).
+
+    ZIPs are matched on geo_id, every other level on geo_name.
+    """
+    geo_type, geo_name = location.split(" - ", 1)
+    if geo_type == "Zip":
+        return geo_type, "geo_id", geo_name.split(",")[0]
+    return geo_type, "geo_name", geo_name
+
+
+def display_name_for(location: str) -> str:
+    """Name shown in chart subtitles and tables for a location string."""
+    geo_type, geo_name = location.split(" - ", 1)
+    if geo_type == "Zip":
+        zip_code = geo_name.split(",")[0]
+        return f"{zip_code}, {geo_name.split(',', 1)[1]}" if "," in geo_name else zip_code
+    return geo_name
+
+
+class QueryBackend:
+    """Interface for the lookups the pages run against the processed data."""
+    name = "base"
+
+    def lookup(self, location: str) -> pd.DataFrame:
+        """Full date-sorted history of one location."""
+        raise NotImplementedError
+
+    def cross_section(self, geo_type: str, date) -> pd.DataFrame:
+        """Every geography of a level for one month."""
+        raise NotImplementedError
+
+    def dates(self) -> list:
+        """Sorted list of every month in the data."""
+        raise NotImplementedError
+
+    def date_bounds(self) -> tuple:
+        dates = self.dates()
+        return dates[0], dates[-1]
+
+    def locations(self) -> list:
+        """Catalog of "Type - Name" location strings for the search boxes."""
+        raise NotImplementedError
+
+
+def _location_catalog(geos: pd.DataFrame) -> list:
+    """Location strings for the distinct (geo_type, geo_id, geo_name) rows of a frame."""
+    geos = geos.drop_duplicates()
+    return [
+        location_label(geo_type, geo_id, geo_name)
+        for geo_type, geo_id, geo_name in zip(geos["geo_type"], geos["geo_id"], geos["geo_name"])
+    ]
+
+
+class DaskBackend(QueryBackend):
+    """Lazy Dask queries for datasets that do not fit in memory."""
+    name = "dask"
+
+    def __init__(self, ddf=None):
+        self.ddf = load_dask_data() if ddf is None else ddf
+
+    def lookup(self, location: str) -> pd.DataFrame:
+        geo_type, column, key = parse_location(location)
+        ddf = self.ddf
+        return ddf[(ddf["geo_type"] == geo_type) & (ddf[column] == key)].compute().sort_values("date")
+
+    def cross_section(self, geo_type: str, date) -> pd.DataFrame:
+        ddf = self.ddf
+        return ddf[(ddf["geo_type"] == geo_type) & (ddf["date"] == pd.Timestamp(date))].compute()
+
+    def dates(self) -> list:
+        if not hasattr(self, "_dates"):
+            self._dates = sorted(self.ddf["date"].unique().compute())
+        return self._dates
+
+    def date_bounds(self) -> tuple:
+        return self.ddf["date"].min().compute(), self.ddf["date"].max().compute()
+
+    def locations(self) -> list:
+        if not hasattr(self, "_locations"):
+            self._locations = get_unique_locations(self.ddf)
+        return self._locations
+
+
+class PandasBackend(QueryBackend):
+    """In-memory frame sorted by location and date, with precomputed row ranges.
+
+    A lookup is a dict hit plus a contiguous slice, with no scan of the frame.
+    """
+    name = "pandas"
+
+    def __init__(self, df: pd.DataFrame):
+        keys = np.where(df["geo_type"] == "Zip", df["geo_id"].astype(str), df["geo_name"].astype(str))
+        df = df.assign(_key=keys).sort_values(["geo_type", "_key", "date"], kind="stable")
+        self.df = df.drop(columns="_key").reset_index(drop=True)
+
+        # (geo_type, key) -> (start, stop) row range
+        groups = df.groupby(["geo_type", "_key"], sort=False, observed=True).size()
+        stops = np.cumsum(groups.to_numpy())
+        self._ranges = dict(zip(groups.index, zip(stops - groups.to_numpy(), stops)))
+
+        # (geo_type, date) -> row positions
+        self._sections = self.df.groupby(["geo_type", "date"], observed=True).indices
+        self._dates = sorted(self.df["date"].unique())
+
+    def lookup(self, location: str) -> pd.DataFrame:
+        geo_type, _, key = parse_location(location)
+        start, stop = self._ranges.get((geo_type, key), (0, 0))
+        return self.df.iloc[start:stop]
+
+    def cross_section(self, geo_type: str, date) -> pd.DataFrame:
+        positions = self._sections.get((geo_type, pd.Timestamp(date)))
+        if positions is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[positions]
+
+    def dates(self) -> list:
+        return [pd.Timestamp(d) for d in self._dates]
+
+    def locations(self) -> list:
+        if not hasattr(self, "_locations"):
+            self._locations = _location_catalog(self.df[["geo_type", "geo_id", "geo_name"]])
+        return self._locations
+
+
+class ArrowBackend(QueryBackend):
+    """In-memory Arrow table queried with vectorized pyarrow.compute filters."""
+    name = "arrow"
+
+    def __init__(self, df: pd.DataFrame):
+        import pyarrow as pa
+
+        self.table = pa.Table.from_pandas(df.sort_values("date"), preserve_index=False)
+        self._dates = sorted(pd.to_datetime(df["date"].unique()))
+
+    def _filter(self, **conditions) -> pd.DataFrame:
+        import pyarrow.compute as pc
+
+        mask = None
+        for column, value in conditions.items():
+            condition = pc.equal(self.table[column], value)
+            mask = condition if mask is None else pc.and_(mask, condition)
+        return self.table.filter(mask).to_pandas()
+
+    def lookup(self, location: str) -> pd.DataFrame:
+        geo_type, column, key = parse_location(location)
+        return self._filter(geo_type=geo_type, **{column: key})
+
+    def cross_section(self, geo_type: str, date) -> pd.DataFrame:
+        return self._filter(geo_type=geo_type, date=pd.Timestamp(date))
+
+    def dates(self) -> list:
+        return list(self._dates)
+
+    def locations(self) -> list:
+        if not hasattr(self, "_locations"):
+            self._locations = _location_catalog(self.table.select(["geo_type", "geo_id", "geo_name"]).to_pandas())
+        return self._locations
+
+
+BACKENDS = {
+    "pandas": PandasBackend,
+    "arrow": ArrowBackend,
+    "dask": DaskBackend,
+}
+
+
+def choose_backend(name: str = QUERY_BACKEND, path: str = DATA_PATH) -> str:
+    """Resolve "auto" to an in-memory backend when the data fits the memory limit."""
+    if name != "auto":
+        return name
+    try:
+        estimated_mb = os.path.getsize(path) * PARQUET_EXPANSION / 1024 ** 2
+    except OSError:
+        return "dask"
+    return "pandas" if estimated_mb <= QUERY_BACKEND_MAX_MEMORY_MB else "dask"
+
+
+@cached("backend", spinner="Loading market data...")
+def _load_backend(name: str, version: str) -> QueryBackend:
+    if name == "dask":
+        return DaskBackend()
+    return BACKENDS[name](load_dask_data().compute())
+
+
+def get_backend() -> QueryBackend:
+    """Return the configured query backend for the current dataset version."""
+    return _load_backend(choose_backend(), dataset_version())
+
+
+@cached("location")
+def _load_location(location: str, name: str, version: str) -> pd.DataFrame:
+    return _load_backend(name, version).lookup(location)
+
+
+def load_location(location: str) -> pd.DataFrame:
+    """Cached full history of one location, shared across sessions."""
+    return _load_location(location, choose_backend(), dataset_version())
+
+
+def slice_dates(df: pd.DataFrame, start_date, end_date) -> pd.DataFrame:
+    """Rows of a date-sorted frame from start_date to end_date inclusive.
+
+    The bounds are found by binary search and the rows are a positional slice, so
+    no mask is built over the history.
+    """
+    dates = df["date"].to_numpy()
+    start = dates.searchsorted(pd.Timestamp(start_date).to_datetime64(), side="left")
+    stop = dates.searchsorted(pd.Timestamp(end_date).to_datetime64(), side="right")
+    return df.iloc[start:stop]
+
+
+def load_location_range(location: str, start_date, end_date) -> pd.DataFrame:
+    """One location's history within a date range, sliced from the cached full history.
+
+    Switching periods never refetches the location. The slice shares the cached
+    frame's data, so callers must not modify it.
+    """
+    return slice_dates(load_location(location), start_date, end_date)
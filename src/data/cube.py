@@ -0,0 +1,159 @@
+import os
+import re
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.cancel import check_cancelled
+from src.config import DATA_PATH, STATE_ABBREVIATIONS
+from src.data.data_loader import METRICS, load_dask_data
+from src.data.monthly import month_index, month_to_timestamp, view_change
+
+# geo_type values as stored in the processed data (see location strings such as "Zip - 90001, ...")
+GEO_TYPES = ["National", "State", "Metro", "County", "Zip"]
+
+# Comparison views that can be evaluated across every geography at once
+VIEWS = ["Value", "MoM", "YoY", "Since 2019"]
+
+_STATE_SUFFIX = re.compile(r",\s*([A-Z]{2})(?:-[A-Z]{2})*\s*$")
+
+
+def dataset_version(path: str = DATA_PATH) -> str:
+    """Return a token that changes whenever the processed data file is replaced."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def location_label(geo_type: str, geo_id: str, geo_name: str) -> str:
+    """Build the "Type - Name" location string used by the search boxes."""
+    if geo_type == "Zip" and not str(geo_name).startswith(str(geo_id)):
+        return f"{geo_type} - {geo_id}, {geo_name}"
+    return f"{geo_type} - {geo_name}"
+
+
+def state_code(geo_type: str, geo_id: str, geo_name: str):
+    """Return the two-letter state of a geography, or None for the nation."""
+    if geo_type == "National":
+        return None
+    if geo_type == "State":
+        if isinstance(geo_id, str) and len(geo_id) == 2 and geo_id.isalpha():
+            return geo_id.upper()
+        return STATE_ABBREVIATIONS.get(geo_name)
+    # Metro, county and ZIP names end with the (first) state code, e.g. "Dallas, TX" or "..., NY-NJ-PA"
+    match = _STATE_SUFFIX.search(str(geo_name))
+    return match.group(1) if match else None
+
+
+@dataclass
+class MetricCube:
+    """Dense geo x month x metric array for one geographic level.
+
+    Months run contiguously from the first to the last month in the data, so
+    missing months are NaN and lagged comparisons are plain array offsets.
+    """
+    geo_type: str
+    geo_ids: np.ndarray
+    geo_names: np.ndarray
+    months: np.ndarray
+    metrics: list
+    values: np.ndarray
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex([month_to_timestamp(m) for m in self.months])
+
+    @property
+    def latest_date(self) -> pd.Timestamp:
+        return month_to_timestamp(self.months[-1])
+
+    @cached_property
+    def labels(self) -> np.ndarray:
+        return np.array([
+            location_label(self.geo_type, geo_id, name)
+            for geo_id, name in zip(self.geo_ids, self.geo_names)
+        ], dtype=object)
+
+    @cached_property
+    def display_names(self) -> np.ndarray:
+        return np.array([label.split(" - ", 1)[1] for label in self.labels], dtype=object)
+
+    @cached_property
+    def states(self) -> np.ndarray:
+        return np.array([
+            state_code(self.geo_type, geo_id, name)
+            for geo_id, name in zip(self.geo_ids, self.geo_names)
+        ], dtype=object)
+
+    def metric_pos(self, metric: str) -> int:
+        return self.metrics.index(metric)
+
+    def month_pos(self, date) -> int:
+        """Position of a date's month on the month axis (raises KeyError when out of range)."""
+        pos = int(month_index([date])[0] - self.months[0])
+        if not 0 <= pos < len(self.months):
+            raise KeyError(f"{pd.Timestamp(date):%B %Y} is outside the available data")
+        return pos
+
+    def geo_pos(self, location: str) -> int:
+        """Position of a "Type - Name" location string on the geo axis."""
+        return self._positions[location]
+
+    @cached_property
+    def _positions(self) -> dict:
+        return {label: i for i, label in enumerate(self.labels)}
+
+    def view(self, metric: str, view: str = "Value") -> np.ndarray:
+        """Return a (geo x month) array of the metric in the requested view.
+
+        MoM and YoY compare against the same geography one and twelve calendar
+        months earlier; Since 2019 compares against the same month of 2019.
+        """
+        return view_change(self.values[:, :, self.metric_pos(metric)], self.months, view)
+
+
+def build_cube(df: pd.DataFrame, geo_type: str, metrics: list = None) -> MetricCube:
+    """Pivot a long (geo, date, metrics...) frame into a dense MetricCube."""
+    metrics = [m for m in (metrics or list(METRICS.keys())) if m in df.columns]
+
+    df = df.sort_values(["geo_id", "date"])
+    geo_codes, geo_ids = pd.factorize(df["geo_id"].astype(str), sort=True)
+    names = df.groupby(geo_codes)["geo_name"].last().to_numpy(dtype=object)
+
+    months = month_index(df["date"])
+    first_month = months.min() if len(months) else 0
+    n_months = int(months.max() - first_month + 1) if len(months) else 0
+
+    values = np.full((len(geo_ids), n_months, len(metrics)), np.nan, dtype=np.float32)
+    values[geo_codes, months - first_month, :] = df[metrics].to_numpy(dtype=np.float32)
+
+    return MetricCube(
+        geo_type=geo_type,
+        geo_ids=np.asarray(geo_ids, dtype=object),
+        geo_names=names,
+        months=np.arange(first_month, first_month + n_months, dtype=np.int64),
+        metrics=metrics,
+        values=values,
+    )
+
+
+@cached("cube", spinner="Building market data cube...")
+def _load_cube(geo_type: str, version: str) -> MetricCube:
+    ddf = load_dask_data()
+    columns = ["geo_id", "geo_name", "date"] + [m for m in METRICS if m in ddf.columns]
+    df = ddf[ddf["geo_type"] == geo_type][columns].compute()
+    check_cancelled()
+    cube = build_cube(df, geo_type)
+    # Fill the lazy lookups now, so the cache budget counts them when sizing the cube
+    for name in ("labels", "display_names", "states", "_positions"):
+        getattr(cube, name)
+    return cube
+
+
+def get_cube(geo_type: str) -> MetricCube:
+    """Return the cached cube for a geo level, rebuilt whenever the data file changes."""
+    return _load_cube(geo_type, dataset_version())
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.cancel import check_cancelled
+from src.data.cube import dataset_version, get_cube
+from src.data.hierarchy import get_hierarchy, locate
+
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+BAND_COLUMNS = ["p10", "p25", "p50", "p75", "p90"]
+
+
+def grouped_quantiles(values: np.ndarray, offsets: np.ndarray, quantiles: list = QUANTILES) -> tuple:
+    """Quantiles of every column within contiguous row groups, ignoring NaN.
+
+    Rows of group g are values[offsets[g]:offsets[g + 1]]. Returns a (group x
+    column x quantile) array, interpolated linearly like np.nanquantile and NaN
+    where a group has no values, and the (group x column) count of values.
+    """
+    n_groups = len(offsets) - 1
+    valid = np.vstack([np.zeros((1, values.shape[1]), dtype=np.int64), np.cumsum(~np.isnan(values), axis=0)])
+    counts = valid[offsets[1:]] - valid[offsets[:-1]]
+    result = np.full((n_groups, values.shape[1], len(quantiles)), np.nan, dtype=np.float64)
+    if len(values) == 0:
+        return result, counts
+
+    groups = np.repeat(np.arange(n_groups), np.diff(offsets))
+    # Sort each column by value (NaN last), then stably by group: every group keeps
+    # its rows, now in ascending order within each column
+    order = np.argsort(values, axis=0, kind="stable")
+    order = np.take_along_axis(order, np.argsort(groups[order], axis=0, kind="stable"), axis=0)
+    ordered = np.take_along_axis(values, order, axis=0)
+
+    starts = offsets[:-1, None]
+    last = len(values) - 1
+    for i, q in enumerate(quantiles):
+        position = q * np.maximum(counts - 1, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        low_values = np.take_along_axis(ordered, np.minimum(starts + low, last), axis=0)
+        high_values = np.take_along_axis(ordered, np.minimum(starts + high, last), axis=0)
+        result[:, :, i] = np.where(counts > 0, low_values + (high_values - low_values) * (position - low), np.nan)
+    return result, counts
+
+
+@cached("child_distribution", spinner="Computing market distributions...")
+def _bands(parent_level: str, child_level: str, metric: str, view: str, version: str):
+    """Quantile bands and reporting counts of a metric across the children of every parent at a level."""
+    links = get_hierarchy().children.get((parent_level, child_level))
+    if links is None:
+        return None
+    order, offsets = links
+    values = get_cube(child_level).view(metric, view)[order].astype(np.float64)
+    bands, counts = grouped_quantiles(values, offsets)
+    check_cancelled()
+    return bands.astype(np.float32), counts.astype(np.int32)
+
+
+def get_child_distribution(location: str, child_level: str, metric: str, view: str = "Value") -> pd.DataFrame:
+    """Monthly p10-p90 bands of a metric across a location's children at child_level,
+    with the location's own series as "parent" and the number of reporting children.
+
+    Bands are computed for every parent of the level at once and cached per dataset
+    version, so any location is a lookup.
+    """
+    geo_type, position = locate(location)
+    result = _bands(geo_type, child_level, metric, view, dataset_version())
+    if result is None:
+        raise KeyError(f"No {child_level} geographies are linked to {geo_type} level")
+    bands, counts = result
+
+    child_cube, parent_cube = get_cube(child_level), get_cube(geo_type)
+    df = pd.DataFrame(bands[position], columns=BAND_COLUMNS)
+    df.insert(0, "date", child_cube.dates)
+    df["count"] = counts[position]
+
+    # The parent's series, aligned on the child cube's months
+    parent = pd.Series(parent_cube.view(metric, view)[position], index=parent_cube.dates)
+    df["parent"] = parent.reindex(df["date"]).to_numpy()
+    return df.dropna(subset=BAND_COLUMNS, how="all").reset_index(drop=True)
@@ -0,0 +1,197 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from src.cancel import check_cancelled
+from src.config import EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_FILES
+from src.data.cube import dataset_version
+from src.data.data_loader import METRICS, load_dask_data
+
+# Format name -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/octet-stream"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+ID_COLUMNS = ["date", "geo_type", "geo_id", "geo_name"]
+
+# Excel worksheets hold at most 1,048,576 rows including the header
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def make_query(locations: list = None, geo_type: str = None, state: str = None, metrics: list = None,
+               start_date=None, end_date=None) -> dict:
+    """Describe an export: explicit locations, or a whole geo level optionally within a state."""
+    return {
+        "locations": sorted(locations) if locations else None,
+        "geo_type": geo_type,
+        "state": state,
+        "metrics": list(metrics) if metrics else list(METRICS.keys()),
+        "start_date": pd.Timestamp(start_date).strftime("%Y-%m-%d") if start_date is not None else None,
+        "end_date": pd.Timestamp(end_date).strftime("%Y-%m-%d") if end_date is not None else None,
+    }
+
+
+def query_hash(query: dict, fmt: str) -> str:
+    """Stable hash of a query, format and dataset version, used as the cache file name."""
+    payload = json.dumps({"query": query, "format": fmt, "version": dataset_version()}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _partition_mask(part: pd.DataFrame, query: dict) -> pd.Series:
+    mask = pd.Series(False, index=part.index)
+    if query["locations"]:
+        # Same matching as the pages: ZIPs by geo_id, everything else by geo_name
+        for location in query["locations"]:
+            geo_type, geo_name = location.split(" - ", 1)
+            if geo_type == "Zip":
+                mask |= (part["geo_type"] == geo_type) & (part["geo_id"] == geo_name.split(",")[0])
+            else:
+                mask |= (part["geo_type"] == geo_type) & (part["geo_name"] == geo_name)
+    elif query["geo_type"]:
+        mask = part["geo_type"] == query["geo_type"]
+        if query["state"]:
+            mask &= part["geo_name"].str.extract(r",\s*([A-Z]{2})(?:-[A-Z]{2})*\s*$", expand=False) == query["state"]
+
+    if query["start_date"]:
+        mask &= part["date"] >= pd.Timestamp(query["start_date"])
+    if query["end_date"]:
+        mask &= part["date"] <= pd.Timestamp(query["end_date"])
+    return mask
+
+
+def iter_export_chunks(query: dict):
+    """Yield the rows matching a query one partition at a time, so memory stays bounded."""
+    ddf = load_dask_data()
+    columns = ID_COLUMNS + [m for m in query["metrics"] if m in ddf.columns]
+    for i in range(ddf.npartitions):
+        check_cancelled()
+        part = ddf.partitions[i][columns].compute()
+        chunk = part[_partition_mask(part, query)]
+        if len(chunk):
+            yield chunk.sort_values(["geo_type", "geo_id", "date"])
+
+
+def export_schema(query: dict):
+    """Arrow schema of a query's export, from the store's column types.
+
+    Taking it from the first chunk would fix a column's type to whatever that
+    partition held, e.g. integers, or nulls for a column it never reported.
+    """
+    import pyarrow as pa
+
+    dtypes = load_dask_data().dtypes
+    fields = []
+    for column in ID_COLUMNS + [m for m in query["metrics"] if m in dtypes.index]:
+        dtype = dtypes[column]
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            fields.append((column, pa.timestamp("ns")))
+        elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            # Metric values can be missing in any partition, so they are always floats
+            fields.append((column, pa.float64()))
+        else:
+            fields.append((column, pa.string()))
+    return pa.schema(fields)
+
+
+def _write_csv(chunks, path: str) -> int:
+    rows = 0
+    with open(path, "w", newline="") as f:
+        for chunk in chunks:
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, path: str, schema) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+def _write_excel(chunks, path: str) -> int:
+    from openpyxl import Workbook
+
+    # Write-only workbooks stream rows to disk instead of holding cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = 0
+    rows = 0
+    for chunk in chunks:
+        chunk = chunk.assign(date=chunk["date"].dt.strftime("%Y-%m-%d"))
+        for record in chunk.itertuples(index=False):
+            if sheet is None or sheet_rows >= EXCEL_MAX_ROWS:
+                sheet = workbook.create_sheet(f"Data {len(workbook.worksheets) + 1}")
+                sheet.append(list(chunk.columns))
+                sheet_rows = 0
+            sheet.append([None if pd.isna(value) else value for value in record])
+            sheet_rows += 1
+        rows += len(chunk)
+    if sheet is None:
+        workbook.create_sheet("Data 1").append(ID_COLUMNS)
+    workbook.save(path)
+    return rows
+
+
+_WRITERS = {"CSV": _write_csv, "Parquet": _write_parquet, "Excel": _write_excel}
+
+
+def _prune_cache(cache_dir: str, max_files: int) -> None:
+    """Drop the least recently used export files beyond the cache limit."""
+    files = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".tmp"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            files.append((os.path.getmtime(path), path))
+        except OSError:
+            # Removed by a concurrent export or prune since the listing
+            continue
+    files.sort(reverse=True)
+    for _, path in files[max_files:]:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+
+
+def export_data(query: dict, fmt: str = "CSV", cache_dir: str = EXPORT_CACHE_DIR) -> str:
+    """Stream the rows matching a query into a file of the given format and return its path.
+
+    Files are cached by query hash and dataset version, so repeated requests
+    return the existing file without touching the data again.
+    """
+    extension, _ = EXPORT_FORMATS[fmt]
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{query_hash(query, fmt)}.{extension}")
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+
+    # Sessions are threads of one process, so each export needs its own temp file
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        writer = _WRITERS[fmt]
+        if fmt == "Parquet":
+            writer = functools.partial(writer, schema=export_schema(query))
+        writer(iter_export_chunks(query), tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    _prune_cache(cache_dir, EXPORT_CACHE_MAX_FILES)
+    return path
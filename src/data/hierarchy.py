@@ -0,0 +1,184 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.config import GEO_CROSSWALK_PATH
+from src.data.cube import GEO_TYPES, dataset_version, get_cube
+
+# Ordered from the broadest to the most granular level
+LEVEL_ORDER = GEO_TYPES
+
+# Parent levels that can be linked for each child level, nearest first
+PARENT_LEVELS = {
+    "Zip": ["County", "Metro", "State", "National"],
+    "County": ["Metro", "State", "National"],
+    "Metro": ["State", "National"],
+    "State": ["National"],
+    "National": [],
+}
+
+# (child, parent) level pairs that can only be linked through the ZIP crosswalk
+CROSSWALK_LINKS = [("Zip", "County"), ("Zip", "Metro"), ("County", "Metro")]
+
+
+@dataclass
+class GeoHierarchy:
+    """Parent and child links between geo levels, stored as arrays of cube positions.
+
+    parents[(child_level, parent_level)] holds the parent position of every child
+    (-1 when unknown). children[(parent_level, child_level)] is a CSR-style pair of
+    (order, offsets) so the children of parent p are order[offsets[p]:offsets[p + 1]].
+    """
+    parents: dict
+    children: dict = field(default_factory=dict)
+
+    def parent_position(self, geo_type: str, position: int, parent_level: str) -> int:
+        links = self.parents.get((geo_type, parent_level))
+        if links is None:
+            return -1
+        return int(links[position])
+
+    def child_positions(self, geo_type: str, position: int, child_level: str) -> np.ndarray:
+        """Positions (on the child level's cube) of every child of a geography."""
+        links = self.children.get((geo_type, child_level))
+        if links is None:
+            return np.empty(0, dtype=np.int64)
+        order, offsets = links
+        return order[offsets[position]:offsets[position + 1]]
+
+
+def _csr(parent_positions: np.ndarray, n_parents: int) -> tuple:
+    """Group child positions by parent into (order, offsets) arrays."""
+    linked = np.flatnonzero(parent_positions >= 0)
+    order = linked[np.argsort(parent_positions[linked], kind="stable")]
+    counts = np.bincount(parent_positions[linked], minlength=n_parents)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return order, offsets
+
+
+def _lookup(keys: np.ndarray, positions: dict) -> np.ndarray:
+    return np.array([positions.get(key, -1) for key in keys], dtype=np.int64)
+
+
+def _crosswalk_links(crosswalk: pd.DataFrame, cubes: dict) -> dict:
+    """ZIP -> county/metro and county -> metro links from a ZIP crosswalk file."""
+    links = {}
+    # Keep the dominant county/metro for ZIPs that straddle boundaries
+    if "res_ratio" in crosswalk.columns:
+        crosswalk = crosswalk.sort_values("res_ratio", ascending=False)
+    crosswalk = crosswalk.astype(str).drop_duplicates("zip")
+
+    zip_cube = cubes["Zip"]
+    by_zip = crosswalk.set_index("zip")
+    for column, level in (("county_fips", "County"), ("cbsa_code", "Metro")):
+        if column not in crosswalk.columns:
+            continue
+        parent_ids = by_zip[column].reindex(zip_cube.geo_ids.astype(str)).to_numpy()
+        positions = {geo_id: i for i, geo_id in enumerate(cubes[level].geo_ids.astype(str))}
+        links[("Zip", level)] = _lookup(parent_ids, positions)
+
+    if {"county_fips", "cbsa_code"} <= set(crosswalk.columns):
+        county_metro = crosswalk.groupby("county_fips")["cbsa_code"].agg(lambda s: s.mode().iloc[0])
+        parent_ids = county_metro.reindex(cubes["County"].geo_ids.astype(str)).to_numpy()
+        positions = {geo_id: i for i, geo_id in enumerate(cubes["Metro"].geo_ids.astype(str))}
+        links[("County", "Metro")] = _lookup(parent_ids, positions)
+
+    return links
+
+
+def build_hierarchy(cubes: dict, crosswalk: pd.DataFrame = None) -> GeoHierarchy:
+    """Link every geography to its parents and index the children of every parent.
+
+    States and the nation are linked from the names in the data. ZIP -> county,
+    ZIP -> metro and county -> metro links need a crosswalk with zip, county_fips
+    and cbsa_code columns (e.g. the HUD USPS crosswalk).
+    """
+    parents = {}
+    state_positions = {state: i for i, state in enumerate(cubes["State"].states)}
+    for level in ("Metro", "County", "Zip"):
+        parents[(level, "State")] = _lookup(cubes[level].states, state_positions)
+    for level in ("State", "Metro", "County", "Zip"):
+        parents[(level, "National")] = np.zeros(len(cubes[level].geo_ids), dtype=np.int64)
+
+    if crosswalk is not None:
+        parents.update(_crosswalk_links(crosswalk, cubes))
+
+    # Link ZIPs to their county's metro when the crosswalk has no metro column
+    if ("Zip", "County") in parents and ("County", "Metro") in parents and ("Zip", "Metro") not in parents:
+        zip_county = parents[("Zip", "County")]
+        county_metro = parents[("County", "Metro")]
+        parents[("Zip", "Metro")] = np.where(zip_county >= 0, county_metro[zip_county], -1)
+
+    children = {
+        (parent_level, child_level): _csr(links, len(cubes[parent_level].geo_ids))
+        for (child_level, parent_level), links in parents.items()
+    }
+    return GeoHierarchy(parents=parents, children=children)
+
+
+def load_crosswalk(path: str = GEO_CROSSWALK_PATH):
+    """Read the optional ZIP crosswalk, returning None when it is not bundled."""
+    try:
+        return pd.read_csv(path, dtype=str)
+    except FileNotFoundError:
+        return None
+
+
+@cached("hierarchy", spinner="Indexing geographic hierarchy...")
+def _load_hierarchy(version: str) -> GeoHierarchy:
+    cubes = {level: get_cube(level) for level in LEVEL_ORDER}
+    return build_hierarchy(cubes, load_crosswalk())
+
+
+def get_hierarchy() -> GeoHierarchy:
+    """Return the hierarchy index for the current dataset version."""
+    return _load_hierarchy(dataset_version())
+
+
+def locate(location: str) -> tuple:
+    """Return (geo_type, cube position) for a "Type - Name" location string."""
+    geo_type = location.split(" - ", 1)[0]
+    return geo_type, get_cube(geo_type).geo_pos(location)
+
+
+def get_parents(location: str) -> list:
+    """Return the parent locations of a location, nearest first."""
+    geo_type, position = locate(location)
+    hierarchy = get_hierarchy()
+
+    parents = []
+    for parent_level in PARENT_LEVELS.get(geo_type, []):
+        parent = hierarchy.parent_position(geo_type, position, parent_level)
+        if parent >= 0:
+            parents.append(get_cube(parent_level).labels[parent])
+    return parents
+
+
+def get_children(location: str, child_level: str) -> list:
+    """Return every child location of a location at the given level."""
+    geo_type, position = locate(location)
+    positions = get_hierarchy().child_positions(geo_type, position, child_level)
+    return list(get_cube(child_level).labels[positions])
+
+
+def child_levels(location: str) -> list:
+    """Levels below a location that have at least one linked child."""
+    geo_type, position = locate(location)
+    hierarchy = get_hierarchy()
+    return [
+        level for level in LEVEL_ORDER[LEVEL_ORDER.index(geo_type) + 1:]
+        if len(hierarchy.child_positions(geo_type, position, level)) > 0
+    ]
+
+
+def unlinked_levels(location: str) -> list:
+    """Parent and child levels of a location left unlinked because the ZIP crosswalk is missing."""
+    geo_type, _ = locate(location)
+    parents = get_hierarchy().parents
+    levels = []
+    for child_level, parent_level in CROSSWALK_LINKS:
+        if (child_level, parent_level) in parents or geo_type not in (child_level, parent_level):
+            continue
+        levels.append(parent_level if geo_type == child_level else child_level)
+    return [level for level in LEVEL_ORDER if level in levels]
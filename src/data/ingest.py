@@ -0,0 +1,200 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from src.config import SOURCE_CHUNK_ROWS, SOURCES_STORE_PATH
+from src.data.cube import GEO_TYPES, get_cube
+from src.data.providers import METRIC_MAP, partition_dir
+
+# Zillow RegionType and Redfin region_type values, by geo level
+ZILLOW_LEVELS = {"country": "National", "state": "State", "msa": "Metro", "county": "County", "zip": "Zip"}
+REDFIN_LEVELS = {"national": "National", "state": "State", "metro": "Metro", "county": "County", "zip code": "Zip"}
+
+# Zillow wide files have one column per month, e.g. "2024-01-31"
+_MONTH_COLUMN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_WORD = re.compile(r"[a-z0-9]+")
+# Words providers add to county and metro names
+_NAME_NOISE = re.compile(r"\b(county|parish|borough|census area|metro area)\b")
+
+
+def name_key(name: str, first_city: bool = False) -> str:
+    """Provider-independent key for "Name, ST" geography names.
+
+    Metro titles differ between providers ("Los Angeles-Long Beach-Anaheim, CA" and
+    "Los Angeles, CA"), so metros are keyed by their first principal city.
+    """
+    name = _NAME_NOISE.sub("", str(name).lower())
+    name, _, state = name.rpartition(",") if "," in name else (name, "", "")
+    if first_city:
+        name = name.split("-")[0]
+    return " ".join(_WORD.findall(name)) + "|" + "".join(_WORD.findall(state.split("-")[0]))
+
+
+class GeoResolver:
+    """Map provider geography identifiers onto the catalog's (geo_id, geo_name).
+
+    Rows from every provider are stored under the Realtor.com geo_id and geo_name,
+    so one location string looks up the same geography in every source. ZIPs match
+    on the ZIP code, counties on FIPS code, metros on CBSA code, and otherwise on
+    name_key().
+    """
+
+    def __init__(self, cubes: dict):
+        self.keys = {}
+        for geo_type, cube in cubes.items():
+            for geo_id, name in zip(cube.geo_ids.astype(str), cube.geo_names.astype(str)):
+                for key in self.catalog_keys(geo_type, geo_id, name):
+                    self.keys.setdefault((geo_type, key), (geo_id, name))
+
+    @staticmethod
+    def catalog_keys(geo_type: str, geo_id: str, name: str) -> list:
+        if geo_type == "Zip":
+            return [geo_id.zfill(5)]
+        if geo_type == "County":
+            return [geo_id.zfill(5), name_key(name)]
+        if geo_type == "Metro":
+            return [geo_id, name_key(name, first_city=True)]
+        if geo_type == "State":
+            return [name.lower()]
+        return ["united states", "national"]
+
+    def resolve(self, geo_type: str, keys: list) -> tuple:
+        """(geo_id, geo_name) of the first key found, or (None, None)."""
+        for key in keys:
+            match = self.keys.get((geo_type, key))
+            if match:
+                return match
+        return None, None
+
+    def resolve_frame(self, geo_types: pd.Series, keys: list) -> pd.DataFrame:
+        """Resolve every row, given per-row lists of candidate keys."""
+        resolved = [self.resolve(geo_type, row_keys) for geo_type, row_keys in zip(geo_types, keys)]
+        return pd.DataFrame(resolved, columns=["geo_id", "geo_name"], index=geo_types.index)
+
+
+def load_resolver() -> GeoResolver:
+    return GeoResolver({geo_type: get_cube(geo_type) for geo_type in GEO_TYPES})
+
+
+def zillow_metric(path: str) -> str:
+    """Metric of a Zillow research file, from its name (e.g. Metro_mlp_uc_sfrcondo_sm_month.csv)."""
+    stem = os.path.basename(path).lower()
+    for token, metric in METRIC_MAP["zillow"].items():
+        if f"_{token}_" in stem:
+            return metric
+    raise ValueError(f"No metric mapping for Zillow file {os.path.basename(path)}")
+
+
+def read_zillow(path: str, resolver: GeoResolver, chunksize: int = SOURCE_CHUNK_ROWS):
+    """Melt a wide Zillow file into long (geo, date, metric) chunks of `chunksize` regions.
+
+    Only one chunk of regions is in memory at a time, however large the file.
+    Yields (rows, unmatched regions) per chunk.
+    """
+    metric = zillow_metric(path)
+    dtypes = {"RegionName": str, "StateCodeFIPS": str, "MunicipalCodeFIPS": str, "RegionType": str}
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=dtypes):
+        months = [c for c in chunk.columns if _MONTH_COLUMN.match(c)]
+        geo_types = chunk["RegionType"].str.lower().map(ZILLOW_LEVELS)
+        fips = (chunk["StateCodeFIPS"].fillna("").str.zfill(2) + chunk["MunicipalCodeFIPS"].fillna("").str.zfill(3)
+                if "MunicipalCodeFIPS" in chunk.columns else pd.Series("", index=chunk.index))
+        states = chunk["StateName"].fillna("") if "StateName" in chunk.columns else pd.Series("", index=chunk.index)
+        keys = [
+            [str(region).zfill(5)] if geo_type == "Zip"
+            else [code, name_key(f"{region}, {state}")] if geo_type == "County"
+            else [name_key(region, first_city=True)] if geo_type == "Metro"
+            else [str(region).lower()]
+            for geo_type, region, code, state in zip(geo_types, chunk["RegionName"], fips, states)
+        ]
+        ids = resolver.resolve_frame(geo_types, keys)
+        matched = ids["geo_id"].notna().to_numpy()
+
+        values = chunk.loc[matched, months].to_numpy(dtype=np.float64)
+        observed = ~np.isnan(values)
+        region_rows, month_cols = np.nonzero(observed)
+        dates = pd.to_datetime(pd.Index(months)).to_period("M").to_timestamp()
+        yield pd.DataFrame({
+            "geo_type": geo_types[matched].to_numpy()[region_rows],
+            "geo_id": ids.loc[matched, "geo_id"].to_numpy()[region_rows],
+            "geo_name": ids.loc[matched, "geo_name"].to_numpy()[region_rows],
+            "date": dates[month_cols],
+            metric: values[observed],
+        }), int((~matched).sum())
+
+
+def read_redfin(path: str, resolver: GeoResolver, chunksize: int = SOURCE_CHUNK_ROWS * 50):
+    """Read a Redfin market tracker file (long format, tab separated) in chunks of rows.
+
+    Keeps monthly "All Residential" rows and the metrics in METRIC_MAP["redfin"].
+    Yields (rows, unmatched rows) per chunk.
+    """
+    mapping = METRIC_MAP["redfin"]
+    for chunk in pd.read_csv(path, sep="\t", chunksize=chunksize, dtype=str):
+        chunk.columns = chunk.columns.str.lower()
+        if "property_type" in chunk.columns:
+            chunk = chunk[chunk["property_type"] == "All Residential"]
+        if "period_duration" in chunk.columns:
+            chunk = chunk[chunk["period_duration"].astype(float) == 30]
+
+        geo_types = chunk["region_type"].str.lower().map(REDFIN_LEVELS)
+        table_ids = chunk["table_id"] if "table_id" in chunk.columns else pd.Series("", index=chunk.index)
+        keys = [
+            ["".join(re.findall(r"\d", region))[:5]] if geo_type == "Zip"
+            else [name_key(region)] if geo_type == "County"
+            else [str(table_id), name_key(region, first_city=True)] if geo_type == "Metro"
+            else [str(region).lower()]
+            for geo_type, region, table_id in zip(geo_types, chunk["region"], table_ids)
+        ]
+        ids = resolver.resolve_frame(geo_types, keys)
+        matched = ids["geo_id"].notna()
+
+        rows = pd.DataFrame({
+            "geo_type": geo_types[matched],
+            "geo_id": ids.loc[matched, "geo_id"],
+            "geo_name": ids.loc[matched, "geo_name"],
+            "date": pd.to_datetime(chunk.loc[matched, "period_begin"]).dt.to_period("M").dt.to_timestamp(),
+        })
+        for column, metric in mapping.items():
+            if column in chunk.columns:
+                rows[metric] = pd.to_numeric(chunk.loc[matched, column], errors="coerce")
+        yield rows.reset_index(drop=True), int((~matched).sum())
+
+
+def write_partitions(chunks, source: str, stem: str, root: str = SOURCES_STORE_PATH) -> dict:
+    """Write chunks into the store, one parquet file per chunk and geo level.
+
+    Files are named after the input file, so re-ingesting a file replaces its
+    earlier rows. Returns row counts written and regions that matched no catalog
+    geography.
+    """
+    for old in glob.glob(os.path.join(root, f"source={source}", "geo_type=*", f"{stem}-*.parquet")):
+        os.remove(old)
+
+    stats = {"rows": 0, "unmatched": 0, "files": 0}
+    for number, (rows, unmatched) in enumerate(chunks):
+        stats["unmatched"] += unmatched
+        for geo_type, part in rows.groupby("geo_type"):
+            directory = partition_dir(source, geo_type, root)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{stem}-{number:05d}.parquet")
+            tmp = f"{path}.{os.getpid()}.tmp"
+            part.drop(columns="geo_type").to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+            stats["rows"] += len(part)
+            stats["files"] += 1
+    return stats
+
+
+READERS = {
+    "zillow": read_zillow,
+    "redfin": read_redfin,
+}
+
+
+def ingest_file(source: str, path: str, resolver: GeoResolver = None, root: str = SOURCES_STORE_PATH) -> dict:
+    """Stream one provider file into the partitioned store."""
+    resolver = resolver or load_resolver()
+    stem = re.sub(r"[^A-Za-z0-9_]+", "_", os.path.basename(path).split(".")[0])
+    return write_partitions(READERS[source](path, resolver), source, stem, root)
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from src.data.data_loader import METRICS
+
+# Months between a value and the value it is compared with, per view
+VIEW_LAGS = {"MoM": 1, "YoY": 12}
+
+# Views compared with the same calendar month of a base year
+BASE_YEARS = {"Since 2019": 2019}
+
+
+def month_index(dates) -> np.ndarray:
+    """Convert dates to integer months on a fixed calendar axis (year * 12 + month - 1)."""
+    dates = pd.DatetimeIndex(dates)
+    return dates.year.to_numpy(dtype=np.int64) * 12 + dates.month.to_numpy(dtype=np.int64) - 1
+
+
+def month_to_timestamp(index: int) -> pd.Timestamp:
+    """Inverse of month_index for a single month."""
+    return pd.Timestamp(year=int(index) // 12, month=int(index) % 12 + 1, day=1)
+
+
+def percent_change(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """(current / previous - 1) * 100, NaN where either side is missing or previous is zero."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = (current / previous - 1) * 100
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def lagged_change(values: np.ndarray, lag: int) -> np.ndarray:
+    """Percent change against the value `lag` months earlier, along the last (month) axis."""
+    result = np.full(values.shape, np.nan, dtype=values.dtype)
+    if lag < values.shape[-1]:
+        result[..., lag:] = percent_change(values[..., lag:], values[..., :-lag])
+    return result
+
+
+def base_year_change(values: np.ndarray, months: np.ndarray, year: int) -> np.ndarray:
+    """Percent change against the same calendar month of `year`, along the last (month) axis."""
+    result = np.full(values.shape, np.nan, dtype=values.dtype)
+    base_pos = year * 12 + (months % 12) - months[0] if len(months) else months
+    valid = (base_pos >= 0) & (base_pos < len(months))
+    result[..., valid] = percent_change(values[..., valid], values[..., base_pos[valid]])
+    return result
+
+
+def view_change(values: np.ndarray, months: np.ndarray, view: str) -> np.ndarray:
+    """Apply a comparison view to values laid out on the contiguous month axis `months`."""
+    if view == "Value":
+        return values
+    if view in VIEW_LAGS:
+        return lagged_change(values, VIEW_LAGS[view])
+    if view in BASE_YEARS:
+        return base_year_change(values, months, BASE_YEARS[view])
+    raise ValueError(f"Unknown view: {view}")
+
+
+def comparison_date(date, view: str) -> pd.Timestamp:
+    """The month a view compares a date's month with."""
+    month = int(month_index([date])[0])
+    if view in VIEW_LAGS:
+        return month_to_timestamp(month - VIEW_LAGS[view])
+    if view in BASE_YEARS:
+        return month_to_timestamp(BASE_YEARS[view] * 12 + month % 12)
+    raise ValueError(f"Unknown view: {view}")
+
+
+@dataclass
+class MonthlySeries:
+    """One location's metrics on a contiguous month axis, NaN where a month is missing.
+
+    values[i, s] holds columns[i] at month start + s, and rows[r] is the slot of
+    row r of the frame it was built from, so results map back onto that frame.
+    """
+    start: int
+    columns: list
+    values: np.ndarray
+    rows: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: list = None) -> "MonthlySeries":
+        columns = [c for c in (columns or list(METRICS.keys())) if c in df.columns]
+        months = month_index(df["date"])
+        start = int(months.min()) if len(months) else 0
+        n_months = int(months.max() - start + 1) if len(months) else 0
+
+        values = np.full((len(columns), n_months), np.nan)
+        rows = months - start
+        values[:, rows] = df[columns].to_numpy(dtype=np.float64).T
+        return cls(start=start, columns=columns, values=values, rows=rows)
+
+    @property
+    def months(self) -> np.ndarray:
+        return np.arange(self.start, self.start + self.values.shape[1], dtype=np.int64)
+
+    @property
+    def latest_date(self) -> pd.Timestamp:
+        return month_to_timestamp(self.start + self.values.shape[1] - 1)
+
+    def slot(self, date) -> int:
+        """Slot of a date's month, or -1 when it is outside the series."""
+        slot = int(month_index([date])[0]) - self.start
+        return slot if 0 <= slot < self.values.shape[1] else -1
+
+    def value_at(self, column: str, date) -> float:
+        """Value in a date's month, NaN when that month is missing."""
+        slot = self.slot(date)
+        return self.values[self.columns.index(column), slot] if slot >= 0 else np.nan
+
+    def change(self, column: str, view: str) -> np.ndarray:
+        """A column in a comparison view, one value per month slot."""
+        return view_change(self.values[self.columns.index(column)], self.months, view)
+
+    def on_rows(self, values: np.ndarray) -> np.ndarray:
+        """Per-slot values at the rows of the frame the series was built from."""
+        return values[self.rows]
@@ -0,0 +1,168 @@
+import glob
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.cancel import check_cancelled
+from src.config import PERCENTILES_DIR
+from src.data.cube import GEO_TYPES, VIEWS, dataset_version, get_cube
+
+logger = logging.getLogger(__name__)
+
+# Stored in place of a percentile where the value is missing or has no peers
+MISSING = 255
+
+LEVEL_PLURALS = {"State": "states", "Metro": "metros", "County": "counties", "Zip": "ZIP codes"}
+
+
+@dataclass
+class PeerPercentiles:
+    """Percentile (0-100) of every geography among its peers, per month and metric.
+
+    Arrays are geo x month x metric like the cube, as uint8 with MISSING for gaps:
+    `level` ranks against every geography of the level, `state` against those in
+    the same state.
+    """
+    geo_type: str
+    view: str
+    level: np.ndarray
+    state: np.ndarray
+
+
+def percentile_ranks(values: np.ndarray) -> np.ndarray:
+    """Percentile of each row within its column, with tied values sharing their mid rank."""
+    result = np.full(values.shape, MISSING, dtype=np.uint8)
+    for column in range(values.shape[1]):
+        col = values[:, column]
+        valid = ~np.isnan(col)
+        n = int(valid.sum())
+        if n < 2:
+            continue
+        ordered = np.sort(col[valid])
+        below = np.searchsorted(ordered, col[valid], side="left")
+        ties = np.searchsorted(ordered, col[valid], side="right") - below
+        result[valid, column] = np.rint((below + (ties - 1) / 2) / (n - 1) * 100)
+    return result
+
+
+def build_percentiles(geo_type: str, view: str) -> PeerPercentiles:
+    """Rank every geography of a level against its peers, for every month and metric."""
+    cube = get_cube(geo_type)
+    values = np.stack([cube.view(metric, view) for metric in cube.metrics], axis=-1)
+    flat = values.reshape(len(cube.labels), -1)
+
+    level = percentile_ranks(flat)
+    state = np.full(flat.shape, MISSING, dtype=np.uint8)
+    if geo_type != "State":
+        for code in {code for code in cube.states if code}:
+            rows = np.flatnonzero(cube.states == code)
+            state[rows] = percentile_ranks(flat[rows])
+    check_cancelled()
+    return PeerPercentiles(geo_type, view, level.reshape(values.shape), state.reshape(values.shape))
+
+
+def _path(geo_type: str, view: str, version: str, directory: str = PERCENTILES_DIR) -> str:
+    return os.path.join(directory, f"{geo_type}_{view.replace(' ', '_')}_{version}.npz")
+
+
+def save_percentiles(ranks: PeerPercentiles, version: str, directory: str = PERCENTILES_DIR) -> str:
+    """Write ranks for a dataset version and remove those of older versions."""
+    os.makedirs(directory, exist_ok=True)
+    path = _path(ranks.geo_type, ranks.view, version, directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, level=ranks.level, state=ranks.state)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    for stale in glob.glob(_path(ranks.geo_type, ranks.view, "*", directory)):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return path
+
+
+def precompute_percentiles(version: str = None, directory: str = PERCENTILES_DIR) -> list:
+    """Build and write the ranks of every level and view; returns the written paths."""
+    version = dataset_version() if version is None else version
+    return [
+        save_percentiles(build_percentiles(geo_type, view), version, directory)
+        for geo_type in GEO_TYPES
+        for view in VIEWS
+    ]
+
+
+@cached("percentiles", spinner="Ranking peer markets...")
+def _load(geo_type: str, view: str, version: str) -> PeerPercentiles:
+    try:
+        with np.load(_path(geo_type, view, version)) as data:
+            return PeerPercentiles(geo_type, view, data["level"], data["state"])
+    except (OSError, KeyError, ValueError):
+        pass
+
+    # Not precomputed for this release: build once and write it for other processes
+    ranks = build_percentiles(geo_type, view)
+    try:
+        save_percentiles(ranks, version)
+    except OSError as e:
+        logger.warning("Could not write peer percentiles: %s", e)
+    return ranks
+
+
+def get_percentiles(geo_type: str, view: str = "Value") -> PeerPercentiles:
+    """Peer percentiles of a level in a view (Seasonality ranks values).
+
+    Read from the ranks scripts/build_percentiles.py wrote for the current dataset
+    version, and only built here when they are missing.
+    """
+    return _load(geo_type, view if view in VIEWS else "Value", dataset_version())
+
+
+def ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def peer_percentiles(location: str, date, view: str = "Value") -> dict:
+    """Percentiles of a location's metrics for one month, looked up from the precomputed ranks.
+
+    Returns {metric: {"level": ..., "state": ...}} with None where there is no
+    ranking, plus the peer group labels under "_groups" (e.g. counties, CA).
+    """
+    geo_type = location.split(" - ", 1)[0]
+    cube = get_cube(geo_type)
+    position = cube.geo_pos(location)
+    month = cube.month_pos(pd.Timestamp(date))
+    ranks = get_percentiles(geo_type, view)
+
+    state_group = cube.states[position] if geo_type in LEVEL_PLURALS and geo_type != "State" else None
+    result = {"_groups": {"level": LEVEL_PLURALS.get(geo_type), "state": state_group}}
+    for i, metric in enumerate(cube.metrics):
+        level, state = ranks.level[position, month, i], ranks.state[position, month, i]
+        result[metric] = {
+            "level": None if level == MISSING else int(level),
+            "state": None if state == MISSING else int(state),
+        }
+    return result
+
+
+def percentile_text(percentiles: dict, metric: str) -> str:
+    """Short description such as "72nd percentile of counties, 64th in CA", or "" without ranks."""
+    ranks, groups = percentiles.get(metric), percentiles["_groups"]
+    if not ranks:
+        return ""
+    parts = []
+    if ranks["level"] is not None:
+        parts.append(f"{ordinal(ranks['level'])} percentile of {groups['level']}")
+    if ranks["state"] is not None:
+        parts.append(f"{ordinal(ranks['state'])}{'' if parts else ' percentile'} in {groups['state']}")
+    return ", ".join(parts)
@@ -0,0 +1,16 @@
+import pandas as pd
+
+# Quick period presets shown in the Overview and Compare filters
+PERIODS = ["3M", "6M", "YTD", "1Y", "5Y", "Max"]
+
+
+def period_starts(min_date, max_date) -> dict:
+    """Start date of each period preset, ending at the latest month."""
+    return {
+        "3M": max_date - pd.DateOffset(months=3),
+        "6M": max_date - pd.DateOffset(months=6),
+        "YTD": pd.Timestamp(f"{max_date.year}-01-01"),
+        "1Y": max_date - pd.DateOffset(years=1),
+        "5Y": max_date - pd.DateOffset(years=5),
+        "Max": min_date
+    }
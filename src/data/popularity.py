@@ -0,0 +1,128 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import streamlit as st
+
+from src.config import POPULARITY_COMPACT_LINES, POPULARITY_LOG_PATH
+
+logger = logging.getLogger(__name__)
+
+COUNTS_TTL_SECONDS = 60
+_counts_cache = {}
+
+# Sessions append from threads of one process; compaction holds the lock so no append is lost
+_log_lock = threading.Lock()
+
+
+def record_locations(locations: list, key: str, path: str = POPULARITY_LOG_PATH) -> None:
+    """Append locations a session newly selected to the popularity log.
+
+    Reruns with an unchanged selection are not counted again.
+    """
+    state_key = f"_popularity_{key}"
+    seen = st.session_state.get(state_key, ())
+    new = [location for location in locations if location not in seen]
+    st.session_state[state_key] = tuple(locations)
+    if not new:
+        return
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One location per line; appends from concurrent sessions do not clobber each other
+        with _log_lock, open(path, "a") as f:
+            f.write("".join(f"{location}\n" for location in new))
+    except OSError as e:
+        logger.warning("Could not write popularity log: %s", e)
+
+
+def _parse(lines, counts: Counter) -> int:
+    """Add log lines to counts and return how many were single selections.
+
+    Compacted lines are "location<TAB>count"; appended lines are a bare location.
+    """
+    appended = 0
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        location, tab, count = line.rpartition("\t")
+        if tab and count.isdigit():
+            counts[location] += int(count)
+        else:
+            counts[line] += 1
+            appended += 1
+    return appended
+
+
+def _compact(path: str) -> tuple:
+    """Rewrite the log as one count line per location; returns (counts, bytes written)."""
+    with _log_lock:
+        counts = Counter()
+        with open(path) as f:
+            _parse(f, counts)
+        data = "".join(f"{location}\t{count}\n" for location, count in counts.most_common()).encode()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return counts, len(data)
+
+
+def location_counts(path: str = POPULARITY_LOG_PATH) -> Counter:
+    """Selection count per location, refreshed at most once a minute.
+
+    Refreshes only read lines appended since the last one, and the log is compacted
+    once POPULARITY_COMPACT_LINES single selections have accumulated, so it never
+    grows beyond a line per location plus that many appends.
+    """
+    now = time.monotonic()
+    cached = _counts_cache.get(path)
+    if cached is not None and now - cached["checked"] <= COUNTS_TTL_SECONDS:
+        return cached["counts"]
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _counts_cache[path] = {"checked": now, "inode": None, "offset": 0, "appended": 0, "counts": Counter()}
+        return _counts_cache[path]["counts"]
+
+    # Start over when the log was replaced (compacted) or truncated since the last read
+    if cached is None or cached["inode"] != stat.st_ino or stat.st_size < cached["offset"]:
+        cached = {"inode": stat.st_ino, "offset": 0, "appended": 0, "counts": Counter()}
+    counts = Counter(cached["counts"])
+    try:
+        with open(path, "rb") as f:
+            f.seek(cached["offset"])
+            data = f.read()
+    except OSError:
+        data = b""
+    # A line still being written is read on the next refresh
+    complete = data[:data.rfind(b"\n") + 1]
+    offset = cached["offset"] + len(complete)
+    appended = cached["appended"] + _parse(complete.decode().splitlines(), counts)
+
+    if appended > POPULARITY_COMPACT_LINES:
+        try:
+            counts, offset = _compact(path)
+            stat = os.stat(path)
+            appended = 0
+        except OSError as e:
+            logger.warning("Could not compact popularity log: %s", e)
+
+    _counts_cache[path] = {
+        "checked": now, "inode": stat.st_ino, "offset": offset, "appended": appended, "counts": counts,
+    }
+    return counts
+
+
+def top_locations(n: int, path: str = POPULARITY_LOG_PATH) -> list:
+    """Most frequently selected locations, most popular first."""
+    return [location for location, _ in location_counts(path).most_common(n)]
@@ -0,0 +1,107 @@
+import os
+
+import pandas as pd
+from src.cache import cached
+from src.config import SOURCES_STORE_PATH
+from src.data.backends import PandasBackend, load_location, parse_location, slice_dates
+
+# Data providers by source id; the primary source is the processed Realtor.com file
+SOURCES = {
+    "realtor": "Realtor.com",
+    "zillow": "Zillow",
+    "redfin": "Redfin",
+}
+PRIMARY_SOURCE = "realtor"
+
+# Provider columns carrying the same measure as a Realtor.com metric (see METRICS).
+# Look-alikes are left out: Zillow days to pending and Redfin pending sales (a monthly
+# flow) measure something other than days on market and the pending listing count.
+METRIC_MAP = {
+    "zillow": {
+        "mlp": "median_listing_price",
+        "invt_fs": "active_listing_count",
+        "new_listings": "new_listing_count",
+    },
+    "redfin": {
+        "median_list_price": "median_listing_price",
+        "median_list_ppsf": "median_listing_price_per_square_foot",
+        "inventory": "active_listing_count",
+        "new_listings": "new_listing_count",
+        "median_dom": "median_days_on_market",
+    },
+}
+
+
+def partition_dir(source: str, geo_type: str, root: str = SOURCES_STORE_PATH) -> str:
+    """Directory of one (source, geo level) partition of the store."""
+    return os.path.join(root, f"source={source}", f"geo_type={geo_type}")
+
+
+def partition_version(source: str, geo_type: str) -> str:
+    """Token that changes whenever files are added to or removed from a partition."""
+    try:
+        return str(os.stat(partition_dir(source, geo_type)).st_mtime_ns)
+    except OSError:
+        return "missing"
+
+
+@cached("source_partition", spinner="Loading provider data...")
+def _load_partition(source: str, geo_type: str, version: str):
+    directory = partition_dir(source, geo_type)
+    try:
+        files = sorted(f for f in os.listdir(directory) if f.endswith(".parquet"))
+    except FileNotFoundError:
+        return None
+    if not files:
+        return None
+
+    df = pd.concat([pd.read_parquet(os.path.join(directory, f)) for f in files], ignore_index=True)
+    # Each Zillow file carries one metric; combine them into one row per geography and month
+    df = df.groupby(["geo_id", "geo_name", "date"], as_index=False, sort=False).first()
+    return PandasBackend(df.assign(geo_type=geo_type))
+
+
+def _partition(source: str, geo_type: str):
+    return _load_partition(source, geo_type, partition_version(source, geo_type))
+
+
+def load_source_location(location: str, source: str = PRIMARY_SOURCE) -> pd.DataFrame:
+    """Full date-sorted history of one location from one provider.
+
+    Provider data is partitioned by source and level, and each partition is held
+    in the same sorted, range-indexed layout as the primary backend, so a lookup
+    is a dict hit plus a slice whichever provider it reads. Callers must not
+    modify the returned frame.
+    """
+    if source == PRIMARY_SOURCE:
+        return load_location(location)
+    partition = _partition(source, parse_location(location)[0])
+    if partition is None:
+        return pd.DataFrame(columns=["geo_type", "geo_id", "geo_name", "date"])
+    return partition.lookup(location)
+
+
+def location_sources(location: str) -> list:
+    """Source ids with any history for a location, the primary source first."""
+    return [source for source in SOURCES if not load_source_location(location, source).empty]
+
+
+def compare_sources(location: str, metric: str, start_date=None, end_date=None) -> list:
+    """(provider name, history) for every provider reporting a metric for a location.
+
+    Providers with no value for the metric within the date range are left out.
+    """
+    histories = []
+    for source, name in SOURCES.items():
+        # Partitions ingested before a mapping was dropped may still carry its column
+        if source != PRIMARY_SOURCE and metric not in METRIC_MAP[source].values():
+            continue
+        df = load_source_location(location, source)
+        if metric not in df.columns:
+            continue
+        if start_date is not None:
+            df = slice_dates(df, start_date, end_date)
+        if df[metric].isna().all():
+            continue
+        histories.append((name, df))
+    return histories
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.data.cube import dataset_version, get_cube
+
+
+def top_n_indices(values: np.ndarray, n: int, largest: bool = True) -> np.ndarray:
+    """Return indices of the n largest (or smallest) non-NaN values, best first.
+
+    Uses a partial sort (argpartition) so only the selected n values are fully sorted.
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    n = min(n, len(valid))
+    if n == 0:
+        return valid[:0]
+
+    keys = values[valid].astype(np.float64)
+    if largest:
+        keys = -keys
+    if n < len(keys):
+        part = np.argpartition(keys, n - 1)[:n]
+    else:
+        part = np.arange(len(keys))
+    return valid[part[np.argsort(keys[part], kind="stable")]]
+
+
+def _leaderboard_frame(cube, positions: np.ndarray, view_values: np.ndarray,
+                       raw_values: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Rank": np.arange(1, len(positions) + 1),
+        "Location": cube.display_names[positions],
+        "State": cube.states[positions],
+        "Value": raw_values[positions],
+        "Change (%)": view_values[positions],
+    })
+
+
+@cached("leaderboard")
+def _rank(geo_type: str, metric: str, view: str, date: pd.Timestamp, n: int, state: str, version: str):
+    cube = get_cube(geo_type)
+    month = cube.month_pos(date) if date is not None else len(cube.months) - 1
+
+    view_values = cube.view(metric, view)[:, month]
+    raw_values = cube.view(metric, "Value")[:, month]
+
+    candidates = view_values
+    if state:
+        candidates = np.where(cube.states == state, view_values, np.nan)
+
+    top = _leaderboard_frame(cube, top_n_indices(candidates, n, largest=True), view_values, raw_values)
+    bottom = _leaderboard_frame(cube, top_n_indices(candidates, n, largest=False), view_values, raw_values)
+    if view == "Value":
+        top = top.drop(columns="Change (%)")
+        bottom = bottom.drop(columns="Change (%)")
+    return top, bottom
+
+
+def get_leaderboard(geo_type: str, metric: str, view: str = "Value", date=None, n: int = 20,
+                    state: str = None) -> tuple:
+    """Return (top, bottom) frames of the n highest and lowest geographies for a month.
+
+    Results are cached per dataset version, so repeated queries are served from memory.
+    """
+    date = pd.Timestamp(date) if date is not None else None
+    return _rank(geo_type, metric, view, date, int(n), state, dataset_version())
@@ -0,0 +1,150 @@
+import operator
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.data.cube import VIEWS, dataset_version, get_cube
+from src.data.data_loader import METRICS
+
+# Reference values a predicate can compare against instead of a number
+REFERENCES = ["state median", "national median"]
+
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+
+
+@dataclass
+class Snapshot:
+    """Latest-month values and precomputed deltas for every geography of a level."""
+    geo_type: str
+    date: pd.Timestamp
+    locations: np.ndarray
+    states: np.ndarray
+    state_codes: np.ndarray
+    columns: dict
+    state_medians: dict
+    national_medians: dict
+
+    def median(self, key: tuple, scope: str) -> np.ndarray:
+        """Per-geography median of a column over its state or the whole level."""
+        if scope == "national median":
+            return np.full(len(self.locations), self.national_medians[key], dtype=np.float32)
+        return self.state_medians[key][self.state_codes]
+
+    def frame(self, positions: np.ndarray = None) -> pd.DataFrame:
+        """Return a display frame for the given positions (all geographies by default)."""
+        positions = np.arange(len(self.locations)) if positions is None else positions
+        data = {"Location": self.locations[positions], "State": self.states[positions]}
+        for (metric, view), values in self.columns.items():
+            data[column_label(metric, view)] = values[positions]
+        return pd.DataFrame(data)
+
+
+def column_label(metric: str, view: str) -> str:
+    return METRICS[metric] if view == "Value" else f"{METRICS[metric]} {view} (%)"
+
+
+def build_snapshot(cube, date=None) -> Snapshot:
+    """Compact one-month snapshot of a cube with all views precomputed as float32 columns."""
+    if len(cube.months) == 0:
+        # A level without data screens to "0 of 0 match" rather than failing
+        columns = {(metric, view): np.empty(0, dtype=np.float32) for metric in cube.metrics for view in VIEWS}
+    else:
+        month = len(cube.months) - 1 if date is None else cube.month_pos(date)
+        columns = {
+            (metric, view): np.ascontiguousarray(cube.view(metric, view)[:, month], dtype=np.float32)
+            for metric in cube.metrics
+            for view in VIEWS
+        }
+    # Missing states get their own code so they never join another state's median
+    state_codes, _ = pd.factorize(cube.states, use_na_sentinel=True)
+    state_codes = np.where(state_codes < 0, state_codes.max(initial=-1) + 1, state_codes)
+
+    # Reference medians are computed here, since the snapshot is shared and never mutated
+    grouped = pd.DataFrame({key: values for key, values in columns.items()}).groupby(state_codes).median()
+    state_medians = {}
+    for key in columns:
+        lookup = np.full(state_codes.max(initial=-1) + 2, np.nan, dtype=np.float32)
+        lookup[grouped.index.to_numpy()] = grouped[key].to_numpy()
+        state_medians[key] = lookup
+
+    return Snapshot(
+        geo_type=cube.geo_type,
+        date=pd.Timestamp(date) if date is not None else cube.latest_date if len(cube.months) else pd.NaT,
+        locations=cube.display_names,
+        states=cube.states,
+        state_codes=state_codes,
+        columns=columns,
+        state_medians=state_medians,
+        national_medians={key: np.float32(np.nanmedian(values)) for key, values in columns.items()},
+    )
+
+
+@cached("snapshot", spinner="Building market snapshot...")
+def _load_snapshot(geo_type: str, version: str) -> Snapshot:
+    return build_snapshot(get_cube(geo_type))
+
+
+def get_snapshot(geo_type: str) -> Snapshot:
+    """Return the cached latest-month snapshot for a geo level."""
+    return _load_snapshot(geo_type, dataset_version())
+
+
+def compile_predicates(snapshot: Snapshot, predicates: list) -> np.ndarray:
+    """AND together predicates into a single boolean mask over the snapshot.
+
+    Each predicate is a dict with metric, view, op and value, where value is a
+    number or one of REFERENCES. Rows with missing values never match.
+    """
+    mask = np.ones(len(snapshot.locations), dtype=bool)
+    for predicate in predicates:
+        key = (predicate["metric"], predicate.get("view") or "Value")
+        if key not in snapshot.columns:
+            raise ValueError(f"Unknown field: {column_label(*key)}")
+        if predicate["op"] not in _OPERATORS:
+            raise ValueError(f"Unknown operator: {predicate['op']}")
+
+        value = predicate["value"]
+        if isinstance(value, str) and value.strip().lower() in REFERENCES:
+            value = snapshot.median(key, value.strip().lower())
+        else:
+            value = float(value)
+
+        mask &= _OPERATORS[predicate["op"]](snapshot.columns[key], value)
+    return mask
+
+
+def screen(geo_type: str, predicates: list, sort_by: tuple = None, ascending: bool = False) -> pd.DataFrame:
+    """Return the geographies of a level matching every predicate, sorted by a field."""
+    snapshot = get_snapshot(geo_type)
+    positions = np.flatnonzero(compile_predicates(snapshot, predicates))
+
+    if sort_by is not None and sort_by in snapshot.columns:
+        keys = snapshot.columns[sort_by][positions]
+        order = np.argsort(keys if ascending else -keys, kind="stable")
+        positions = positions[order]
+
+    return snapshot.frame(positions)
+
+
+@cached("screener_csv", spinner="Preparing CSV...")
+def _load_csv(geo_type: str, predicates: tuple, sort_by: tuple, ascending: bool, version: str) -> bytes:
+    predicates = [dict(zip(("metric", "view", "op", "value"), predicate)) for predicate in predicates]
+    return screen(geo_type, predicates, sort_by=sort_by, ascending=ascending).to_csv(index=False).encode()
+
+
+def predicates_key(predicates: list) -> tuple:
+    """Hashable form of a predicate list."""
+    return tuple((p["metric"], p.get("view") or "Value", p["op"], str(p["value"])) for p in predicates)
+
+
+def screen_csv(geo_type: str, predicates: list, sort_by: tuple = None, ascending: bool = False) -> bytes:
+    """CSV of a screen, built once per set of predicates and sort order."""
+    return _load_csv(geo_type, predicates_key(predicates), sort_by, ascending, dataset_version())
@@ -0,0 +1,178 @@
+import re
+
+import numpy as np
+from src.cache import cached
+from src.data.cube import GEO_TYPES, dataset_version
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Broader levels rank first among equally close matches
+LEVEL_RANK = {level: rank for rank, level in enumerate(GEO_TYPES)}
+
+# Query words that name a level rather than part of a location name
+LEVEL_WORDS = {
+    "national": "National", "nation": "National",
+    "state": "State",
+    "metro": "Metro", "msa": "Metro", "area": "Metro",
+    "county": "County", "counties": "County", "parish": "County",
+    "zip": "Zip", "zipcode": "Zip",
+}
+
+# Candidate vocabulary words checked with the exact edit distance, per query word
+MAX_CANDIDATES = 64
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN.findall(text.lower())
+
+
+def trigrams(token: str) -> set:
+    """Trigrams of a word padded at the start only, so prefixes share a word's leading trigrams."""
+    padded = f"  {token}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(token: str) -> int:
+    """Typos tolerated in a query word: none for short words and numbers, then 1, then 2."""
+    if token.isdigit() or len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 7 else 2
+
+
+def bounded_edit_distance(a: str, b: str, limit: int, prefix: bool = False) -> int:
+    """Edit distance between a and b (or the closest prefix of b) counting a swap of
+    adjacent letters as one edit, or limit + 1 once it is known to exceed limit."""
+    if prefix:
+        b = b[:len(a) + limit]
+    elif abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous) if prefix else previous[-1]
+
+
+def _csr(keys: list, n_keys: int) -> tuple:
+    """Group item positions by key into (order, offsets) arrays."""
+    keys = np.asarray(keys, dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=n_keys))])
+    return order, offsets
+
+
+class LocationIndex:
+    """Typo-tolerant word index over "Type - Name" location strings.
+
+    Each query word is matched against the vocabulary of location words: a
+    trigram index narrows the vocabulary to words sharing enough trigrams, then a
+    bounded edit distance confirms them. The last query word also matches word
+    prefixes, for search-as-you-type. A location matches when every query word
+    matches one of its words.
+    """
+
+    def __init__(self, locations: list):
+        self.locations = np.array(locations, dtype=object)
+        self.levels = np.array([LEVEL_RANK.get(loc.split(" - ", 1)[0], len(LEVEL_RANK)) for loc in locations])
+        names = [tokenize(loc.split(" - ", 1)[-1]) for loc in locations]
+        self.word_counts = np.array([len(words) for words in names])
+
+        vocabulary = {}
+        word_ids, location_ids = [], []
+        for position, words in enumerate(names):
+            for word in set(words):
+                word_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+                location_ids.append(position)
+        self.words = list(vocabulary)
+        self._word_lengths = np.array([len(word) for word in self.words])
+        order, self._word_offsets = _csr(word_ids, len(self.words))
+        self._word_locations = np.asarray(location_ids, dtype=np.int64)[order]
+
+        grams = {}
+        gram_ids, gram_words = [], []
+        for word_id, word in enumerate(self.words):
+            for gram in trigrams(word):
+                gram_ids.append(grams.setdefault(gram, len(grams)))
+                gram_words.append(word_id)
+        self._grams = grams
+        order, self._gram_offsets = _csr(gram_ids, len(grams))
+        self._gram_words = np.asarray(gram_words, dtype=np.int64)[order]
+
+    def _word_matches(self, token: str, prefix: bool) -> dict:
+        """{word id: edit distance} of vocabulary words matching a query word."""
+        limit = max_edits(token)
+        query_grams = [self._grams[g] for g in trigrams(token) if g in self._grams]
+        if not query_grams:
+            return {}
+        postings = np.concatenate([
+            self._gram_words[self._gram_offsets[g]:self._gram_offsets[g + 1]] for g in query_grams
+        ])
+        shared = np.bincount(postings, minlength=len(self.words))
+        # Each edit changes at most three trigrams
+        needed = max(len(trigrams(token)) - 3 * limit, 1)
+        candidates = np.flatnonzero(shared >= needed)
+        if not prefix:
+            candidates = candidates[np.abs(self._word_lengths[candidates] - len(token)) <= limit]
+        if len(candidates) > MAX_CANDIDATES and limit:
+            candidates = candidates[np.argsort(-shared[candidates], kind="stable")[:MAX_CANDIDATES]]
+
+        matches, distances = {}, {}
+        for word_id in candidates:
+            word = self.words[word_id]
+            if word == token or (prefix and word.startswith(token)):
+                matches[word_id] = 0
+            elif limit:
+                # Prefix distances only depend on the word's first few letters
+                key = word[:len(token) + limit] if prefix else word
+                if key not in distances:
+                    distances[key] = bounded_edit_distance(token, key, limit, prefix)
+                distance = distances[key]
+                if distance <= limit:
+                    matches[word_id] = distance
+        return matches
+
+    def search(self, term: str, limit: int = 10) -> list:
+        """Locations matching every word of term, closest first, then broader levels first."""
+        tokens = tokenize(term)
+        level_hints = {LEVEL_WORDS[t] for t in tokens if t in LEVEL_WORDS} if len(tokens) > 1 else set()
+        tokens = [t for t in tokens if not (level_hints and t in LEVEL_WORDS)]
+        if not tokens:
+            return []
+
+        total = np.zeros(len(self.locations))
+        for i, token in enumerate(tokens):
+            best = np.full(len(self.locations), np.inf)
+            matches = self._word_matches(token, prefix=i == len(tokens) - 1)
+            # Closest words last, so their distance overwrites farther words of the same location
+            for word_id in sorted(matches, key=matches.get, reverse=True):
+                best[self._word_locations[self._word_offsets[word_id]:self._word_offsets[word_id + 1]]] = matches[word_id]
+            total += best
+        matched = np.flatnonzero(np.isfinite(total))
+        if len(matched) == 0:
+            return []
+
+        hinted = np.array([
+            self.locations[p].split(" - ", 1)[0] in level_hints for p in matched
+        ]) if level_hints else np.zeros(len(matched), dtype=bool)
+        extra_words = self.word_counts[matched] - len(tokens)
+        order = np.lexsort((extra_words, self.levels[matched], ~hinted, total[matched]))
+        return list(self.locations[matched[order[:limit]]])
+
+
+@cached("search_index", spinner="Indexing locations...")
+def _load_index(version: str) -> LocationIndex:
+    from src.data.backends import get_backend
+
+    return LocationIndex(get_backend().locations())
+
+
+def search_locations(term: str, limit: int = 10) -> list:
+    """Typo-tolerant search over every location, e.g. "Los Angelos" or "Sacremento"."""
+    return _load_index(dataset_version()).search(term, limit)
@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.cancel import check_cancelled
+from src.config import SIMILARITY_ANN_MIN_ROWS
+from src.data.backends import display_name_for
+from src.data.cube import dataset_version, get_cube
+from src.data.rankings import top_n_indices
+
+# Trajectories with a larger share of missing months are left out of the index
+MAX_MISSING_SHARE = 0.2
+
+# Dimensions kept by the approximate index and how many candidates it re-ranks per result
+ANN_DIMENSIONS = 16
+ANN_CANDIDATES_PER_RESULT = 20
+
+
+@dataclass
+class SimilarityIndex:
+    """Z-normalized trajectories of one geo level, ready for vectorized distance queries.
+
+    Each row is scaled to unit length, so the squared Euclidean distance between
+    two rows equals 2 * (1 - correlation) of the underlying trajectories.
+    """
+    geo_type: str
+    metrics: tuple
+    window: int
+    matrix: np.ndarray
+    valid: np.ndarray
+    projection: np.ndarray = None
+    projected: np.ndarray = None
+
+    def distances(self, position: int, candidates: np.ndarray = None) -> np.ndarray:
+        """Squared distances from one row to every row (or to the given candidate rows)."""
+        rows = self.matrix if candidates is None else self.matrix[candidates]
+        diff = rows - self.matrix[position]
+        return np.einsum("ij,ij->i", diff, diff)
+
+    def nearest(self, position: int, k: int) -> tuple:
+        """Return (positions, distances) of the k nearest valid rows, excluding the row itself.
+
+        Raises KeyError when the row itself is too sparse or flat to compare.
+        """
+        if not self.valid[position]:
+            raise KeyError(f"No comparable trajectory at position {position}")
+        if self.projected is not None:
+            # Approximate search: shortlist in the projected space, then re-rank exactly
+            diff = self.projected - self.projected[position]
+            coarse = np.einsum("ij,ij->i", diff, diff)
+            coarse[~self.valid] = np.nan
+            coarse[position] = np.nan
+            candidates = top_n_indices(coarse, k * ANN_CANDIDATES_PER_RESULT, largest=False)
+            exact = self.distances(position, candidates)
+            order = top_n_indices(exact, k, largest=False)
+            return candidates[order], exact[order]
+
+        exact = self.distances(position)
+        exact[~self.valid] = np.nan
+        exact[position] = np.nan
+        order = top_n_indices(exact, k, largest=False)
+        return order, exact[order]
+
+
+def normalized_trajectories(cube, metrics: tuple, window: int) -> tuple:
+    """Return (matrix, valid) of z-normalized trajectories over the last `window` months."""
+    blocks = []
+    valid = np.ones(len(cube.geo_ids), dtype=bool)
+    for metric in metrics:
+        values = cube.view(metric, "Value")[:, -window:].astype(np.float32)
+        missing = np.isnan(values)
+        valid &= missing.mean(axis=1) <= MAX_MISSING_SHARE
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nanmean(values, axis=1, keepdims=True)
+            std = np.nanstd(values, axis=1, keepdims=True)
+            z = (values - mean) / std
+        # Flat or missing trajectories carry no shape information
+        z[~np.isfinite(z)] = 0.0
+        valid &= np.isfinite(std[:, 0]) & (std[:, 0] > 0)
+        blocks.append(z)
+
+    matrix = np.hstack(blocks)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32), valid
+
+
+def build_similarity_index(cube, metrics: tuple, window: int) -> SimilarityIndex:
+    """Build the normalized matrix, plus a PCA projection for large geo levels."""
+    window = min(window, len(cube.months))
+    matrix, valid = normalized_trajectories(cube, metrics, window)
+    check_cancelled()
+    index = SimilarityIndex(cube.geo_type, tuple(metrics), window, matrix, valid)
+
+    if valid.sum() >= SIMILARITY_ANN_MIN_ROWS and matrix.shape[1] > ANN_DIMENSIONS:
+        # Principal directions from a sample of rows keep the projection cheap to fit
+        rng = np.random.default_rng(0)
+        rows = np.flatnonzero(valid)
+        sample = matrix[rng.choice(rows, size=min(len(rows), 5000), replace=False)]
+        _, _, vt = np.linalg.svd(sample - sample.mean(axis=0), full_matrices=False)
+        index.projection = vt[:ANN_DIMENSIONS].T.astype(np.float32)
+        index.projected = matrix @ index.projection
+
+    return index
+
+
+@cached("similarity_index", spinner="Indexing market trajectories...")
+def _load_index(geo_type: str, metrics: tuple, window: int, version: str) -> SimilarityIndex:
+    return build_similarity_index(get_cube(geo_type), metrics, window)
+
+
+@cached("similar_markets")
+def _similar(location: str, metrics: tuple, window: int, k: int, version: str) -> pd.DataFrame:
+    geo_type = location.split(" - ", 1)[0]
+    cube = get_cube(geo_type)
+    index = _load_index(geo_type, metrics, window, version)
+    position = cube.geo_pos(location)
+
+    positions, distances = index.nearest(position, k)
+    return pd.DataFrame({
+        "Rank": np.arange(1, len(positions) + 1),
+        "Location": cube.labels[positions],
+        "Correlation": 1 - distances / 2,
+        "Distance": np.sqrt(distances),
+    })
+
+
+def find_similar_markets(location: str, metrics: list, window: int = 60, k: int = 10) -> pd.DataFrame:
+    """Return the k geographies at the same level whose trajectories best match a location.
+
+    Results are cached per (location, metrics, window) and dataset version.
+    """
+    return _similar(location, tuple(metrics), int(window), int(k), dataset_version())
+
+
+def get_trajectories(locations: list, metric: str, window: int = 60) -> pd.DataFrame:
+    """Long frame of z-normalized trajectories for charting a location against its matches.
+
+    Locations are labelled with display_name_for, the name the pages show.
+    """
+    frames = []
+    for location in locations:
+        geo_type = location.split(" - ", 1)[0]
+        cube = get_cube(geo_type)
+        values = cube.view(metric, "Value")[cube.geo_pos(location), -window:].astype(np.float64)
+        frames.append(pd.DataFrame({
+            "date": cube.dates[-len(values):],
+            "Location": display_name_for(location),
+            "z_score": (values - np.nanmean(values)) / np.nanstd(values),
+        }))
+    return pd.concat(frames, ignore_index=True)
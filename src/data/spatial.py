@@ -0,0 +1,256 @@
+import heapq
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from src.cache import cached
+from src.config import ZIP_CENTROIDS_PATH
+from src.data.cube import dataset_version, get_cube
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Points per leaf of the KD-tree; leaves are scanned with one vectorized distance pass
+LEAF_SIZE = 16
+
+# Column names of the Census ZCTA gazetteer, accepted in place of zip, lat, lon
+GAZETTEER_COLUMNS = {"GEOID": "zip", "INTPTLAT": "lat", "INTPTLONG": "lon"}
+
+
+def unit_vectors(lat, lon) -> np.ndarray:
+    """Points on the unit sphere, where straight-line distance grows with great-circle distance."""
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_length(miles: float) -> float:
+    return 2 * np.sin(min(miles / EARTH_RADIUS_MILES, np.pi) / 2)
+
+
+def arc_miles(chord) -> np.ndarray:
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+@dataclass
+class KDTree:
+    """Balanced KD-tree over 3D points.
+
+    Points are reordered so every node covers the contiguous range lo[n]:hi[n] of
+    `points`; order maps them back to input rows. Leaves have left[n] == -1.
+    Bounding boxes are kept as Python tuples, which are faster than NumPy for the
+    per-node pruning tests.
+    """
+    points: np.ndarray
+    order: np.ndarray
+    lo: list
+    hi: list
+    left: list
+    right: list
+    box_min: list
+    box_max: list
+
+    def _box_distance(self, node: int, point: tuple) -> float:
+        """Squared distance from a point to a node's bounding box."""
+        total = 0.0
+        for p, a, b in zip(point, self.box_min[node], self.box_max[node]):
+            if p < a:
+                total += (a - p) ** 2
+            elif p > b:
+                total += (p - b) ** 2
+        return total
+
+    def query_radius(self, point, radius: float) -> tuple:
+        """Return (rows, distances) of every point within radius, nearest first."""
+        point = tuple(float(p) for p in point)
+        limit = radius * radius
+        ranges, stack = [], [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance(node, point) > limit:
+                continue
+            if self.left[node] < 0:
+                ranges.append(np.arange(self.lo[node], self.hi[node]))
+            else:
+                stack.extend((self.left[node], self.right[node]))
+        if not ranges:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        candidates = np.concatenate(ranges)
+        diff = self.points[candidates] - point
+        distances = np.einsum("ij,ij->i", diff, diff)
+        inside = distances <= limit
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return self.order[candidates[order]], np.sqrt(distances[order])
+
+    def query_nearest(self, point, k: int) -> tuple:
+        """Return (rows, distances) of the k nearest points, nearest first."""
+        point = tuple(float(p) for p in point)
+        best = []  # max-heap of (-squared distance, position)
+        queue = [(0.0, 0)]
+        while queue:
+            bound, node = heapq.heappop(queue)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if self.left[node] >= 0:
+                for child in (self.left[node], self.right[node]):
+                    heapq.heappush(queue, (self._box_distance(child, point), child))
+                continue
+            diff = self.points[self.lo[node]:self.hi[node]] - point
+            distances = np.einsum("ij,ij->i", diff, diff)
+            if len(best) == k:
+                closer = np.flatnonzero(distances < -best[0][0])
+            else:
+                closer = np.arange(len(distances))
+            for position, distance in zip((closer + self.lo[node]).tolist(), distances[closer].tolist()):
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, position))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, position))
+
+        best.sort(reverse=True)
+        positions = np.array([position for _, position in best], dtype=np.int64)
+        distances = np.sqrt([-distance for distance, _ in best])
+        return self.order[positions], distances
+
+
+def build_kdtree(points: np.ndarray, leaf_size: int = LEAF_SIZE) -> KDTree:
+    """Split on the widest dimension at the median until nodes fit in a leaf."""
+    order = np.arange(len(points))
+    lo, hi, left, right, box_min, box_max = [], [], [], [], [], []
+
+    def add_node(start: int, stop: int) -> int:
+        block = points[order[start:stop]]
+        lo.append(start)
+        hi.append(stop)
+        left.append(-1)
+        right.append(-1)
+        box_min.append(tuple(block.min(axis=0).tolist()) if len(block) else (np.inf,) * 3)
+        box_max.append(tuple(block.max(axis=0).tolist()) if len(block) else (-np.inf,) * 3)
+        return len(lo) - 1
+
+    stack = [add_node(0, len(points))]
+    while stack:
+        node = stack.pop()
+        start, stop = lo[node], hi[node]
+        if stop - start <= leaf_size:
+            continue
+        dimension = int(np.argmax(np.subtract(box_max[node], box_min[node])))
+        middle = (start + stop) // 2
+        segment = order[start:stop]
+        order[start:stop] = segment[np.argpartition(points[segment, dimension], middle - start)]
+        left[node] = add_node(start, middle)
+        right[node] = add_node(middle, stop)
+        stack.extend((left[node], right[node]))
+
+    return KDTree(points[order], order, lo, hi, left, right, box_min, box_max)
+
+
+def load_centroids(path: str = ZIP_CENTROIDS_PATH):
+    """Read the optional ZIP centroid file, returning None when it is not bundled."""
+    try:
+        centroids = pd.read_csv(path, sep=None, engine="python", dtype={"zip": str, "GEOID": str})
+    except FileNotFoundError:
+        return None
+    centroids.columns = centroids.columns.str.strip()
+    centroids = centroids.rename(columns=GAZETTEER_COLUMNS)
+    centroids["zip"] = centroids["zip"].str.zfill(5)
+    return centroids.dropna(subset=["lat", "lon"]).drop_duplicates("zip")
+
+
+@dataclass
+class ZipLocator:
+    """KD-tree over the centroids of the ZIPs in the Zip cube.
+
+    Row i of the tree is the ZIP at cube position positions[i].
+    """
+    positions: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    tree: KDTree
+    rows: dict
+
+    def row(self, location: str) -> int:
+        """Tree row of a ZIP location, or KeyError when it has no centroid."""
+        return self.rows[get_cube("Zip").geo_pos(location)]
+
+
+@cached("zip_locator", spinner="Indexing ZIP locations...")
+def _load_locator(version: str):
+    centroids = load_centroids()
+    if centroids is None:
+        return None
+    cube = get_cube("Zip")
+    geo_ids = pd.Index(pd.Series(cube.geo_ids.astype(str)).str.zfill(5))
+    positions = geo_ids.get_indexer(centroids["zip"])
+    matched = positions >= 0
+    positions = positions[matched]
+    lat = centroids["lat"].to_numpy(np.float64)[matched]
+    lon = centroids["lon"].to_numpy(np.float64)[matched]
+    return ZipLocator(
+        positions=positions,
+        lat=lat,
+        lon=lon,
+        tree=build_kdtree(unit_vectors(lat, lon)),
+        rows={int(position): row for row, position in enumerate(positions)},
+    )
+
+
+def get_locator():
+    """The ZIP locator for the current dataset version, or None without a centroid file."""
+    return _load_locator(dataset_version())
+
+
+def missing_centroids_message(feature: str) -> str:
+    """Why a feature that needs the ZIP centroid file (not bundled with the app) is unavailable."""
+    return (
+        f"{feature} are unavailable: add ZIP centroids (zip, lat, lon, or the Census ZCTA "
+        f"gazetteer file) at `{ZIP_CENTROIDS_PATH}`."
+    )
+
+
+def _results(locator: ZipLocator, rows: np.ndarray, chords: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Location": get_cube("Zip").labels[locator.positions[rows]],
+        "Miles": arc_miles(chords),
+    })
+
+
+def zips_within(location: str, miles: float) -> pd.DataFrame:
+    """ZIPs whose centroid is within `miles` of a ZIP's centroid, the ZIP itself first."""
+    locator = get_locator()
+    if locator is None:
+        return pd.DataFrame(columns=["Location", "Miles"])
+    row = locator.row(location)
+    center = unit_vectors(locator.lat[row], locator.lon[row])[0]
+    rows, chords = locator.tree.query_radius(center, chord_length(miles))
+    return _results(locator, rows, chords)
+
+
+def nearest_zips(lat: float, lon: float, k: int = 10) -> pd.DataFrame:
+    """The k ZIPs with centroids nearest to a point, e.g. a map click."""
+    locator = get_locator()
+    if locator is None:
+        return pd.DataFrame(columns=["Location", "Miles"])
+    rows, chords = locator.tree.query_nearest(unit_vectors(lat, lon)[0], k)
+    return _results(locator, rows, chords)
+
+
+def locations_near(lat: float, lon: float) -> list:
+    """The ZIP nearest to a point followed by its county, metro and state."""
+    from src.data.hierarchy import get_parents
+
+    nearest = nearest_zips(lat, lon, k=1)
+    if nearest.empty:
+        return []
+    location = nearest["Location"].iloc[0]
+    return [location] + [parent for parent in get_parents(location) if not parent.startswith("National")]
+
+
+def latest_values(locations: list, metrics: list) -> pd.DataFrame:
+    """Latest value of each metric for ZIP locations, one row per location."""
+    cube = get_cube("Zip")
+    positions = [cube.geo_pos(location) for location in locations]
+    return pd.DataFrame(
+        {metric: cube.view(metric, "Value")[positions, -1] for metric in metrics},
+        index=pd.Index(locations, name="Location"),
+    )
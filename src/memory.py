@@ -0,0 +1,199 @@
+import gc
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+
+import pandas as pd
+
+from src import perf
+from src.config import MEMORY_SNAPSHOT_HISTORY, MEMORY_SNAPSHOT_INTERVAL_SECONDS, MEMORY_TRACE_FRAMES
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by the profiler itself and the import system are noise
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+_lock = threading.Lock()
+_started = False
+# (unix time, tracemalloc snapshot) pairs, oldest first
+_snapshots = deque(maxlen=MEMORY_SNAPSHOT_HISTORY)
+# Process totals sampled with every snapshot
+_samples = []
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # Peak rather than current RSS on platforms without /proc (kilobytes on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def enabled() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def take_snapshot() -> None:
+    """Record a heap snapshot and the process, session state and cache totals."""
+    from src.cache import get_manager
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    now = time.time()
+    traced, peak = tracemalloc.get_traced_memory()
+    sample = {
+        "time": pd.Timestamp(now, unit="s"),
+        "rss": rss_bytes(),
+        "traced": traced,
+        "traced_peak": peak,
+        "session_state": int(session_state_sizes()["bytes"].sum()),
+        "app_caches": get_manager().used,
+    }
+    with _lock:
+        _snapshots.append((now, snapshot))
+        _samples.append(sample)
+    for name in ("rss", "traced", "session_state"):
+        perf.gauge(f"memory.{name}", sample[name])
+
+
+def _run(interval: float) -> None:
+    while True:
+        try:
+            take_snapshot()
+        except Exception:
+            logger.exception("Memory snapshot failed")
+        time.sleep(interval)
+
+
+def start_profiling(interval: float = MEMORY_SNAPSHOT_INTERVAL_SECONDS, frames: int = MEMORY_TRACE_FRAMES) -> bool:
+    """Start tracemalloc and take a snapshot every `interval` seconds, once per process.
+
+    Tracing slows allocations noticeably, so it only runs when MEMORY_PROFILING_ENABLED
+    is set. Returns False when it was already started.
+    """
+    global _started
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    tracemalloc.start(frames)
+    threading.Thread(target=_run, args=(interval,), name="memory-profiler", daemon=True).start()
+    return True
+
+
+def samples() -> pd.DataFrame:
+    """Process totals at every snapshot, oldest first."""
+    with _lock:
+        return pd.DataFrame(list(_samples))
+
+
+def snapshot_times() -> list:
+    with _lock:
+        return [pd.Timestamp(t, unit="s") for t, _ in _snapshots]
+
+
+def _statistics_frame(stats: list, limit: int) -> pd.DataFrame:
+    rows = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        rows.append({
+            "location": f"{frame.filename}:{frame.lineno}",
+            "bytes": stat.size,
+            "count": stat.count,
+            "bytes_diff": getattr(stat, "size_diff", None),
+            "count_diff": getattr(stat, "count_diff", None),
+            "traceback": "\n".join(stat.traceback.format()),
+        })
+    return pd.DataFrame(rows)
+
+
+def top_allocations(limit: int = 25, group_by: str = "lineno") -> pd.DataFrame:
+    """Largest allocation sites in the latest snapshot."""
+    with _lock:
+        if not _snapshots:
+            return pd.DataFrame()
+        snapshot = _snapshots[-1][1]
+    return _statistics_frame(snapshot.statistics(group_by), limit)
+
+
+def allocation_diff(baseline: int = 0, limit: int = 25, group_by: str = "lineno") -> pd.DataFrame:
+    """Allocation sites that grew most between snapshot `baseline` and the latest one."""
+    with _lock:
+        if len(_snapshots) < 2:
+            return pd.DataFrame()
+        old, new = _snapshots[baseline][1], _snapshots[-1][1]
+    return _statistics_frame(new.compare_to(old, group_by), limit)
+
+
+def session_state_sizes() -> pd.DataFrame:
+    """Estimated bytes of every session state key of every connected session."""
+    from streamlit import runtime
+
+    from src.cache import estimate_size
+
+    columns = ["session", "key", "type", "bytes"]
+    if not runtime.exists():
+        return pd.DataFrame(columns=columns)
+
+    # The session manager has no public accessor
+    session_mgr = getattr(runtime.get_instance(), "_session_mgr", None)
+    if session_mgr is None:
+        return pd.DataFrame(columns=columns)
+
+    rows = []
+    for info in session_mgr.list_sessions():
+        try:
+            state = info.session.session_state.filtered_state
+        except RuntimeError:
+            # State changed size under a running script; measured at the next snapshot
+            continue
+        for key, value in state.items():
+            rows.append({"session": info.session.id[:8], "key": key, "type": type(value).__name__,
+                         "bytes": estimate_size(value)})
+    return pd.DataFrame(rows, columns=columns)
+
+
+def cache_sizes() -> pd.DataFrame:
+    """Bytes held per cache and value type: application caches (re-measured now, next to
+    the size recorded when each entry was stored) and Streamlit's own caches."""
+    from streamlit import runtime
+
+    from src.cache import estimate_size, get_manager
+
+    sizes = {}
+    for cache, _, value, recorded in get_manager().entries():
+        row = sizes.setdefault((f"app:{cache}", type(value).__name__), [0, 0, 0])
+        row[0] += 1
+        row[1] += recorded
+        row[2] += estimate_size(value)
+
+    if runtime.exists():
+        for stat in runtime.get_instance().stats_mgr.get_stats():
+            if stat.category_name == "st_session_state":
+                continue
+            row = sizes.setdefault((f"{stat.category_name}:{stat.cache_name}", "-"), [0, 0, 0])
+            row[0] += 1
+            row[2] += stat.byte_length
+
+    return pd.DataFrame(
+        [(cache, kind, entries, recorded or None, measured)
+         for (cache, kind), (entries, recorded, measured) in sizes.items()],
+        columns=["cache", "type", "entries", "recorded_bytes", "bytes"],
+    ).sort_values("bytes", ascending=False, ignore_index=True)
+
+
+def object_counts(limit: int = 25) -> pd.DataFrame:
+    """Most numerous live object types tracked by the garbage collector (e.g. folium maps, frames)."""
+    counts = Counter(f"{type(obj).__module__}.{type(obj).__qualname__}" for obj in gc.get_objects())
+    return pd.DataFrame(counts.most_common(limit), columns=["type", "count"])
@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per timing; older ones are dropped so long-running servers stay bounded
+MAX_SAMPLES = 1000
+
+# Process-wide timings and counters; Streamlit reruns share them across sessions
+_lock = threading.Lock()
+_timings = {}
+_timing_counts = {}
+_counters = {}
+_gauges = {}
+_seen = set()
+
+
+def record(name: str, seconds: float) -> None:
+    """Record one duration sample under a name, keeping the latest MAX_SAMPLES."""
+    with _lock:
+        samples = _timings.get(name)
+        if samples is None:
+            samples = _timings[name] = deque(maxlen=MAX_SAMPLES)
+        samples.append(seconds)
+        _timing_counts[name] = _timing_counts.get(name, 0) + 1
+
+
+def increment(name: str, amount: int = 1) -> None:
+    """Add to a named counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def gauge(name: str, value: float) -> None:
+    """Set a named gauge to its current value."""
+    with _lock:
+        _gauges[name] = value
+
+
+@contextmanager
+def timer(name: str):
+    """Time a block and record it under a name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def first_time(name: str) -> bool:
+    """Return True the first time a name is seen in this process."""
+    with _lock:
+        if name in _seen:
+            return False
+        _seen.add(name)
+        return True
+
+
+def summary() -> dict:
+    """Return count, mean, p50, p95 and max per timing, plus all counters and gauges.
+
+    count covers every sample recorded; the other statistics cover the latest MAX_SAMPLES.
+    """
+    with _lock:
+        timings = {name: sorted(samples) for name, samples in _timings.items()}
+        counts = dict(_timing_counts)
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+
+    stats = {}
+    for name, samples in timings.items():
+        n = len(samples)
+        stats[name] = {
+            "count": counts[name],
+            "mean": sum(samples) / n,
+            "p50": samples[n // 2],
+            "p95": samples[min(n - 1, int(n * 0.95))],
+            "max": samples[-1],
+        }
+    return {"timings": stats, "counters": counters, "gauges": gauges}
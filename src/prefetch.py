@@ -0,0 +1,170 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from src import perf
+from src.cache import get_manager
+from src.config import PREFETCH_ENABLED, PREFETCH_MAX_CACHE_SHARE, PREFETCH_MAX_LOCATIONS
+
+logger = logging.getLogger(__name__)
+
+# Likelihood of each relation being the next selection, before the session's own habits
+PARENT_WEIGHTS = [1.0, 0.7, 0.4, 0.2]
+SIBLING_WEIGHT = 0.3
+SIBLINGS_PER_SELECTION = 3
+HISTORY_LENGTH = 20
+# Sessions and prefetched selections tracked at once; the oldest are forgotten first
+MAX_TRACKED = 1000
+
+_queue = queue.Queue()
+_lock = threading.Lock()
+_started = False
+# Newest selection per session; queued jobs for older selections are skipped
+_generations = OrderedDict()
+# (location, view, start_date, end_date) warmed by the prefetcher -> cache stamps of its charts
+_prefetched = OrderedDict()
+_outcomes = Counter()
+
+
+def candidate_locations(location: str, history: list, n: int = PREFETCH_MAX_LOCATIONS) -> list:
+    """Rank the locations most likely to be selected after `location`.
+
+    Parents and siblings under the nearest parent are scored by relation, siblings
+    ordered by popularity. Scores are boosted for the level changes (e.g. County to
+    Metro) this session has made before.
+    """
+    from src.data.hierarchy import get_children, get_parents
+    from src.data.popularity import location_counts
+
+    scores = Counter()
+    parents = get_parents(location)
+    for parent, weight in zip(parents, PARENT_WEIGHTS):
+        scores[parent] += weight
+    if parents:
+        geo_type = location.split(" - ", 1)[0]
+        popularity = location_counts()
+        siblings = [loc for loc in get_children(parents[0], geo_type) if loc != location]
+        for sibling in sorted(siblings, key=lambda loc: -popularity[loc])[:SIBLINGS_PER_SELECTION]:
+            scores[sibling] += SIBLING_WEIGHT
+
+    transitions = Counter(
+        (previous.split(" - ", 1)[0], current.split(" - ", 1)[0])
+        for previous, current in zip(history, history[1:])
+    )
+    level = location.split(" - ", 1)[0]
+    for candidate in scores:
+        scores[candidate] *= 1 + transitions[(level, candidate.split(" - ", 1)[0])]
+
+    recent = set(history[-3:])
+    return [loc for loc, _ in scores.most_common() if loc not in recent and loc != location][:n]
+
+
+def _prefetch(location: str, view: str, start_date, end_date) -> None:
+    from src.components.charts import get_overview_chart
+    from src.data.backends import load_location
+    from src.data.data_loader import METRICS
+
+    load_location(location)
+    for metric in METRICS:
+        get_overview_chart(location, metric, view, start_date, end_date)
+        # Yield the GIL between charts so interactive runs keep priority
+        time.sleep(0.005)
+
+
+def _chart_versions(location: str, view: str, start_date, end_date) -> tuple:
+    from src.components.charts import overview_chart_version
+    from src.data.data_loader import METRICS
+
+    return tuple(overview_chart_version(location, metric, view, start_date, end_date) for metric in METRICS)
+
+
+def _remember(tracked: OrderedDict, key, value) -> None:
+    """Store a value as the newest entry, forgetting the oldest beyond MAX_TRACKED; callers hold _lock."""
+    tracked[key] = value
+    tracked.move_to_end(key)
+    while len(tracked) > MAX_TRACKED:
+        tracked.popitem(last=False)
+
+
+def _worker() -> None:
+    manager = get_manager()
+    while True:
+        session, generation, location, history, view, start_date, end_date = _queue.get()
+        try:
+            candidates = candidate_locations(location, history)
+        except KeyError:
+            continue
+        for candidate in candidates:
+            if _generations.get(session) != generation:
+                perf.increment("prefetch.superseded")
+                break
+            # Only use spare budget, so prefetching never evicts what users are viewing
+            if manager.used > manager.budget * PREFETCH_MAX_CACHE_SHARE:
+                perf.increment("prefetch.skipped_budget")
+                break
+            try:
+                with perf.timer("prefetch.location"):
+                    _prefetch(candidate, view, start_date, end_date)
+                versions = _chart_versions(candidate, view, start_date, end_date)
+                with _lock:
+                    _remember(_prefetched, (candidate, view, start_date, end_date), versions)
+                perf.increment("prefetch.completed")
+            except Exception:
+                logger.exception("Prefetch failed for %s", candidate)
+
+
+def _ensure_worker() -> None:
+    global _started
+    with _lock:
+        if not _started:
+            threading.Thread(target=_worker, name="prefetch", daemon=True).start()
+            _started = True
+
+
+def on_selection(location: str, view: str, start_date, end_date) -> None:
+    """Record a selection for hit-rate telemetry and queue prefetches of likely next locations.
+
+    Candidates are ranked and warmed on a background thread; a newer selection in the
+    same session supersedes the remaining work.
+    """
+    start_date, end_date = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    selection = (location, view, start_date, end_date)
+    if st.session_state.get("_prefetch_selection") == selection:
+        return
+    st.session_state["_prefetch_selection"] = selection
+
+    history = st.session_state.setdefault("_prefetch_history", [])
+    if not history or history[-1] != location:
+        if history:
+            # Hit rate: share of location changes served by the charts the prefetcher built,
+            # i.e. they are still the same cache entries and were not evicted and rebuilt
+            with _lock:
+                prefetched = _prefetched.pop(selection, None)
+            hit = (
+                prefetched is not None and None not in prefetched
+                and prefetched == _chart_versions(location, view, start_date, end_date)
+            )
+            outcome = "hits" if hit else "misses"
+            perf.increment(f"prefetch.{outcome}")
+            with _lock:
+                _outcomes[outcome] += 1
+                perf.gauge("prefetch.hit_rate", _outcomes["hits"] / sum(_outcomes.values()))
+        history.append(location)
+        del history[:-HISTORY_LENGTH]
+
+    if not PREFETCH_ENABLED:
+        return
+    ctx = get_script_run_ctx()
+    session = ctx.session_id if ctx else None
+    _ensure_worker()
+    with _lock:
+        generation = _generations.get(session, 0) + 1
+        _remember(_generations, session, generation)
+    _queue.put((session, generation, location, list(history[:-1]), view, start_date, end_date))
+    perf.increment("prefetch.queued")
@@ -0,0 +1,140 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src import perf
+from src.config import DEFAULT_LOCATIONS, WARMUP_READY_PORT, WARMUP_TOP_LOCATIONS
+
+logger = logging.getLogger(__name__)
+
+# The five Overview views
+VIEWS = ["Value", "MoM", "YoY", "Since 2019", "Seasonality"]
+
+_lock = threading.Lock()
+_started = False
+_status = {"ready": False, "state": "idle", "done": 0, "total": 0, "errors": 0, "seconds": None}
+
+
+def status() -> dict:
+    """Snapshot of warm-up progress."""
+    with _lock:
+        return dict(_status)
+
+
+def _update(**changes) -> None:
+    with _lock:
+        _status.update(changes)
+
+
+def warmup_locations(location_options, n: int = WARMUP_TOP_LOCATIONS) -> list:
+    """DEFAULT_LOCATIONS followed by the most popular locations, without duplicates."""
+    from src.data.popularity import top_locations
+
+    candidates = list(DEFAULT_LOCATIONS) + top_locations(n)
+    return [loc for loc in dict.fromkeys(candidates) if loc in location_options]
+
+
+def warm_caches() -> None:
+    """Load the data, build the cubes, hierarchy, search index and peer percentiles, and build every
+    Overview chart for the warm-up locations across all views and standard periods."""
+    # Imported here so app.py can start the warm-up without loading the data stack up front
+    from src.components.charts import get_overview_chart
+    from src.data.backends import get_backend, load_location
+    from src.data.data_loader import METRICS
+    from src.data.cube import GEO_TYPES, VIEWS as CUBE_VIEWS
+    from src.data.hierarchy import get_hierarchy
+    from src.data.percentiles import get_percentiles
+    from src.data.periods import period_starts
+    from src.data.search import search_locations
+
+    with perf.timer("warmup.backend"):
+        backend = get_backend()
+        locations = warmup_locations(set(backend.locations()))
+        min_date, max_date = backend.date_bounds()
+    with perf.timer("warmup.hierarchy"):
+        get_hierarchy()
+    with perf.timer("warmup.search"):
+        search_locations("a")
+    with perf.timer("warmup.percentiles"):
+        for geo_type in GEO_TYPES:
+            for view in CUBE_VIEWS:
+                get_percentiles(geo_type, view)
+
+    starts = period_starts(min_date, max_date).values()
+    _update(total=len(locations) * len(VIEWS) * len(starts) * len(METRICS))
+    done = errors = 0
+    for location in locations:
+        with perf.timer("warmup.location"):
+            load_location(location)
+            for view in VIEWS:
+                for start_date in starts:
+                    for metric in METRICS:
+                        try:
+                            get_overview_chart(location, metric, view, start_date, max_date)
+                        except Exception:
+                            logger.exception("Warm-up failed for %s (%s, %s)", location, metric, view)
+                            errors += 1
+                        done += 1
+                        _update(done=done, errors=errors)
+
+
+def _run() -> None:
+    from streamlit import runtime
+
+    # Streamlit's data caches belong to the runtime, so wait for the server to create it
+    while not runtime.exists():
+        time.sleep(0.1)
+
+    _update(state="warming")
+    start = time.perf_counter()
+    try:
+        warm_caches()
+    except Exception:
+        logger.exception("Cache warm-up failed")
+        _update(errors=status()["errors"] + 1)
+    finally:
+        # Report ready even after errors so a bad entry cannot hold traffic forever
+        seconds = time.perf_counter() - start
+        perf.record("warmup.total", seconds)
+        _update(ready=True, state="ready", seconds=round(seconds, 3))
+        logger.info("Cache warm-up finished in %.1fs: %s", seconds, status())
+
+
+class _ReadinessHandler(BaseHTTPRequestHandler):
+    """Answers every GET with the warm-up status: 503 until warm, then 200."""
+
+    def do_GET(self):
+        current = status()
+        body = json.dumps(current).encode()
+        self.send_response(200 if current["ready"] else 503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_warmup(port: int = WARMUP_READY_PORT) -> bool:
+    """Start the readiness endpoint and warm-up thread once per process.
+
+    Returns False when they were already started.
+    """
+    global _started
+    with _lock:
+        if _started:
+            return False
+        _started = True
+
+    if port:
+        try:
+            server = ThreadingHTTPServer(("", port), _ReadinessHandler)
+            threading.Thread(target=server.serve_forever, name="warmup-readiness", daemon=True).start()
+        except OSError as e:
+            logger.warning("Readiness endpoint not started on port %s: %s", port, e)
+
+    threading.Thread(target=_run, name="cache-warmup", daemon=True).start()
+    return True
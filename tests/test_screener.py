@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from src.data.cube import build_cube
+from src.data.screener import build_snapshot, compile_predicates
+
+METRICS = ["median_listing_price", "active_listing_count"]
+
+
+def make_cube(rows: list):
+    df = pd.DataFrame(rows, columns=["geo_id", "geo_name", "date"] + METRICS)
+    df["date"] = pd.to_datetime(df["date"])
+    return build_cube(df, "County", METRICS)
+
+
+def test_empty_cube_screens_to_nothing():
+    snapshot = build_snapshot(make_cube([]))
+
+    assert len(snapshot.locations) == 0
+    assert pd.isna(snapshot.date)
+    predicates = [{"metric": "median_listing_price", "view": "Value", "op": ">", "value": "state median"}]
+    assert compile_predicates(snapshot, predicates).shape == (0,)
+    assert len(snapshot.frame()) == 0
+
+
+def test_state_median_predicate():
+    snapshot = build_snapshot(make_cube([
+        ("06037", "Los Angeles, CA", "2024-01-01", 100.0, 1.0),
+        ("06059", "Orange, CA", "2024-01-01", 300.0, 2.0),
+        ("06073", "San Diego, CA", "2024-01-01", 200.0, 3.0),
+        ("48201", "Harris, TX", "2024-01-01", 50.0, 4.0),
+    ]))
+
+    predicates = [{"metric": "median_listing_price", "view": "Value", "op": ">", "value": "state median"}]
+    matches = snapshot.locations[compile_predicates(snapshot, predicates)]
+    assert list(matches) == ["Orange, CA"]
+    assert np.isclose(snapshot.national_medians[("median_listing_price", "Value")], 150.0)
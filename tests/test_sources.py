@@ -0,0 +1,29 @@
+import pandas as pd
+
+from resources import sources
+
+
+def write_catalogs(tmp_path, monkeypatch, metrics: pd.DataFrame):
+    files = {name: str(tmp_path / f"{name}.csv") for name in sources.CATALOG_FILES}
+    metrics.to_csv(files["metrics"], index=False)
+    pd.DataFrame({"Source": [], "Metric": [], "Geo": []}).to_csv(files["feeds"], index=False)
+    pd.DataFrame({"Geography": [], "Description": []}).to_csv(files["coverage"], index=False)
+    monkeypatch.setattr(sources, "CATALOG_FILES", files)
+
+
+def test_broad_prefix_matches_every_term(tmp_path, monkeypatch):
+    n_terms = sources.MAX_PREFIX_TERMS * 2
+    write_catalogs(tmp_path, monkeypatch, pd.DataFrame({
+        "Source": ["Zillow"] * n_terms,
+        "Metric": [f"count{i:03d}" for i in range(n_terms)],
+        "Zillow": ["api"] * n_terms,
+        "Description": ["listing"] * n_terms,
+    }))
+
+    assert sources.search_catalog("c")["metrics"] == list(range(n_terms))
+    assert sources.search_catalog("zillow c")["metrics"] == list(range(n_terms))
+    assert sources.search_catalog("count005")["metrics"] == [5]
+
+
+def test_empty_query_returns_none():
+    assert sources.search_catalog("  ") is None
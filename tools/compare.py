@@ -3,22 +3,27 @@ import streamlit_shadcn_ui as ui
 import pandas as pd
 from src.components.charts import create_line_chart  # We'll create this
 from src.components.tables import create_comparison_matrix  # We'll create this
-from src.data.data_loader import (
-    METRICS,
-    load_dask_data,
-    get_unique_locations
-)
-from src.config import STYLE_OVERRIDES
+from src.data.data_loader import METRICS
+from src.cancel import get_executor
+from src.data.backends import display_name_for, get_backend, load_location, slice_dates
+from src.data.monthly import MonthlySeries
+from src.data.periods import period_starts
+from src.data.popularity import record_locations
+from src.data.spatial import get_locator, latest_values, missing_centroids_message, zips_within
+from src.components.downloads import create_download_popover
+from src.data.export import make_query
+from src.config import NEARBY_RADIUS_MILES, STYLE_OVERRIDES
 
 def calculate_changes(df, metric_col):
     """Calculate MoM, YoY, and Since 2019 changes for a given metric"""
     latest_value = df[metric_col].iloc[-1]
+    series = MonthlySeries.from_frame(df, [metric_col])
     
-    # Month over Month
-    mom = ((latest_value / df[metric_col].iloc[-2] - 1) * 100) if len(df) > 1 else None
-    
-    # Year over Year
-    yoy = ((latest_value / df[metric_col].iloc[-13] - 1) * 100) if len(df) >= 13 else None
+    # Month over Month and Year over Year, against the exact calendar month
+    mom, yoy = (
+        series.change(metric_col, view)[-1] if series.values.shape[1] else None
+        for view in ("MoM", "YoY")
+    )
     
     # Since 2019
     baseline_2019 = df[df['date'].dt.year == 2019][metric_col].mean()
@@ -33,6 +38,46 @@ def format_pct_change(value):
     color = "red" if value < 0 else "green"
     return f"<span style='color: {color}'>{value:+.1f}%</span>"
 
+def _set_locations(locations):
+    st.session_state.compare_location_select = locations
+
+def nearby_zips_section(zip_locations):
+    """ZIPs within a radius of a selected ZIP, their median and a shortcut to compare them"""
+    with st.expander("Nearby ZIPs", icon=":material/near_me:"):
+        col_center, col_radius = st.columns([2, 1])
+        with col_center:
+            center = st.selectbox("**Center**", options=zip_locations, format_func=display_name_for,
+                                  key="compare_nearby_center")
+        with col_radius:
+            miles = st.number_input("**Radius (miles)**", min_value=1, max_value=100, value=NEARBY_RADIUS_MILES,
+                                    key="compare_nearby_miles")
+
+        try:
+            nearby = zips_within(center, miles)
+        except KeyError:
+            st.info(f"No centroid is available for {display_name_for(center)}.")
+            return
+
+        values = latest_values(nearby["Location"].tolist(), list(METRICS.keys()))
+        st.write(f"**{len(nearby)} ZIPs** within {miles:g} miles of {display_name_for(center)}")
+        st.dataframe(
+            values.median().rename(METRICS).to_frame("Median of nearby ZIPs").T,
+            use_container_width=True
+        )
+        st.dataframe(
+            nearby.join(values, on="Location").rename(columns=METRICS),
+            column_config={"Miles": st.column_config.NumberColumn("Miles", format="%.1f")},
+            hide_index=True,
+            use_container_width=True
+        )
+        st.button(
+            "Compare the 5 closest",
+            icon=":material/compare_arrows:",
+            on_click=_set_locations,
+            args=(nearby["Location"].head(5).tolist(),),
+            key="compare_nearby_apply"
+        )
+
 def compare_page():
     """Main comparison page rendering function"""
     # Header section
@@ -47,8 +92,8 @@ def compare_page():
     st.write("Compare real estate market trends across multiple locations with the latest data from realtor.com. Add up to 5 locations to compare.")
     
     # Load data
-    ddf = load_dask_data()
-    location_options = get_unique_locations(ddf)
+    backend = get_backend()
+    location_options = backend.locations()
 
     # Define default locations with LA area focus
     default_locations = [
@@ -61,12 +106,15 @@ def compare_page():
     # Create a container for multi-select and filters
     col1, col2 = st.columns([2, 1])
     
+    # Seeded through session state so the nearby-ZIPs shortcut can replace the selection
+    if "compare_location_select" not in st.session_state:
+        st.session_state.compare_location_select = default_locations
+
     with col1:
         # Create multi-select with updated default options
         selected_locations = st.multiselect(
             "Select up to 5 locations to compare",
             options=location_options,
-            default=default_locations,
             placeholder="🔍 Search by state, metro, county, or zip code.", 
             max_selections=5,
             key="compare_location_select",
@@ -79,19 +127,8 @@ def compare_page():
             
             # Time Period section
             # Calculate date ranges
-            min_date = ddf['date'].min().compute()
-            max_date = ddf['date'].max().compute()
-            current_year = max_date.year
-            ytd_start = pd.Timestamp(f"{current_year}-01-01")
-            
-            periods = {
-                "3M": max_date - pd.DateOffset(months=3),
-                "6M": max_date - pd.DateOffset(months=6),
-                "YTD": ytd_start,
-                "1Y": max_date - pd.DateOffset(years=1),
-                "5Y": max_date - pd.DateOffset(years=5),
-                "Max": min_date
-            }
+            min_date, max_date = backend.date_bounds()
+            periods = period_starts(min_date, max_date)
             
             # Initialize selected period in session state if not exists
             if 'selected_period' not in st.session_state:
@@ -154,6 +191,14 @@ def compare_page():
                 help="Select a view type to update the charts below"
             )                
 
+    # Nearby ZIPs need the optional ZIP centroid file
+    zip_locations = [location for location in selected_locations if location.startswith("Zip - ")]
+    if zip_locations:
+        if get_locator() is not None:
+            nearby_zips_section(zip_locations)
+        else:
+            st.caption(missing_centroids_message("Nearby ZIP lookups"))
+
     # Process data if locations are selected
     if selected_locations:
         try:
@@ -164,31 +209,19 @@ def compare_page():
                 end_date = max_date
                 start_date = periods[st.session_state.selected_period]
 
+            record_locations(selected_locations, key="compare")
+
             # Process all selected locations
             all_data = []
             display_names = []
             
-            for location in selected_locations:
-                geo_type, geo_name = location.split(" - ", 1)
-                
-                if geo_type == 'Zip':
-                    zip_code = geo_name.split(',')[0]
-                    filtered_df = ddf[
-                        (ddf['geo_type'] == geo_type) & 
-                        (ddf['geo_id'] == zip_code)
-                    ].compute()
-                    display_name = f"{zip_code}, {geo_name.split(',', 1)[1]}"
-                else:
-                    filtered_df = ddf[
-                        (ddf['geo_type'] == geo_type) & 
-                        (ddf['geo_name'] == geo_name)
-                    ].compute()
-                    display_name = geo_name
+            # Load every location in parallel; a superseded rerun drops the queued loads
+            histories = get_executor().map(load_location, selected_locations)
+            for location, filtered_df in zip(selected_locations, histories):
+                geo_type = location.split(" - ", 1)[0]
+                display_name = display_name_for(location)
                 
-                filtered_df = filtered_df[
-                    (filtered_df['date'] >= start_date) & 
-                    (filtered_df['date'] <= end_date)
-                ].sort_values('date')
+                filtered_df = slice_dates(filtered_df, start_date, end_date)
                 
                 all_data.append(filtered_df)
                 display_names.append(display_name)
@@ -210,6 +243,20 @@ def compare_page():
                 "Charts", "Table", "Data"
             ])
 
+            # Build every metric's chart concurrently, then place them in order
+            chart_futures = {
+                metric_col: get_executor().submit(
+                    create_line_chart,
+                    dfs=all_data,
+                    metric_col=metric_col,
+                    metric_name=metric_name,
+                    display_names=display_names,
+                    selected_period=st.session_state.selected_period,
+                    view_type=st.session_state.view_type
+                )
+                for metric_col, metric_name in METRICS.items()
+            }
+
             with tab_charts:
                 for i in range(0, len(METRICS), 2):
                     col1, col2 = st.columns(2)
@@ -219,14 +266,7 @@ def compare_page():
                     metric_name = METRICS[metric_col]
                     with col1:
                         try:
-                            chart = create_line_chart(
-                                dfs=all_data,
-                                metric_col=metric_col,
-                                metric_name=metric_name,
-                                display_names=display_names,
-                                selected_period=st.session_state.selected_period,
-                                view_type=st.session_state.view_type
-                            )
+                            chart = chart_futures[metric_col].result()
                             st.altair_chart(chart, use_container_width=True)
                         except Exception as e:
                             st.error(f"Error creating chart for {metric_name}: {str(e)}")
@@ -237,14 +277,7 @@ def compare_page():
                         metric_name = METRICS[metric_col]
                         with col2:
                             try:
-                                chart = create_line_chart(
-                                    dfs=all_data,
-                                    metric_col=metric_col,
-                                    metric_name=metric_name,
-                                    display_names=display_names,
-                                    selected_period=st.session_state.selected_period,
-                                    view_type=st.session_state.view_type
-                                )
+                                chart = chart_futures[metric_col].result()
                                 st.altair_chart(chart, use_container_width=True)
                             except Exception as e:
                                 st.error(f"Error creating chart for {metric_name}: {str(e)}")
@@ -256,6 +289,17 @@ def compare_page():
                 )
 
             with tab_data:
+                create_download_popover(
+                    {
+                        "Selected dates": make_query(
+                            locations=selected_locations, start_date=start_date, end_date=end_date
+                        ),
+                        "Full history": make_query(locations=selected_locations),
+                    },
+                    file_stem="market_comparison",
+                    key="compare_export"
+                )
+
                 # Combine all dataframes
                 combined_df = pd.concat(all_data, ignore_index=True)
                 st.dataframe(
@@ -0,0 +1,113 @@
+import streamlit as st
+import streamlit_shadcn_ui as ui
+from src.data.cube import GEO_TYPES, VIEWS, get_cube
+from src.data.data_loader import METRICS
+from src.data.rankings import get_leaderboard
+from src.config import STATE_ABBREVIATIONS
+
+
+def leaderboard_page():
+    """Top and bottom geographies for any metric, view and month"""
+    # Header section
+    st.markdown(
+        """
+        <div style='display: flex; align-items: center; gap: 10px; margin-bottom: 5px;'>
+            <h3>Leaderboard</h3>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.write("Rank every state, metro, county, or zip code by any metric with the latest data from realtor.com")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        selected_metric = st.selectbox(
+            "Select Metric",
+            options=list(METRICS.values()),
+            label_visibility="collapsed",
+            key="leaderboard_metric"
+        )
+        metric_col = next(k for k, v in METRICS.items() if v == selected_metric)
+
+    with col2:
+        with st.popover("Filters", icon=":material/filter_alt:", use_container_width=False):
+            st.write("##### Advanced Filters")
+
+            geo_type = st.segmented_control(
+                "**Geo Level**",
+                options=GEO_TYPES[1:],
+                default="Metro",
+                key="leaderboard_geo_type"
+            ) or "Metro"
+
+            cube = get_cube(geo_type)
+            available_dates = list(cube.dates)
+            selected_date = st.select_slider(
+                "**Month**",
+                options=available_dates,
+                value=available_dates[-1],
+                format_func=lambda x: x.strftime('%B %Y'),
+                key="leaderboard_date"
+            )
+
+            selected_view = st.pills(
+                "**Views**",
+                options=VIEWS,
+                default="YoY",
+                key="leaderboard_view"
+            ) or "Value"
+
+            col_n, col_state = st.columns(2)
+            with col_n:
+                top_n = st.number_input("**Show**", min_value=5, max_value=200, value=20, step=5, key="leaderboard_n")
+            with col_state:
+                state = st.selectbox(
+                    "**State**",
+                    options=["All"] + sorted(STATE_ABBREVIATIONS.values()),
+                    key="leaderboard_state"
+                )
+
+    ui.badges(
+        badge_list=[
+            (f"🌎  {geo_type}", "secondary"),
+            (f"📅  {selected_date.strftime('%B %Y')}", "secondary"),
+            (f"👁️‍🗨️  {selected_metric} ({selected_view})", "secondary")
+        ],
+        class_name="flex gap-2",
+        key="current_view_badges_leaderboard"
+    )
+
+    try:
+        top, bottom = get_leaderboard(
+            geo_type=geo_type,
+            metric=metric_col,
+            view=selected_view,
+            date=selected_date,
+            n=top_n,
+            state=None if state == "All" else state
+        )
+    except KeyError as e:
+        st.warning(str(e))
+        return
+
+    value_format = "$%,.0f" if 'price' in metric_col else "%.2f" if 'ratio' in metric_col else "%,.0f"
+    column_config = {
+        "Rank": st.column_config.NumberColumn("Rank", width="small"),
+        "Location": st.column_config.TextColumn("Location", width="large"),
+        "State": st.column_config.TextColumn("State", width="small"),
+        "Value": st.column_config.NumberColumn(selected_metric, format=value_format),
+        "Change (%)": st.column_config.NumberColumn(f"{selected_view} (%)", format="%+.1f%%"),
+    }
+
+    tab_top, tab_bottom = st.tabs(["Highest", "Lowest"])
+    with tab_top:
+        st.dataframe(top, column_config=column_config, hide_index=True, use_container_width=True)
+    with tab_bottom:
+        st.dataframe(bottom, column_config=column_config, hide_index=True, use_container_width=True)
+
+    st.caption(f"Ranked across {len(cube.geo_ids):,} {geo_type.lower()} geographies. Locations without data for the selected month are excluded.")
+
+
+if __name__ == "__main__":
+    leaderboard_page()
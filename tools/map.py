@@ -1,9 +1,26 @@
+import copy
+import json
+import urllib.request
 import streamlit as st
 import streamlit_shadcn_ui as ui
 import folium
 from streamlit_folium import st_folium
 import pandas as pd
-from src.data.data_loader import METRICS, load_dask_data
+from src.data.data_loader import METRICS
+from src.data.backends import get_backend
+from src.data.spatial import get_locator, locations_near, missing_centroids_message, nearest_zips
+from src.components.downloads import create_download_popover
+from src.data.export import make_query
+from src.cache import cached
+from src.cancel import get_executor
+
+STATES_GEOJSON_URL = 'https://raw.githubusercontent.com/python-visualization/folium/master/examples/data/us-states.json'
+
+@cached("geojson")
+def load_geojson(url: str) -> dict:
+    """Download a GeoJSON layer once per process."""
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return json.load(response)
 
 def format_metric_value(value):
     if isinstance(value, (int, float)):
@@ -26,8 +43,8 @@ def map_page():
     
     try:
         # Load data
-        ddf = load_dask_data()
-        available_dates = sorted(ddf['date'].unique().compute())
+        backend = get_backend()
+        available_dates = backend.dates()
         
         # Create two columns for controls
         col1, col2 = st.columns([2, 1])
@@ -74,13 +91,32 @@ def map_page():
             class_name="flex gap-2",
             key="current_view_badges_map"
         )
+
+        create_download_popover(
+            {
+                f"All states ({selected_date.strftime('%B %Y')})": make_query(
+                    geo_type="State", start_date=selected_date, end_date=selected_date
+                ),
+                "All states (full history)": make_query(geo_type="State"),
+            },
+            file_stem=f"states_{selected_date.strftime('%Y_%m')}",
+            key="map_export"
+        )
         
-        # Load data
-        ddf = load_dask_data()
-        
-        # Get all available dates
-        available_dates = sorted(ddf['date'].unique().compute())
-        
+        # Fetch the state shapes and the months needed for the selected view concurrently
+        comparison_dates = {
+            "MoM": selected_date - pd.DateOffset(months=1),
+            "YoY": selected_date - pd.DateOffset(years=1),
+            "Since 2019": pd.Timestamp(f"2019-{selected_date.month:02d}-01"),
+        }
+        executor = get_executor()
+        geojson_future = executor.submit(load_geojson, STATES_GEOJSON_URL)
+        current_future = executor.submit(backend.cross_section, 'State', selected_date)
+        previous_future = (
+            executor.submit(backend.cross_section, 'State', comparison_dates[selected_comparison])
+            if selected_comparison in comparison_dates else None
+        )
+
         # Create the base map first
         m = folium.Map(
             location=[39.8283, -98.5795],
@@ -89,27 +125,13 @@ def map_page():
             width='100%'
         )
         
-        # Filter and process data based on comparison type
-        df_states = ddf[ddf['geo_type'] == 'State'].compute()
-        
-        if selected_comparison == "Value":
-            df_states = df_states[df_states['date'] == selected_date]
-        elif selected_comparison == "MoM":
-            # Calculate Month over Month change
-            current = df_states[df_states['date'] == selected_date]
-            previous = df_states[df_states['date'] == (selected_date - pd.DateOffset(months=1))]
-            df_states = calculate_percent_change(current, previous, metric_col)
-        elif selected_comparison == "YoY":
-            # Calculate Year over Year change
-            current = df_states[df_states['date'] == selected_date]
-            previous = df_states[df_states['date'] == (selected_date - pd.DateOffset(years=1))]
-            df_states = calculate_percent_change(current, previous, metric_col)
-        elif selected_comparison == "Since 2019":
-            # Calculate change since same month in 2019
-            current = df_states[df_states['date'] == selected_date]
-            baseline_date = pd.Timestamp(f"2019-{selected_date.month:02d}-01")
-            baseline = df_states[df_states['date'] == baseline_date]
-            df_states = calculate_percent_change(current, baseline, metric_col)
+        current = current_future.result()
+        
+        if previous_future is None:
+            df_states = current
+        else:
+            # MoM, YoY or Since 2019 change against the comparison month
+            df_states = calculate_percent_change(current, previous_future.result(), metric_col)
         
         
         # Verify data exists
@@ -123,7 +145,8 @@ def map_page():
             
         # Create choropleth layer
         choropleth = folium.Choropleth(
-            geo_data='https://raw.githubusercontent.com/python-visualization/folium/master/examples/data/us-states.json',
+            # Tooltips are added to the features below, so work on a copy of the cached layer
+            geo_data=copy.deepcopy(geojson_future.result()),
             name='choropleth',
             data=df_states,
             columns=['geo_id', metric_col],
@@ -192,13 +215,28 @@ def map_page():
             )
         ).add_to(m)
         
-        # Display the map
-        st_folium(
+        # Display the map; clicks are returned when ZIP centroids can resolve them
+        locator = get_locator()
+        map_output = st_folium(
             m,
             width="100%",
             height=700,
-            returned_objects=[]
+            returned_objects=["last_clicked"] if locator is not None else []
         )
+
+        if locator is None:
+            st.caption(missing_centroids_message("Map click lookups"))
+
+        clicked = (map_output or {}).get("last_clicked")
+        if clicked:
+            st.write(f"##### Near {clicked['lat']:.4f}, {clicked['lng']:.4f}")
+            st.write(" · ".join(locations_near(clicked["lat"], clicked["lng"])))
+            st.dataframe(
+                nearest_zips(clicked["lat"], clicked["lng"], k=10),
+                column_config={"Miles": st.column_config.NumberColumn("Miles", format="%.1f")},
+                hide_index=True,
+                use_container_width=True
+            )
         
     except Exception as e:
         st.error(f"Error processing data: {str(e)}")
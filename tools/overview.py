@@ -4,19 +4,34 @@ import streamlit_antd_components as sac
 import pandas as pd
 from streamlit_searchbox import st_searchbox
 from src.components.charts import (
-    create_area_chart,
-    create_seasonality_chart,
-    create_combo_chart
+    get_overview_chart,
+    create_distribution_chart,
+    create_line_chart,
+    create_trajectory_chart
 )
-from src.components.metrics import create_metrics_grid
-from src.components.tables import create_comparison_table
-from src.data.data_loader import (
-    METRICS,
-    load_dask_data,
-    get_unique_locations,
-    search_locations
+from src.components.metrics import build_metric_cards, create_metrics_grid
+from src.components.downloads import create_download_popover
+from src.components.tables import (
+    build_comparison_table,
+    create_comparison_table,
+    create_parent_comparison_table,
+    create_children_table
 )
-from src.config import STYLE_OVERRIDES
+from src.data.data_loader import METRICS
+from src.cancel import get_executor
+from src.prefetch import on_selection
+from src.data.backends import display_name_for, get_backend, load_location, slice_dates
+from src.data.distribution import get_child_distribution
+from src.data.percentiles import LEVEL_PLURALS, peer_percentiles
+from src.data.providers import compare_sources, location_sources
+from src.data.periods import period_starts
+from src.data.popularity import record_locations
+from src.data.search import search_locations
+from src.data.hierarchy import child_levels, unlinked_levels
+from src.data.similarity import find_similar_markets, get_trajectories
+from src.data.export import make_query
+from src.data.cube import VIEWS as CUBE_VIEWS, state_code
+from src.config import DEFAULT_LOCATIONS, GEO_CROSSWALK_PATH, STYLE_OVERRIDES
 
 
 def overview_page():
@@ -47,20 +62,11 @@ def overview_page():
     # ui.tabs(options=['Charts', 'Metrics', 'Table', 'Data'], default_value='Charts', key="tab_shadcn")
 
     # Load data
-    ddf = load_dask_data()
-    location_options = get_unique_locations(ddf)
+    backend = get_backend()
+    location_options = backend.locations()
 
-    # Define default locations
-    default_locations = [
-        "National - United States",
-        "State - California",
-        "Metro - Los Angeles-Long Beach-Anaheim, CA",
-        "County - Los Angeles, CA",
-        "Zip - 90001, Los Angeles, CA"
-    ]
-    
     # Ensure all default locations exist in the options
-    default_locations = [loc for loc in default_locations if loc in location_options]
+    default_locations = [loc for loc in DEFAULT_LOCATIONS if loc in location_options]
     
     # If no default locations are valid, fall back to the first option
     if not default_locations:
@@ -72,7 +78,7 @@ def overview_page():
     with col1:
         # Create search box with default options
         selected_location = st_searchbox(
-            search_function=lambda searchterm: search_locations(searchterm, location_options),
+            search_function=search_locations,
             # label="Search Location",
             placeholder="🔍 Search by state, metro, county, or zip code.", #Search any location (e.g., California, Los Angeles Metro, Orange County, 90210
             default=default_locations[0],  # First default location
@@ -89,19 +95,8 @@ def overview_page():
             
             # Time Period section
             # Calculate date ranges
-                min_date = ddf['date'].min().compute()
-                max_date = ddf['date'].max().compute()
-                current_year = max_date.year
-                ytd_start = pd.Timestamp(f"{current_year}-01-01")
-                
-                periods = {
-                    "3M": max_date - pd.DateOffset(months=3),
-                    "6M": max_date - pd.DateOffset(months=6),
-                    "YTD": ytd_start,
-                    "1Y": max_date - pd.DateOffset(years=1),
-                    "5Y": max_date - pd.DateOffset(years=5),
-                    "Max": min_date
-                }
+                min_date, max_date = backend.date_bounds()
+                periods = period_starts(min_date, max_date)
                 
                 # Initialize selected period in session state if not exists
                 if 'selected_period' not in st.session_state:
@@ -181,19 +176,9 @@ def overview_page():
             geo_type, geo_name = selected_location.split(" - ", 1)
             
             # Get data for the selected location
-            if geo_type == 'Zip':
-                zip_code = geo_name.split(',')[0]
-                filtered_df = ddf[
-                    (ddf['geo_type'] == geo_type) & 
-                    (ddf['geo_id'] == zip_code)
-                ].compute()
-                display_name = f"{zip_code}, {geo_name.split(',', 1)[1]}"
-            else:
-                filtered_df = ddf[
-                    (ddf['geo_type'] == geo_type) & 
-                    (ddf['geo_name'] == geo_name)
-                ].compute()
-                display_name = geo_name
+            filtered_df = load_location(selected_location)
+            record_locations([selected_location], key="overview")
+            display_name = display_name_for(selected_location)
 
             # Get date range info
             if st.session_state.custom_date_range:
@@ -216,26 +201,39 @@ def overview_page():
             )
 
             # Create tabs after summary
-            tab_charts, tab_metrics, tab_table, tab_data = st.tabs([
-                "Charts", "Metrics", "Table", "Data"
+            tab_charts, tab_metrics, tab_table, tab_related, tab_similar, tab_data = st.tabs([
+                "Charts", "Metrics", "Table", "Related", "Similar", "Data"
             ])
 
-            if len(filtered_df) == 0:
+            # Slice the selected date range out of the cached, date-sorted history
+            filtered_df = slice_dates(filtered_df, start_date, end_date)
+
+            # Checked after slicing, so an empty date range never reaches the peer ranks as NaT
+            if filtered_df.empty:
                 st.warning("No data available for the selected location")
                 return
-
-            # Filter data based on selected date range
-            filtered_df = filtered_df[
-                (filtered_df['date'] >= start_date) & 
-                (filtered_df['date'] <= end_date)
-            ]
-            
-            # Sort by date
-            filtered_df = filtered_df.sort_values('date')
             
             # Get the selected comparison type
             comparison_type = st.session_state.comparison_type
 
+            # Build the charts, metric cards and summary table concurrently, then place them in order below
+            executor = get_executor()
+            chart_futures = {
+                metric_col: executor.submit(
+                    get_overview_chart, selected_location, metric_col, comparison_type, start_date, end_date
+                )
+                for metric_col in METRICS
+            }
+            try:
+                percentiles = peer_percentiles(selected_location, filtered_df['date'].max(), comparison_type)
+            except KeyError:
+                # Locations or months outside the cube are shown without peer ranks
+                percentiles = None
+            cards_future = executor.submit(build_metric_cards, filtered_df, comparison_type, percentiles)
+            table_future = executor.submit(
+                build_comparison_table, filtered_df, comparison_type, percentiles
+            )
+
             # Display content in each tab
             with tab_charts:
                 # sac.divider(label='Charts', icon='bar-chart', align='center', color='gray')
@@ -249,12 +247,7 @@ def overview_page():
                     metric_name = METRICS[metric_col]
                     with col1:
                         try:
-                            if comparison_type == "Value":
-                                chart = create_area_chart(filtered_df, metric_col, metric_name, display_name)
-                            elif comparison_type == "Seasonality":
-                                chart = create_seasonality_chart(filtered_df, metric_col, metric_name, display_name)
-                            else:
-                                chart = create_combo_chart(filtered_df, metric_col, metric_name, display_name, comparison_type)
+                            chart = chart_futures[metric_col].result()
                             st.altair_chart(chart, use_container_width=True)
                         except Exception as e:
                             st.error(f"Error creating chart for {metric_name}: {str(e)}")
@@ -265,41 +258,167 @@ def overview_page():
                         metric_name = METRICS[metric_col]
                         with col2:
                             try:
-                                if comparison_type == "Value":
-                                    chart = create_area_chart(filtered_df, metric_col, metric_name, display_name)
-                                elif comparison_type == "Seasonality":
-                                    chart = create_seasonality_chart(filtered_df, metric_col, metric_name, display_name)
-                                else:
-                                    chart = create_combo_chart(filtered_df, metric_col, metric_name, display_name, comparison_type)
+                                chart = chart_futures[metric_col].result()
                                 st.altair_chart(chart, use_container_width=True)
                             except Exception as e:
                                 st.error(f"Error creating chart for {metric_name}: {str(e)}")
 
             with tab_metrics:
-                create_metrics_grid(filtered_df, display_name, comparison_type)
+                create_metrics_grid(filtered_df, display_name, comparison_type, cards=cards_future.result())
 
             with tab_table:
-                comparison_map = {
-                    "Value": "Value",
-                    "MoM": "MoM",
-                    "YoY": "YoY",
-                    "Since 2019": "Since 2019",
-                    "Seasonality": "Seasonality"
-                }
-
                 create_comparison_table(
                     df=filtered_df, 
                     display_name=display_name,
-                    comparison_type=comparison_map[selected_comparison]
+                    comparison_type=comparison_type,
+                    geo_type=geo_type,
+                    table=table_future.result()
                 )
 
+            with tab_related:
+                try:
+                    # Compare against parent geographies
+                    st.write("##### Compared to Parent Markets")
+                    create_parent_comparison_table(selected_location)
+
+                    # County and metro links for ZIPs come from an optional crosswalk file
+                    missing = unlinked_levels(selected_location)
+                    if missing:
+                        st.caption(
+                            f"Links to {' and '.join(LEVEL_PLURALS[level] for level in missing)} are unavailable: "
+                            f"add a ZIP crosswalk (zip, county_fips, cbsa_code) at `{GEO_CROSSWALK_PATH}`."
+                        )
+
+                    # Drill down into child geographies
+                    levels = child_levels(selected_location)
+                    if levels:
+                        st.write(f"##### Markets in {display_name}")
+                        child_level = st.segmented_control(
+                            "**Drill down**",
+                            options=levels,
+                            default=levels[0],
+                            key="overview_drill_down_level"
+                        ) or levels[0]
+                        create_children_table(selected_location, child_level)
+
+                        # Spread of a metric across those children, with this location overlaid
+                        st.write(f"##### Spread Across {LEVEL_PLURALS[child_level].title()}")
+                        distribution_metric = st.selectbox(
+                            "**Metric**",
+                            options=list(METRICS.keys()),
+                            format_func=lambda m: METRICS[m],
+                            key="overview_distribution_metric"
+                        )
+                        distribution_view = comparison_type if comparison_type in CUBE_VIEWS else "Value"
+                        distribution_df = get_child_distribution(
+                            selected_location, child_level, distribution_metric, distribution_view
+                        )
+                        distribution_df = slice_dates(distribution_df, start_date, end_date)
+                        if distribution_df.empty:
+                            st.info(f"No {LEVEL_PLURALS[child_level]} reported data in this period")
+                        else:
+                            st.altair_chart(
+                                create_distribution_chart(
+                                    distribution_df, distribution_metric, METRICS[distribution_metric],
+                                    display_name, LEVEL_PLURALS[child_level], distribution_view
+                                ),
+                                use_container_width=True
+                            )
+                except KeyError:
+                    st.info("No related markets available for this location")
+
+                # The same location as reported by each data provider loaded into the store
+                if len(location_sources(selected_location)) > 1:
+                    st.write("##### Across Data Providers")
+                    provider_metric = st.selectbox(
+                        "**Metric**",
+                        options=list(METRICS.keys()),
+                        format_func=lambda m: METRICS[m],
+                        key="overview_provider_metric"
+                    )
+                    histories = compare_sources(selected_location, provider_metric, start_date, end_date)
+                    if histories:
+                        st.altair_chart(
+                            create_line_chart(
+                                dfs=[df for _, df in histories],
+                                metric_col=provider_metric,
+                                metric_name=METRICS[provider_metric],
+                                display_names=[name for name, _ in histories],
+                                selected_period=st.session_state.selected_period,
+                                view_type=comparison_type if comparison_type in CUBE_VIEWS else "Value"
+                            ),
+                            use_container_width=True
+                        )
+                    else:
+                        st.info(f"No provider reports {METRICS[provider_metric]} for this location in the selected period")
+
+            with tab_similar:
+                col_metrics, col_window, col_k = st.columns([2, 1, 1])
+                with col_metrics:
+                    similar_metrics = st.multiselect(
+                        "**Metrics**",
+                        options=list(METRICS.keys()),
+                        default=[list(METRICS.keys())[0]],
+                        format_func=lambda m: METRICS[m],
+                        key="similar_metrics"
+                    )
+                with col_window:
+                    window_label = st.selectbox("**Window**", options=["2Y", "5Y", "Max"], index=1, key="similar_window")
+                with col_k:
+                    k = st.number_input("**Matches**", min_value=1, max_value=50, value=10, key="similar_k")
+
+                if similar_metrics:
+                    window = {"2Y": 24, "5Y": 60, "Max": 10_000}[window_label]
+                    try:
+                        similar_df = find_similar_markets(selected_location, similar_metrics, window=window, k=k)
+                        trajectories = get_trajectories(
+                            [selected_location] + list(similar_df["Location"].head(5)),
+                            similar_metrics[0],
+                            window=window
+                        )
+                        st.altair_chart(
+                            create_trajectory_chart(trajectories, METRICS[similar_metrics[0]], display_name),
+                            use_container_width=True
+                        )
+                        st.dataframe(
+                            similar_df,
+                            column_config={
+                                "Correlation": st.column_config.ProgressColumn("Correlation", min_value=-1, max_value=1, format="%.2f"),
+                                "Distance": st.column_config.NumberColumn("Distance", format="%.3f"),
+                            },
+                            hide_index=True,
+                            use_container_width=True
+                        )
+                    except KeyError:
+                        st.info("Similar markets are not available for this location")
+
             with tab_data:
+                # Export this location, or every market in the selected state
+                scopes = {
+                    "This location (selected dates)": make_query(
+                        locations=[selected_location], start_date=start_date, end_date=end_date
+                    ),
+                    "This location (full history)": make_query(locations=[selected_location]),
+                }
+                state = state_code(geo_type, None, geo_name) if geo_type == 'State' else None
+                if state:
+                    for level, label in [("County", "counties"), ("Zip", "ZIPs")]:
+                        scopes[f"All {label} in {state} (full history)"] = make_query(geo_type=level, state=state)
+                create_download_popover(
+                    scopes,
+                    file_stem=display_name.replace(', ', '_').replace(' ', '_').lower(),
+                    key="overview_export"
+                )
+
                 st.dataframe(
                     filtered_df.sort_values('date', ascending=False),
                     hide_index=True,
                     use_container_width=True
                 )
 
+            # Warm the caches for the locations this user is likely to open next
+            on_selection(selected_location, comparison_type, start_date, end_date)
+
         except Exception as e:
             st.error(f"Error processing data: {str(e)}")
             return
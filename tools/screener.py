@@ -0,0 +1,133 @@
+import math
+import streamlit as st
+import streamlit_shadcn_ui as ui
+import pandas as pd
+from src.data.cube import GEO_TYPES, VIEWS
+from src.data.data_loader import METRICS
+from src.data.screener import REFERENCES, get_snapshot, predicates_key, screen, screen_csv
+
+PAGE_SIZE = 50
+
+DEFAULT_PREDICATES = pd.DataFrame([
+    {"Metric": "Pending Ratio", "View": "Value", "Condition": ">", "Value": "0.5"},
+    {"Metric": "Median Listing Price", "View": "YoY", "Condition": "<", "Value": "0"},
+])
+
+
+def screener_page():
+    """Multi-condition market screener over the latest month"""
+    # Header section
+    st.markdown(
+        """
+        <div style='display: flex; align-items: center; gap: 10px; margin-bottom: 5px;'>
+            <h3>Market Screener</h3>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.write("Find every market that matches a combination of conditions in the latest month of data from realtor.com")
+
+    metric_lookup = {v: k for k, v in METRICS.items()}
+    defaults = DEFAULT_PREDICATES[DEFAULT_PREDICATES["Metric"].isin(metric_lookup)]
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        geo_type = st.segmented_control(
+            "Geo Level",
+            options=GEO_TYPES[1:],
+            default="County",
+            key="screener_geo_type",
+            label_visibility="collapsed"
+        ) or "County"
+
+    snapshot = get_snapshot(geo_type)
+    month_label = snapshot.date.strftime('%B %Y') if pd.notna(snapshot.date) else "No data"
+
+    # Conditions are edited inline; every edit reruns the screen against the cached snapshot
+    predicates_df = st.data_editor(
+        defaults,
+        column_config={
+            "Metric": st.column_config.SelectboxColumn("Metric", options=list(METRICS.values()), required=True, width="medium"),
+            "View": st.column_config.SelectboxColumn("View", options=VIEWS, required=True, default="Value", width="small"),
+            "Condition": st.column_config.SelectboxColumn("Condition", options=["<", "<=", ">", ">=", "=", "!="], required=True, default=">", width="small"),
+            "Value": st.column_config.TextColumn("Value", help=f"A number, or one of: {', '.join(REFERENCES)}", required=True, width="medium"),
+        },
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        key=f"screener_predicates_{geo_type}"
+    )
+
+    predicates = [
+        {
+            "metric": metric_lookup[row["Metric"]],
+            "view": row["View"] or "Value",
+            "op": row["Condition"],
+            "value": row["Value"],
+        }
+        for _, row in predicates_df.dropna(subset=["Metric", "Condition", "Value"]).iterrows()
+    ]
+
+    sort_options = [(metric, view) for metric in METRICS for view in VIEWS if (metric, view) in snapshot.columns]
+    with col2:
+        with st.popover("Sort", icon=":material/sort:", use_container_width=False):
+            sort_by = st.selectbox(
+                "**Sort by**",
+                options=sort_options,
+                format_func=lambda key: METRICS[key[0]] if key[1] == "Value" else f"{METRICS[key[0]]} ({key[1]})",
+                key="screener_sort_by"
+            )
+            ascending = st.toggle("Ascending", value=False, key="screener_ascending")
+
+    try:
+        results = screen(geo_type, predicates, sort_by=sort_by, ascending=ascending)
+    except ValueError as e:
+        st.error(f"Invalid condition: {str(e)}")
+        return
+
+    ui.badges(
+        badge_list=[
+            (f"🌎  {geo_type}", "secondary"),
+            (f"📅  {month_label}", "secondary"),
+            (f"✅  {len(results):,} of {len(snapshot.locations):,} match", "secondary")
+        ],
+        class_name="flex gap-2",
+        key="current_view_badges_screener"
+    )
+
+    # Paginate the sorted result; a changed screen starts again at its first page
+    screen_token = (geo_type, predicates_key(predicates), sort_by, ascending)
+    n_pages = max(1, math.ceil(len(results) / PAGE_SIZE))
+    if st.session_state.get("screener_page_token") != screen_token:
+        st.session_state["screener_page_token"] = screen_token
+        st.session_state["screener_page"] = 1
+    elif st.session_state.get("screener_page", 1) > n_pages:
+        st.session_state["screener_page"] = n_pages
+    page = st.number_input("Page", min_value=1, max_value=n_pages, key="screener_page") if n_pages > 1 else 1
+    start = (page - 1) * PAGE_SIZE
+
+    st.dataframe(
+        results.iloc[start:start + PAGE_SIZE],
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(f"Showing {min(start + 1, len(results))}-{min(start + PAGE_SIZE, len(results))} of {len(results):,} results")
+
+    # The CSV is only built on request, so editing a condition never serializes the result
+    if st.session_state.get("screener_csv_token") != screen_token:
+        if not st.button("Prepare CSV", icon=":material/download:", key="screener_prepare"):
+            return
+        st.session_state["screener_csv_token"] = screen_token
+
+    st.download_button(
+        "Download CSV",
+        data=screen_csv(geo_type, predicates, sort_by=sort_by, ascending=ascending),
+        file_name=f"screener_{geo_type.lower()}_{snapshot.date.strftime('%Y_%m') if pd.notna(snapshot.date) else 'empty'}.csv",
+        mime="text/csv",
+        icon=":material/download:",
+        key="screener_download"
+    )
+
+
+if __name__ == "__main__":
+    screener_page()